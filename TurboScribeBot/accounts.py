@@ -0,0 +1,234 @@
+"""
+Account pool with quota-aware scheduling.
+
+`ACCOUNTS_FILE` lists several TurboScribe accounts (JSON list):
+
+    [
+        {"email": "a@example.com", "password": "...", "max_concurrent": 3},
+        {"email": "b@example.com", "password": "...", "max_concurrent": 1, "daily_minutes": 180}
+    ]
+
+Without it the pool holds the single EMAIL/PASSWORD account from .env.
+
+Each job is assigned the account with a free concurrency slot and enough
+remaining minutes, preferring the fewest jobs in flight, then the most minutes
+left. In-flight jobs and the usage scraped from the account page (cached for
+`ACCOUNT_USAGE_TTL` seconds) are shared between processes through a locked
+state file, so one-shot CLI runs see each other. A job that hits an account
+limit (`AccountLimitError`) blocks that account for a while and is retried on
+another one. When every account is busy, `acquire` waits for a slot to
+free up: up to `ACCOUNT_WAIT_TIMEOUT` seconds in the worker and batch modes,
+`ACCOUNT_CLI_WAIT_TIMEOUT` for a one-shot CLI run.
+"""
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from job_logging import console_logger
+from session_store import SESSION_DIR
+
+ACCOUNTS_FILE = os.getenv("ACCOUNTS_FILE")
+ACCOUNT_STATE_PATH = os.getenv("ACCOUNT_STATE_PATH", os.path.join(SESSION_DIR, "accounts_state.json"))
+ACCOUNT_USAGE_TTL = int(os.getenv("ACCOUNT_USAGE_TTL", 600))
+DEFAULT_MAX_CONCURRENT = int(os.getenv("ACCOUNT_MAX_CONCURRENT", 3))
+CONCURRENCY_BACKOFF = 60
+ACCOUNT_WAIT_TIMEOUT = float(os.getenv("ACCOUNT_WAIT_TIMEOUT", 3600))
+ACCOUNT_CLI_WAIT_TIMEOUT = float(os.getenv("ACCOUNT_CLI_WAIT_TIMEOUT", 300))
+ACCOUNT_WAIT_POLL = float(os.getenv("ACCOUNT_WAIT_POLL", 5))
+ACCOUNT_WAIT_LOG = 60  # seconds between "still waiting" messages
+ACCOUNT_FIELDS = ("email", "password", "max_concurrent", "daily_minutes")
+
+logger = console_logger("accounts")
+
+
+class AccountLimitError(Exception):
+    """Raised by a bot step when TurboScribe refuses a job for account limits."""
+
+    def __init__(self, message, kind="concurrency", retry_after=None):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+class NoAccountAvailable(RuntimeError):
+    pass
+
+
+class Account:
+    def __init__(self, email, password, max_concurrent=DEFAULT_MAX_CONCURRENT, daily_minutes=None):
+        self.email = email
+        self.password = password
+        self.max_concurrent = max_concurrent
+        self.daily_minutes = daily_minutes
+
+    def __repr__(self):
+        return f"Account({self.email})"
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class AccountPool:
+    def __init__(self, accounts, state_path=ACCOUNT_STATE_PATH, usage_ttl=ACCOUNT_USAGE_TTL):
+        if not accounts:
+            raise ValueError("No TurboScribe accounts configured")
+        self.accounts = {a.email: a for a in accounts}
+        self.state_path = state_path
+        self.usage_ttl = usage_ttl
+
+    @classmethod
+    def from_env(cls, email=None, password=None):
+        if ACCOUNTS_FILE:
+            with open(ACCOUNTS_FILE, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            accounts = []
+            for entry in entries:
+                unknown = sorted(set(entry) - set(ACCOUNT_FIELDS))
+                if unknown:
+                    logger.warning(f"⚠️ {ACCOUNTS_FILE}: ignoring unknown keys {unknown} of {entry.get('email')}")
+                accounts.append(Account(**{k: entry[k] for k in ACCOUNT_FIELDS if k in entry}))
+        else:
+            accounts = [Account(email or os.getenv("EMAIL"), password or os.getenv("PASSWORD"))]
+        return cls(accounts)
+
+    # --- shared state ---
+
+    @contextmanager
+    def _state(self):
+        """Locked read-modify-write of the state file."""
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(f"{self.state_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            for email in self.accounts:
+                entry = state.setdefault(email, {"jobs": {}, "usage": None, "blocked_until": 0})
+                entry["jobs"] = {job: pid for job, pid in entry["jobs"].items() if _alive(pid)}
+            yield state
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+
+    def _in_flight(self, entry, now):
+        usage = entry.get("usage")
+        scraped = usage.get("in_flight") if usage and now - usage["checked_at"] < self.usage_ttl else None
+        return max(len(entry["jobs"]), scraped or 0)
+
+    def _remaining(self, account, entry, now):
+        """Remaining minutes, None if unknown / unlimited."""
+        usage = entry.get("usage")
+        if usage and now - usage["checked_at"] < self.usage_ttl and usage.get("remaining_minutes") is not None:
+            return usage["remaining_minutes"]
+        return account.daily_minutes
+
+    # --- scheduling ---
+
+    def acquire(self, job_id, minutes=0, exclude=(), prefer=None, timeout=ACCOUNT_WAIT_TIMEOUT):
+        """
+        Reserve an account for `job_id`. `prefer` (the account a warm session
+        is already logged into) wins whenever it is eligible. While accounts
+        are only busy or blocked, wait up to `timeout` seconds for a slot
+        (the state file is shared between processes, so this polls it).
+        """
+        started = time.time()
+        deadline, next_log = started + (timeout or 0), started
+        while True:
+            email, waitable = self._try_acquire(job_id, minutes, exclude, prefer)
+            if email:
+                if next_log > started:
+                    logger.info(f"👤 Job {job_id} got an account slot after {time.time() - started:.0f}s")
+                return self.accounts[email]
+            now = time.time()
+            if not waitable or now >= deadline:
+                raise NoAccountAvailable("All TurboScribe accounts are busy or over their limits")
+            if now >= next_log:
+                logger.info(f"⏳ Job {job_id} waiting for a free account slot "
+                            f"({deadline - now:.0f}s left, ACCOUNT_WAIT_TIMEOUT / ACCOUNT_CLI_WAIT_TIMEOUT)")
+                next_log = now + ACCOUNT_WAIT_LOG
+            time.sleep(min(ACCOUNT_WAIT_POLL, max(deadline - now, 0)))
+
+    def _try_acquire(self, job_id, minutes, exclude, prefer):
+        """(reserved email or None, whether waiting could free an account)"""
+        now = time.time()
+        with self._state() as state:
+            candidates, waitable = [], False
+            for email, account in self.accounts.items():
+                entry = state[email]
+                if email in exclude:
+                    continue
+                if entry["blocked_until"] > now:
+                    waitable = True
+                    continue
+                in_flight = self._in_flight(entry, now)
+                remaining = self._remaining(account, entry, now)
+                if remaining is not None and remaining < minutes:
+                    continue
+                if in_flight >= account.max_concurrent:
+                    waitable = True
+                    continue
+                score = (email != prefer, in_flight / account.max_concurrent,
+                         -(remaining if remaining is not None else float("inf")))
+                candidates.append((score, email))
+
+            if not candidates:
+                return None, waitable
+            email = min(candidates)[1]
+            state[email]["jobs"][str(job_id)] = os.getpid()
+        return email, True
+
+    def capacity(self):
+        """Jobs the accounts can run at the same time."""
+        return sum(account.max_concurrent for account in self.accounts.values())
+
+    def release(self, account, job_id, minutes_used=0):
+        with self._state() as state:
+            entry = state[account.email]
+            entry["jobs"].pop(str(job_id), None)
+            usage = entry.get("usage")
+            if usage and usage.get("remaining_minutes") is not None and minutes_used:
+                usage["remaining_minutes"] = max(usage["remaining_minutes"] - minutes_used, 0)
+
+    def block(self, account, error):
+        """Keep `account` out of scheduling after it hit a limit."""
+        if error.retry_after:
+            until = time.time() + error.retry_after
+        elif error.kind == "daily":
+            tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+            until = datetime.combine(tomorrow, datetime.min.time(), timezone.utc).timestamp()
+        else:
+            until = time.time() + CONCURRENCY_BACKOFF
+        with self._state() as state:
+            state[account.email]["blocked_until"] = until
+        return until
+
+    def refresh_usage(self, bot):
+        """Scrape the account page of a logged-in bot if the cached usage is stale."""
+        account = bot.account
+        if account is None or account.email not in self.accounts:
+            return
+        with self._state() as state:
+            usage = state[account.email].get("usage")
+        if usage and time.time() - usage["checked_at"] < self.usage_ttl:
+            return
+
+        scraped = bot.account_usage()
+        if not isinstance(scraped, dict) or "message" in scraped:
+            return
+        scraped["checked_at"] = time.time()
+        with self._state() as state:
+            state[account.email]["usage"] = scraped
+        bot.logger.info(f"📊 Account usage for {account.email}: {scraped}")
@@ -0,0 +1,153 @@
+"""
+Shrink local media before it is uploaded to TurboScribe.
+
+TurboScribe only uses the audio track, but uploads are often multi-GB video
+recordings (Zoom MP4s). `compact_audio()` uses local ffmpeg to drop the video
+and re-encode the first audio track as mono speech audio (Opus by default,
+AAC as an option) into a temp file with the same base name, so the transcript
+title does not change. The original file is left untouched.
+
+    with compact_audio(args.file, logger) as upload_path:
+        bot.upload(upload_path)
+
+Without ffmpeg, or when re-encoding would not make the file smaller, the
+original path is used as-is.
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+UPLOAD_CODEC = os.getenv("UPLOAD_AUDIO_CODEC", "opus")
+UPLOAD_BITRATE = os.getenv("UPLOAD_AUDIO_BITRATE", "32k")
+
+CODECS = {
+    "opus": (".ogg", ["-c:a", "libopus", "-application", "voip"]),
+    "aac": (".m4a", ["-c:a", "aac", "-movflags", "+faststart"]),
+}
+
+
+def _bits(bitrate):
+    """'32k' -> 32000"""
+    bitrate = str(bitrate).lower()
+    if bitrate.endswith("k"):
+        return int(float(bitrate[:-1]) * 1000)
+    if bitrate.endswith("m"):
+        return int(float(bitrate[:-1]) * 1000000)
+    return int(bitrate)
+
+
+def probe(path):
+    """Return (has_video, audio_bit_rate or None), or None without ffprobe."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_entries", "stream=codec_type,bit_rate:format=bit_rate",
+         "-of", "json", path],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    data = json.loads(result.stdout or "{}")
+    streams = data.get("streams", [])
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+    has_video = any(s.get("codec_type") == "video" for s in streams)
+    bit_rate = (audio[0].get("bit_rate") if audio else None) or data.get("format", {}).get("bit_rate")
+    return has_video, int(bit_rate) if bit_rate else None
+
+
+def media_duration(path):
+    """Duration in seconds, or None without ffprobe / for unreadable files."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+        capture_output=True, text=True
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def encode(source, target, codec=UPLOAD_CODEC, bitrate=UPLOAD_BITRATE, start=None, duration=None):
+    """
+    Write the first audio track of `source` as mono `codec` to `target`,
+    optionally only `duration` seconds from `start`.
+    """
+    _, codec_args = CODECS[codec]
+    seek = ["-ss", f"{start:.3f}"] if start else []
+    limit = ["-t", f"{duration:.3f}"] if duration else []
+    command = [
+        shutil.which("ffmpeg"), "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+        *seek, "-i", source, *limit, "-map", "0:a:0", "-vn", "-sn", "-dn", "-ac", "1",
+        *codec_args, "-b:a", str(bitrate), target
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "ffmpeg failed")
+
+
+def prepare_upload(path, target_dir, logger, codec=UPLOAD_CODEC, bitrate=UPLOAD_BITRATE, report=None):
+    """
+    Path to upload for `path`: a compact audio copy written to `target_dir`
+    when that helps, else `path` itself.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported upload codec: {codec}")
+    if not shutil.which("ffmpeg"):
+        logger.warning("⚠️ ffmpeg not found, uploading the original file")
+        return path
+
+    info = probe(path)
+    if info and not info[0] and info[1] and info[1] <= _bits(bitrate) * 1.5:
+        logger.info("🎧 Audio-only file already compact, uploading as-is")
+        return path
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    target = os.path.join(target_dir, stem + CODECS[codec][0])
+    started = time.time()
+    original_size = os.path.getsize(path)
+    try:
+        os.makedirs(target_dir, exist_ok=True)
+        encode(path, target, codec, bitrate)
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"⚠️ Audio extraction failed, uploading the original file: {e}")
+        return path
+
+    size = os.path.getsize(target)
+    seconds = time.time() - started
+    if size >= original_size:
+        logger.info("🎧 Re-encoded audio is not smaller, uploading the original file")
+        os.remove(target)
+        return path
+
+    logger.info(f"🎧 Upload shrunk {original_size / 1024 / 1024:.1f} MB → {size / 1024 / 1024:.1f} MB "
+                f"({codec} {bitrate}, {seconds:.1f}s)")
+    if report is not None:
+        report["upload_audio"] = {
+            "codec": codec,
+            "bitrate": bitrate,
+            "original_bytes": original_size,
+            "upload_bytes": size,
+            "seconds": round(seconds, 3)
+        }
+    return target
+
+
+@contextmanager
+def compact_audio(path, logger, codec=UPLOAD_CODEC, bitrate=UPLOAD_BITRATE, report=None):
+    """
+    Yield the path to upload: a compact audio copy of `path` when that helps,
+    else `path` itself. The temp copy is removed on exit.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="turboscribe_upload_")
+    try:
+        yield prepare_upload(path, temp_dir, logger, codec, bitrate, report)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,238 @@
+"""
+Batch mode: run many jobs from a JSONL manifest in one process.
+
+Each line carries the same fields as the CLI arguments:
+
+    {"id": "51", "output": "/app/outputs", "link": "https://youtu.be/...", "language": "ar", "timestamps": true}
+    {"id": "52", "output": "/app/outputs", "source": "zoom", "link": "...", "passcode": "x", "with_transcription": true, "language": "ar"}
+
+Jobs share a pool of at most `concurrency` logged-in browser sessions, so the
+image start, Python imports and Chrome launch are paid once per batch instead
+of once per job. Per-job outputs and reports are the same as a CLI run.
+
+    python main.py --batch manifest.jsonl --concurrency 3
+
+With `--stages`, jobs flow through a staged executor (stages.py) instead:
+
+    source      Zoom / OneDrive download              browser session
+    prepare     compact upload audio (ffmpeg)         local
+    upload      login, upload, options, start         browser session
+    transcribe  wait for TurboScribe (job monitor)    no browser
+    results     transcript page, downloads, summaries browser session
+    finish      owner, final report, result cache     local
+
+Each stage has its own worker pool, so job N+1's download and upload run
+while job N is transcribing. A job moves between stages through its
+checkpoint, like `--resume`.
+
+    python main.py --batch manifest.jsonl --concurrency 3 --stages source=2,upload=2,transcribe=16
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from main import email, password, parse_args, job_argv, build_options, run_job, run_with_failover
+from session_store import SESSION_DIR
+from worker import SessionPool, run_on_pool
+from monitor import MONITOR_MAX_IN_FLIGHT, JobParked
+from job_logging import console_logger
+from metrics import REGISTRY
+from pipeline import STAGES, StageBoundary
+from progress import ProgressWriter
+from stages import Stage, StagedExecutor
+from turboscribe_bot import TurboScribeBot
+
+logger = console_logger("batch")
+
+BROWSER_STAGES = ("source", "upload", "results")
+
+
+def load_manifest(path):
+    """Parse and validate every line. Returns (jobs, errors)."""
+    jobs, errors = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = json.loads(line)
+                if "batch" in job:
+                    raise ValueError("nested batch")
+                jobs.append(parse_args(job_argv(job)))
+            except (ValueError, SystemExit) as e:
+                errors.append((number, str(e) or "invalid arguments"))
+    return jobs, errors
+
+
+def parse_stage_workers(value, sessions, in_flight=MONITOR_MAX_IN_FLIGHT):
+    """
+    'source=2,transcribe=16' -> workers per stage; browser stages default to
+    the session count, transcribe to the jobs the accounts can hold (`in_flight`).
+    """
+    workers = {
+        "source": sessions,
+        "prepare": max(1, (os.cpu_count() or 2) // 2),
+        "upload": sessions,
+        "transcribe": in_flight,
+        "results": sessions,
+        "finish": 2,
+    }
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, count = item.partition("=")
+        if name not in workers or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid stage workers '{item}' (stages: {', '.join(STAGES)})")
+        workers[name] = int(count)
+    return workers
+
+
+class StagedJob:
+    def __init__(self, args):
+        self.args = args
+        self.output_dir = os.path.join(args.output, f"{args.id}")
+        self.account = None  # reserved from the upload stage on
+        self.parked = None
+
+
+def _session_stage(pool, job, stage):
+    """Run one stage of the job on a pooled browser session. Returns the next stage."""
+    args = job.args
+    try:
+        bot = pool.acquire(prefer=job.account.email if job.account else None)
+    except RuntimeError:
+        if job.account:
+            pool.accounts.release(job.account, args.id)
+        raise
+    healthy = True
+    try:
+        try:
+            bot.bind_job(args.id, build_options(args), job.output_dir)
+            if not bot.reset_page():
+                raise RuntimeError("Browser session unusable")
+        except Exception:
+            if job.account:
+                pool.accounts.release(job.account, args.id)
+            raise
+        try:
+            if stage == "source":
+                run_job(bot, args, job.output_dir, stage=stage)
+            else:
+                run_with_failover(bot, args, job.output_dir, pool.accounts, pool.monitor, job.account, stage)
+            return None
+        except StageBoundary as boundary:
+            if stage != "source":
+                job.account = bot.account
+            return boundary.stage
+        except JobParked as parked:
+            job.account, job.parked = parked.account, parked
+            return "transcribe"
+        finally:
+            args.resume = True  # later stages continue from the checkpoint
+    except Exception as e:
+        bot.mark_failed(f"stage:{stage}", e)
+        healthy = bot.reset_page()
+        raise
+    finally:
+        bot.release_logger()
+        pool.release(bot, healthy)
+
+
+def _local_stage(pool, job, stage):
+    """Run a stage that needs no browser on a bot without one (report, log, checkpoint)."""
+    args = job.args
+    bot = TurboScribeBot(args.id, email, password, build_options(args), job.output_dir)
+    try:
+        try:
+            if job.account:
+                run_with_failover(bot, args, job.output_dir, pool.accounts, account=job.account, stage=stage)
+            else:
+                run_job(bot, args, job.output_dir, stage=stage)
+            return None
+        except StageBoundary as boundary:
+            return boundary.stage
+        finally:
+            args.resume = True
+    except Exception as e:
+        bot.mark_failed(f"stage:{stage}", e)
+        raise
+    finally:
+        bot.close()
+
+
+def _transcribe_stage(pool, job):
+    """Wait for TurboScribe through the job monitor, holding no browser."""
+    try:
+        with ProgressWriter(job.output_dir, job.args.id).heartbeat("transcribe"):
+            result = pool.monitor.wait(job.parked.account, job.parked.remote_id)
+    except BaseException:
+        pool.accounts.release(job.account, job.args.id)
+        raise
+    logger.info(f"📡 Job {job.args.id} ({job.parked.remote_id}) {result['status'] if result else 'not followed'}")
+    return "results"
+
+
+def run_staged(pool, jobs, workers):
+    """Run the jobs through the staged executor. Returns the number that succeeded."""
+    def stage_func(name):
+        if name == "transcribe":
+            return lambda job: _transcribe_stage(pool, job)
+        if name in BROWSER_STAGES:
+            return lambda job: _session_stage(pool, job, name)
+        return lambda job: _local_stage(pool, job, name)
+
+    succeeded = []
+
+    def on_done(job, error):
+        if error is None:
+            succeeded.append(job.args.id)
+            logger.info(f"✅ Job {job.args.id} finished successfully!")
+        else:
+            logger.error(f"❌ Error in job {job.args.id}: {error}")
+
+    executor = StagedExecutor([Stage(name, stage_func(name), workers[name]) for name in STAGES], on_done).start()
+    logger.info("🧩 Stage workers: " + ", ".join(f"{name}={workers[name]}" for name in STAGES))
+    for args in jobs:
+        os.makedirs(os.path.join(args.output, f"{args.id}"), exist_ok=True)
+        executor.submit(StagedJob(args), "source" if args.source else "prepare")
+    stats = executor.join()
+    for name, s in stats.items():
+        logger.info(f"📊 {name}: {s['processed']} run(s), {s['failed']} failed, "
+                    f"avg {s['avg_seconds'] or 0:.1f}s, utilization {s['utilization']:.0%}")
+    return len(succeeded)
+
+
+def run_batch(manifest, concurrency=2, stages=None, metrics_port=None):
+    """
+    Run all jobs of the manifest. Returns True if every job succeeded.
+    `stages` ("source=2,...", "" for the defaults) runs them on the staged executor.
+    """
+    jobs, errors = load_manifest(manifest)
+    for number, error in errors:
+        logger.error(f"❌ Manifest line {number} skipped: {error}")
+    if not jobs:
+        return not errors
+
+    size = max(1, min(concurrency, len(jobs)))
+    pool = SessionPool(size, os.path.join(SESSION_DIR, "pool"), monitor=True)
+    # Parked jobs hold no session, so more jobs than sessions can be in flight
+    in_flight = min(len(jobs), pool.max_in_flight())
+    started = time.time()
+    logger.info(f"🚀 Batch of {len(jobs)} job(s) with {size} browser session(s)")
+
+    if metrics_port:
+        REGISTRY.serve(metrics_port)
+        logger.info(f"📊 Metrics at http://0.0.0.0:{metrics_port}/metrics")
+
+    try:
+        pool.warm_up()
+        if stages is not None:
+            succeeded = run_staged(pool, jobs, parse_stage_workers(stages, size, in_flight))
+        else:
+            with ThreadPoolExecutor(max_workers=in_flight) as executor:
+                succeeded = sum(executor.map(lambda args: run_on_pool(pool, args), jobs))
+    finally:
+        pool.shutdown()
+
+    logger.info(f"🏁 Batch finished: {succeeded}/{len(jobs)} succeeded in {time.time() - started:.1f}s")
+    return succeeded == len(jobs) and not errors
@@ -0,0 +1,341 @@
+"""
+Local stand-in for the TurboScribe web app (plus Zoom/OneDrive share pages),
+used by the offline benchmark. It serves the pages TurboScribeBot drives:
+
+    /login                  email/password form, sets a session cookie
+    /dashboard              language menu, upload / import-from-link, options,
+                            jobs table whose status changes over time
+    /transcript/<job>       export/download buttons, ChatGPT and translate panels
+    /rec/share/<id>         Zoom-like share page with passcode and download
+    /download/...           result and source files of configurable size
+    /media/<n>.mp3|.wav     short generated (silent) audio to import by link
+
+Processing delays and file sizes are configurable so runs are comparable.
+
+    python bench/fake_site.py --port 8765 --processing-delay 20 --file-size-mb 50
+"""
+import argparse
+import html
+import json
+import struct
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHUNK_SIZE = 64 * 1024
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz: 417-byte frames, 1152 samples each.
+# Zeroed side info and main data decode as silence.
+MP3_FRAME = b"\xff\xfb\x90\x00" + bytes(413)
+
+
+def silent_audio(name, seconds):
+    """A valid silent .mp3 (or .wav) of `seconds` seconds."""
+    if name.endswith(".wav"):
+        rate = 16000
+        data = bytes(rate * 2 * int(seconds))  # 16-bit mono
+        header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + len(data), b"WAVE", b"fmt ", 16,
+                             1, 1, rate, rate * 2, 2, 16, b"data", len(data))
+        return header + data
+    return MP3_FRAME * max(1, int(seconds * 44100 / 1152))
+
+
+class FakeState:
+    def __init__(self, queue_delay=2.0, processing_delay=10.0, summary_delay=3.0,
+                 file_size_mb=5.0, source_size_mb=20.0, media_seconds=30.0):
+        self.queue_delay = queue_delay
+        self.processing_delay = processing_delay
+        self.summary_delay = summary_delay
+        self.file_size = int(file_size_mb * 1024 * 1024)
+        self.source_size = int(source_size_mb * 1024 * 1024)
+        self.media_seconds = media_seconds
+        self.media = {}  # name -> generated audio bytes
+        self.sessions = set()
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def add_job(self, title):
+        job_id = uuid.uuid4().hex[:8]
+        with self.lock:
+            self.jobs[job_id] = {"id": job_id, "title": title, "created": time.time()}
+        return job_id
+
+    def status(self, job_id):
+        age = time.time() - self.jobs[job_id]["created"]
+        if age < self.queue_delay:
+            return "Queued"
+        if age < self.queue_delay + self.processing_delay:
+            return "Transcribing"
+        return "Completed"
+
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body>{body}</body></html>"""
+
+DASHBOARD = """
+<header>
+  <button id="language-toggle" onclick="document.getElementById('language-menu').hidden=false">English</button>
+  <ul id="language-menu" hidden>
+    <li><a href="/dashboard?lang=ar" data-lang="ar">العربية</a></li>
+    <li><a href="/dashboard?lang=en" data-lang="en">English</a></li>
+  </ul>
+</header>
+<form id="upload-form" method="post" action="/upload" enctype="multipart/form-data">
+  <input type="file" name="file" id="file-input">
+  <input type="url" name="link" id="link-input" placeholder="Import from link">
+  <select name="language" id="language-select">{languages}</select>
+  <select name="model" id="model-select">
+    <option value="base">base</option><option value="small">small</option><option value="large-v2">large-v2</option>
+  </select>
+  <label><input type="checkbox" name="speakers" id="speakers"> Recognize speakers</label>
+  <label><input type="checkbox" name="transcribe" id="transcribe"> Transcribe to English</label>
+  <label><input type="checkbox" name="restore" id="restore"> Restore audio</label>
+  <button type="submit" id="transcribe-button">Transcribe</button>
+</form>
+<table id="jobs-table"><tbody>{rows}</tbody></table>
+<script>setTimeout(() => location.reload(), 1000);</script>
+"""
+
+TRANSCRIPT = """
+<h1 id="transcript-title">{title}</h1>
+<a id="download-txt" href="/download/{job}/transcript.txt">Download</a>
+<a id="export-timestamps" href="/download/{job}/transcript_timestamps.txt">Export with timestamps</a>
+<a id="download-audio" href="/download/{job}/audio.mp3">Download audio</a>
+<button id="chatgpt-button" onclick="document.getElementById('chatgpt-panel').hidden=false">ChatGPT</button>
+<div id="chatgpt-panel" hidden>
+  <button id="short-summary" onclick="summarize('short')">Short summary</button>
+  <button id="detailed-summary" onclick="summarize('detailed')">Detailed summary</button>
+  <pre id="chatgpt-output"></pre>
+  <button id="chatgpt-close" onclick="document.getElementById('chatgpt-panel').hidden=true">Close</button>
+</div>
+<form id="translate-form" onsubmit="translate(event)">
+  <input name="target" id="translate-target"><button type="submit" id="translate-button">Translate</button>
+</form>
+<pre id="translate-output"></pre>
+<div id="transcript-text">{text}</div>
+<script>
+async function summarize(kind) {{
+  const r = await fetch('/api/{job}/summary?kind=' + kind);
+  document.getElementById('chatgpt-output').textContent = await r.text();
+}}
+async function translate(e) {{
+  e.preventDefault();
+  const r = await fetch('/api/{job}/translate?target=' + document.getElementById('translate-target').value);
+  document.getElementById('translate-output').textContent = await r.text();
+}}
+</script>
+"""
+
+ZOOM = """
+<form method="post" action="/rec/share/{rec}">
+  <input type="password" name="passcode" id="passcode">
+  <button type="submit" id="passcode_btn">Watch Recording</button>
+</form>
+"""
+
+ZOOM_PLAYER = """
+<video src="/download/source/{rec}.mp4"></video>
+<a id="download-recording" href="/download/source/{rec}.mp4" download>Download</a>
+"""
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        # --- helpers ---
+
+        def _session(self):
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            sid = cookie.get("session")
+            return sid.value if sid and sid.value in state.sessions else None
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            data = body.encode() if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _redirect(self, location, headers=None):
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+
+        def _page(self, title, body):
+            self._send(200, PAGE.format(title=html.escape(title), body=body))
+
+        def _form(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            if self.headers.get("Content-Type", "").startswith("multipart/"):
+                return {}  # uploaded file content is discarded
+            return {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+
+        def _stream_file(self, name, size, data=None, content_type="application/octet-stream"):
+            """
+            Serve `size` bytes (or `data`), honouring a Range header for
+            resume/segmented tests.
+            """
+            if data is not None:
+                size = len(data)
+            start, end = 0, size - 1
+            range_header = self.headers.get("Range")
+            if range_header and range_header.startswith("bytes="):
+                first, _, last = range_header[6:].partition("-")
+                start = int(first or 0)
+                end = int(last) if last else size - 1
+                if start >= size:
+                    self._send(416, b"", headers={"Content-Range": f"bytes */{size}"})
+                    return
+            length = end - start + 1
+
+            self.send_response(206 if range_header else 200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+            if range_header:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+
+            if data is not None:
+                self.wfile.write(data[start:end + 1])
+                return
+            block = bytes(range(256)) * (CHUNK_SIZE // 256)
+            sent = 0
+            while sent < length:
+                n = min(CHUNK_SIZE, length - sent)
+                self.wfile.write(block[:n])
+                sent += n
+
+        # --- routes ---
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+
+            if url.path in ("/", "/login"):
+                self._page("Log in", """
+                    <form method="post" action="/login">
+                      <input type="email" name="email" id="email">
+                      <input type="password" name="password" id="password">
+                      <button type="submit" id="login-button">Log in</button>
+                    </form>""")
+            elif not self._session() and parts and parts[0] in ("dashboard", "transcript", "api"):
+                self._redirect("/login")
+            elif url.path == "/dashboard":
+                rows = "".join(
+                    f'<tr data-job="{j["id"]}"><td><a href="/transcript/{j["id"]}">{html.escape(j["title"])}</a></td>'
+                    f'<td class="status">{state.status(j["id"])}</td></tr>'
+                    for j in sorted(state.jobs.values(), key=lambda j: -j["created"])
+                )
+                languages = "".join(f'<option value="{c}">{c}</option>' for c in ("ar", "en", "fr", "de"))
+                self._page("Dashboard", DASHBOARD.format(rows=rows, languages=languages))
+            elif parts[:1] == ["transcript"] and len(parts) == 2 and parts[1] in state.jobs:
+                job = state.jobs[parts[1]]
+                if state.status(job["id"]) != "Completed":
+                    self._redirect("/dashboard")
+                    return
+                self._page(job["title"], TRANSCRIPT.format(
+                    title=html.escape(job["title"]), job=job["id"], text="Lorem ipsum " * 200))
+            elif parts[:1] == ["api"] and len(parts) == 3:
+                time.sleep(state.summary_delay)
+                query = parse_qs(url.query)
+                self._send(200, f"{parts[2]} {query}: " + "lorem ipsum " * 50, "text/plain; charset=utf-8")
+            elif parts[:2] == ["api", "jobs"]:
+                self._send(200, json.dumps({j: state.status(j) for j in state.jobs}), "application/json")
+            elif parts[:2] == ["download", "source"] and len(parts) == 3:
+                self._stream_file(parts[2], state.source_size)
+            elif parts[:1] == ["download"] and len(parts) == 3:
+                size = state.file_size if parts[2].endswith(".mp3") else 200 * 1024
+                self._stream_file(parts[2], size)
+            elif parts[:1] == ["media"] and len(parts) == 2 and parts[1].endswith((".mp3", ".wav")):
+                with state.lock:
+                    data = state.media.setdefault(parts[1], silent_audio(parts[1], state.media_seconds))
+                kind = "audio/wav" if parts[1].endswith(".wav") else "audio/mpeg"
+                self._stream_file(parts[1], len(data), data, kind)
+            elif parts[:2] == ["rec", "share"] and len(parts) == 3:
+                self._page("Zoom recording", ZOOM.format(rec=parts[2]))
+            elif parts[:1] == ["onedrive"] and len(parts) == 2:
+                self._page("OneDrive", ZOOM_PLAYER.format(rec=parts[1]))
+            else:
+                self._send(404, "Not found")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            form = self._form()
+
+            if url.path == "/login":
+                sid = uuid.uuid4().hex
+                state.sessions.add(sid)
+                self._redirect("/dashboard", {"Set-Cookie": f"session={sid}; Path=/; HttpOnly"})
+            elif url.path == "/upload":
+                if not self._session():
+                    self._redirect("/login")
+                    return
+                state.add_job(form.get("link") or "Uploaded file")
+                self._redirect("/dashboard")
+            elif parts[:2] == ["rec", "share"] and len(parts) == 3:
+                self._page("Zoom recording", ZOOM_PLAYER.format(rec=parts[2]))
+            else:
+                self._send(404, "Not found")
+
+    return Handler
+
+
+def start(port=0, **config):
+    """Start the fake site in a background thread. Returns (server, base_url)."""
+    state = FakeState(**config)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def add_arguments(parser):
+    parser.add_argument("--queue-delay", type=float, default=2.0, help="Seconds a job stays queued")
+    parser.add_argument("--processing-delay", type=float, default=10.0, help="Seconds of fake transcription")
+    parser.add_argument("--summary-delay", type=float, default=3.0, help="Seconds per ChatGPT/translate request")
+    parser.add_argument("--file-size-mb", type=float, default=5.0, help="Size of the audio result file")
+    parser.add_argument("--source-size-mb", type=float, default=20.0, help="Size of Zoom/OneDrive recordings")
+    parser.add_argument("--media-seconds", type=float, default=30.0, help="Length of the /media audio files jobs import")
+
+
+def config_from_args(args):
+    return {
+        "queue_delay": args.queue_delay,
+        "processing_delay": args.processing_delay,
+        "summary_delay": args.summary_delay,
+        "file_size_mb": args.file_size_mb,
+        "source_size_mb": args.source_size_mb,
+        "media_seconds": args.media_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake TurboScribe site for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server, url = start(args.port, **config_from_args(args))
+    print(f"🧪 Fake TurboScribe running at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
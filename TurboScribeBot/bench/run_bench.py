@@ -0,0 +1,237 @@
+"""
+Offline benchmark for TurboScribeBot.
+
+Starts the fake TurboScribe site (bench/fake_site.py), runs N jobs through
+`main.py` (one process per job, like the API does today) or through
+`worker.py` (warm sessions) in headless Chrome, and reports:
+
+    - jobs/hour
+    - p50 / p95 latency per step (from each job's progress_<id>.jsonl)
+    - peak RSS of the bot process tree (Python + chromedriver + Chrome)
+
+Results are written as JSON so runs can be compared:
+
+    python bench/run_bench.py --mode cli --jobs 5 --out bench_cli.json
+    python bench/run_bench.py --mode worker --jobs 5 --compare bench_cli.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import fake_site
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+# --- process tree RSS sampling (Linux /proc) ---
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _tree_rss(pid):
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/statm") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            continue
+        stack.extend(_children(p))
+    return total
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.pids = set()
+        self.peak = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            current = sum(_tree_rss(pid) for pid in list(self.pids))
+            self.peak = max(self.peak, current)
+
+
+# --- statistics ---
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = (len(values) - 1) * q
+    low = int(index)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (index - low)
+
+
+def step_durations(output_base, job_ids):
+    durations, statuses = {}, {}
+    for job_id in job_ids:
+        path = os.path.join(output_base, job_id, f"progress_{job_id}.jsonl")
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    event = json.loads(line)
+                    if event["event"] == "step_end":
+                        durations.setdefault(event["step"], []).append(event["duration"])
+                    elif event["event"] == "job_end":
+                        statuses[job_id] = event["status"]
+        except (OSError, ValueError):
+            statuses.setdefault(job_id, "missing")
+    return durations, statuses
+
+
+# --- runners ---
+
+def job_spec(index, args, base_url, output_base):
+    job = {"id": f"bench-{index}", "output": output_base, "language": "ar"}
+    if args.source:
+        job.update({"source": args.source, "link": f"{base_url}/rec/share/rec{index}",
+                    "passcode": "bench", "with_transcription": True})
+    else:
+        job["link"] = f"{base_url}/media/{index}.mp3"
+    for flag in args.features:
+        job[flag] = True
+    return job
+
+
+def run_cli(jobs, env, sampler, concurrency):
+    from main import job_argv
+
+    running = []
+    pending = list(jobs)
+    while pending or running:
+        while pending and len(running) < concurrency:
+            argv = job_argv(pending.pop(0))
+            proc = subprocess.Popen([sys.executable, "main.py"] + argv, cwd=BOT_DIR, env=env,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            sampler.pids.add(proc.pid)
+            running.append(proc)
+        for proc in list(running):
+            if proc.poll() is not None:
+                sampler.pids.discard(proc.pid)
+                running.remove(proc)
+        time.sleep(0.2)
+
+
+def run_worker(jobs, env, sampler, concurrency, work_dir):
+    from worker import DirectoryQueue
+
+    queue_dir = os.path.join(work_dir, "queue")
+    job_queue = DirectoryQueue(queue_dir)
+    proc = subprocess.Popen([sys.executable, "worker.py", "--queue", queue_dir, "--sessions", str(concurrency)],
+                            cwd=BOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    sampler.pids.add(proc.pid)
+    try:
+        for job in jobs:
+            job_queue.submit(job)
+        while len(os.listdir(job_queue.dirs["done"])) + len(os.listdir(job_queue.dirs["failed"])) < len(jobs):
+            if proc.poll() is not None:
+                raise RuntimeError("worker exited early")
+            time.sleep(0.5)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+        sampler.pids.discard(proc.pid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TurboScribeBot offline benchmark")
+    parser.add_argument("--mode", choices=["cli", "worker"], default="cli")
+    parser.add_argument("--jobs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel processes / warm sessions")
+    parser.add_argument("--source", choices=["zoom", "onedrive"], help="Benchmark the source download flow")
+    parser.add_argument("--features", nargs="*", default=["timestamps", "short_summary", "download_audio"],
+                        help="Feature flags set on every job")
+    parser.add_argument("--out", help="Write results as JSON")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    fake_site.add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BOT_DIR)
+    server, base_url = fake_site.start(**fake_site.config_from_args(args))
+
+    work_dir = tempfile.mkdtemp(prefix="turboscribe_bench_")
+    output_base = os.path.join(work_dir, "outputs")
+    env = dict(os.environ,
+               TURBOSCRIBE_URL=base_url,
+               EMAIL="bench@example.com",
+               PASSWORD="bench",
+               RESULT_CACHE_DIR="",
+               SESSION_DIR=os.path.join(work_dir, "sessions"),
+               METRICS_DIR=os.path.join(work_dir, "metrics"))
+
+    jobs = [job_spec(i, args, base_url, output_base) for i in range(args.jobs)]
+
+    sampler = RssSampler()
+    sampler.start()
+    started = time.time()
+    try:
+        if args.mode == "cli":
+            run_cli(jobs, env, sampler, args.concurrency)
+        else:
+            run_worker(jobs, env, sampler, args.concurrency, work_dir)
+    finally:
+        elapsed = time.time() - started
+        sampler.stop_event.set()
+        server.shutdown()
+
+    durations, statuses = step_durations(output_base, [job["id"] for job in jobs])
+    results = {
+        "mode": args.mode,
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "jobs_per_hour": round(args.jobs / elapsed * 3600, 1),
+        "completed": sum(1 for s in statuses.values() if s == "completed"),
+        "peak_rss_mb": round(sampler.peak / 1024 / 1024, 1),
+        "steps": {
+            step: {
+                "p50": round(percentile(values, 0.5), 3),
+                "p95": round(percentile(values, 0.95), 3),
+                "n": len(values)
+            }
+            for step, values in sorted(durations.items())
+        },
+        "output_dir": output_base
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    print(f"\n📊 {args.mode}: {results['completed']}/{args.jobs} jobs completed in {results['elapsed_s']}s")
+    print(f"   jobs/hour: {results['jobs_per_hour']}   peak RSS: {results['peak_rss_mb']} MB")
+    if previous:
+        print(f"   (previous: {previous['jobs_per_hour']} jobs/hour, {previous['peak_rss_mb']} MB)")
+    print(f"\n   {'step':<34}{'p50 s':>10}{'p95 s':>10}{'n':>5}")
+    for step, s in results["steps"].items():
+        line = f"   {step:<34}{s['p50']:>10}{s['p95']:>10}{s['n']:>5}"
+        old = previous and previous["steps"].get(step)
+        if old:
+            line += f"   (p50 {s['p50'] - old['p50']:+.3f})"
+        print(line)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Network blocking profile for the automated Chrome.
+
+Requests the job flow never needs (images, web fonts, analytics, chat widgets,
+media previews) are blocked through CDP `Network.setBlockedURLs`. The profile
+is chosen with BLOCK_PROFILE:
+
+    off       nothing is blocked
+    default   images, fonts, analytics, widgets, media
+    strict    default + stylesheets
+    <path>    a JSON file: {"block": ["images", "*.example.com*", ...],
+                            "sites": {"zoom": ["media"]}, "estimates": {...}}
+
+`sites` lists, per site, the categories that stay allowed there: the Zoom and
+OneDrive flows download recordings (media), and downloads started from the
+TurboScribe page lift the media block for their duration.
+
+The reCAPTCHA scripts (google.com/recaptcha, gstatic.com/recaptcha) are never
+blocked, but the widget's challenge images, its fonts (fonts.gstatic.com) and,
+under strict, its stylesheets match the categories above, and
+Network.setBlockedURLs has no allow patterns to exempt them. The login form
+and solve_recaptcha_2captcha() therefore run with blocking suspended.
+
+Blocked requests are read back from Chrome's performance log and recorded in
+the report (`network`) with an estimate of the bytes saved, using an average
+size per category (`estimates`), since a blocked response is never seen.
+Chrome buffers that log until it is read, so it is also drained every
+BLOCK_LOG_DRAIN seconds while the browser runs (long transcription waits).
+"""
+import fnmatch
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from metrics import record
+
+BLOCK_PROFILE = os.getenv("BLOCK_PROFILE", "default")
+BLOCK_LOG_DRAIN = float(os.getenv("BLOCK_LOG_DRAIN", 30))
+
+CATEGORIES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+                  "*connect.facebook.net*", "*hotjar.com*", "*clarity.ms*", "*segment.io*",
+                  "*cdn.segment.com*", "*mixpanel.com*", "*amplitude.com*", "*fullstory.com*",
+                  "*posthog.com*", "*plausible.io*"],
+    "widgets": ["*widget.intercom.io*", "*intercomcdn.com*", "*client.crisp.chat*", "*embed.tawk.to*",
+                "*static.zdassets.com*", "*js.driftt.com*", "*js.hs-scripts.com*"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.wav", "*.m3u8"],
+    "styles": ["*.css"],
+}
+
+PROFILES = {
+    "off": [],
+    "default": ["images", "fonts", "analytics", "widgets", "media"],
+    "strict": ["images", "fonts", "analytics", "widgets", "media", "styles"],
+}
+
+# Categories that stay allowed per site
+SITES = {
+    "turboscribe": [],
+    "zoom": ["media"],
+    "onedrive": ["media"],
+}
+
+# Average transfer size (bytes) of one blocked request, per category
+ESTIMATES = {
+    "images": 30 * 1024,
+    "fonts": 40 * 1024,
+    "analytics": 60 * 1024,
+    "widgets": 250 * 1024,
+    "media": 2 * 1024 * 1024,
+    "styles": 30 * 1024,
+    "custom": 20 * 1024,
+}
+
+# Dropped from every profile (the widget's images, fonts and styles are only
+# covered by NetworkBlocker.suspended())
+ALWAYS_ALLOWED = ("*google.com/recaptcha*", "*gstatic.com/recaptcha*", "*recaptcha.net*")
+
+
+def load_profile(name=BLOCK_PROFILE):
+    """{"name", "block": {category: [patterns]}, "sites", "estimates"} for a profile name or JSON file."""
+    sites = {site: list(allowed) for site, allowed in SITES.items()}
+    estimates = dict(ESTIMATES)
+    if name in PROFILES:
+        entries = PROFILES[name]
+    else:
+        with open(name, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data.get("block", [])
+        sites.update(data.get("sites", {}))
+        estimates.update(data.get("estimates", {}))
+
+    block = {}
+    for entry in entries:
+        if entry in CATEGORIES:
+            block[entry] = list(CATEGORIES[entry])
+        else:
+            block.setdefault("custom", []).append(entry)
+    for category, patterns in block.items():
+        block[category] = [p for p in patterns if not any(fnmatch.fnmatch(p, a) for a in ALWAYS_ALLOWED)]
+    return {"name": os.path.basename(name), "block": block, "sites": sites, "estimates": estimates}
+
+
+def category_of(url, block):
+    for category, patterns in block.items():
+        if any(fnmatch.fnmatch(url, p) for p in patterns):
+            return category
+    return None
+
+
+class NetworkBlocker:
+    """Applies the profile to one bot's driver and accounts for what it blocked."""
+
+    def __init__(self, bot, profile=None):
+        self.bot = bot
+        self.profile = profile if profile is not None else load_profile()
+        self.site = "turboscribe"
+        self.lifted = set()
+        self.urls = {}  # requestId -> url, until the request ends
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.drainer = None
+
+    @property
+    def enabled(self):
+        return bool(self.profile["block"])
+
+    def chrome_options(self, options):
+        """Turn on the performance log the blocked requests are read from."""
+        if not self.enabled:
+            return
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+    def patterns(self):
+        allowed = set(self.profile["sites"].get(self.site, [])) | self.lifted
+        return [p for category, patterns in self.profile["block"].items()
+                if category not in allowed for p in patterns]
+
+    def apply(self):
+        if not self.enabled or not self.bot.driver:
+            return
+        try:
+            self.bot.driver.execute_cdp_cmd("Network.enable", {})
+            self.bot.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns()})
+        except WebDriverException as e:
+            self.bot.logger.warning(f"⚠️ Network blocking unavailable: {e}")
+
+    def install(self):
+        self.apply()
+        if self.enabled:
+            self.bot.logger.info(f"🚫 Network blocking profile '{self.profile['name']}' "
+                                 f"({', '.join(self.profile['block'])})")
+            self._start_draining()
+
+    def _start_draining(self, interval=BLOCK_LOG_DRAIN):
+        if interval <= 0 or (self.drainer and self.drainer.is_alive() and not self.stop_event.is_set()):
+            return
+        stop_event = self.stop_event = threading.Event()
+
+        def drain():
+            while not stop_event.wait(interval) and self.bot.driver:
+                self.collect()
+
+        self.drainer = threading.Thread(target=drain, name="perf-log-drain", daemon=True)
+        self.drainer.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def use_site(self, site):
+        """Switch to the allowlist of `site` (zoom, onedrive, turboscribe)."""
+        if site == self.site:
+            return
+        self.collect()
+        self.site = site
+        self.apply()
+
+    @contextmanager
+    def allowing(self, *categories):
+        """Lift the block on `categories` for the duration of a step (e.g. a media download)."""
+        added = set(categories) - self.lifted
+        self.collect()
+        self.lifted |= added
+        self.apply()
+        try:
+            yield
+        finally:
+            self.lifted -= added
+            self.apply()
+
+    @contextmanager
+    def suspended(self):
+        """Block nothing for the duration of a step (reCAPTCHA widgets)."""
+        if not self.enabled or not self.bot.driver:
+            yield
+            return
+        self.collect()
+        try:
+            self.bot.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        except WebDriverException as e:
+            self.bot.logger.warning(f"⚠️ Could not lift network blocking: {e}")
+        try:
+            yield
+        finally:
+            self.apply()
+
+    def collect(self):
+        """Drain the performance log and add blocked requests / loaded bytes to the report."""
+        if not self.enabled or not self.bot.driver:
+            return
+        with self.lock:
+            self._collect()
+
+    def _collect(self):
+        try:
+            entries = self.bot.driver.get_log("performance")
+        except (WebDriverException, AttributeError):
+            return  # AttributeError: the driver was quit meanwhile
+
+        blocked, loaded = {}, 0
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                self.urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+            elif method == "Network.loadingFinished":
+                self.urls.pop(params.get("requestId"), None)
+                loaded += params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed":
+                url = self.urls.pop(params.get("requestId"), "")
+                if params.get("blockedReason") == "inspector":
+                    category = category_of(url, self.profile["block"]) or "custom"
+                    blocked[category] = blocked.get(category, 0) + 1
+        if not blocked and not loaded:
+            return
+
+        saved = sum(count * self.profile["estimates"].get(category, ESTIMATES["custom"])
+                    for category, count in blocked.items())
+        if saved:
+            record(self.bot, "network_blocked", size=saved)
+        with self.bot.report_lock:
+            network = self.bot.report.setdefault("network", {
+                "profile": self.profile["name"], "blocked_requests": {},
+                "bytes_saved_estimate": 0, "bytes_loaded": 0})
+            for category, count in blocked.items():
+                network["blocked_requests"][category] = network["blocked_requests"].get(category, 0) + count
+            network["bytes_saved_estimate"] += saved
+            network["bytes_loaded"] += loaded
@@ -0,0 +1,178 @@
+"""
+Reusable 2Captcha client for Google reCAPTCHA.
+
+- one persistent, pooled HTTP session for all requests
+- adaptive polling: the first poll happens after the typical solve time
+  (learned from previous solves), then backs off
+- future based API, so the bot can start a solve as soon as the sitekey is
+  visible and keep filling the form while 2Captcha works:
+
+    future = solver.solve_async(sitekey, page_url, logger=bot.logger, bot=bot)
+    ... fill email / password ...
+    solver.inject(driver, future.result())
+
+(TurboScribeBot.login does this through begin_captcha() / finish_captcha().)
+The solver is shared per API key across jobs, so the job logger and the bot
+the solve time is recorded for are passed with every call rather than
+stored on the solver.
+
+`CAPTCHA_API_URL` can point the client at a local fake 2Captcha server.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import current_bot, record
+
+CAPTCHA_API_URL = os.getenv("CAPTCHA_API_URL", "http://2captcha.com")
+
+
+class CaptchaError(Exception):
+    pass
+
+
+class CaptchaSolver:
+    def __init__(self, api_key, base_url=CAPTCHA_API_URL,
+                 typical_solve_time=20.0, retry_interval=3.0, max_interval=10.0, timeout=180, max_workers=4):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.typical_solve_time = typical_solve_time
+        self.retry_interval = retry_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="captcha")
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _log(logger, level, message):
+        if logger:
+            getattr(logger, level)(message)
+
+    # --- 2Captcha protocol ---
+
+    def submit(self, sitekey, page_url, enterprise=True, logger=None):
+        payload = {
+            "key": self.api_key,
+            "method": "userrecaptcha",
+            "googlekey": sitekey,
+            "pageurl": page_url,
+            "json": 1,
+            "enterprise": int(enterprise)
+        }
+        resp = self.session.post(f"{self.base_url}/in.php", data=payload, timeout=30).json()
+        if resp.get("status") != 1:
+            raise CaptchaError(f"2Captcha request failed: {resp}")
+        self._log(logger, "info", f"📤 Captcha sent to 2Captcha (id {resp['request']})")
+        return resp["request"]
+
+    def poll(self, captcha_id, logger=None, bot=None):
+        """Wait for the token, first poll at the typical solve time, then back off."""
+        started = time.time()
+        delay = self.typical_solve_time
+        attempt = 0
+
+        while True:
+            remaining = self.timeout - (time.time() - started)
+            if remaining <= 0:
+                raise CaptchaError("2Captcha failed to solve reCAPTCHA in time")
+            time.sleep(min(delay, remaining))
+            attempt += 1
+
+            res = self.session.get(f"{self.base_url}/res.php", params={
+                "key": self.api_key,
+                "action": "get",
+                "id": captcha_id,
+                "json": 1
+            }, timeout=30).json()
+
+            if res.get("status") == 1:
+                elapsed = time.time() - started
+                self._learn(elapsed)
+                record(bot or current_bot(), "captcha_service", elapsed, retries=attempt - 1)
+                self._log(logger, "info", f"✅ Captcha solved in {elapsed:.1f}s (poll {attempt})")
+                return res["request"]
+            if res.get("request") != "CAPCHA_NOT_READY":
+                raise CaptchaError(f"2Captcha error: {res}")
+
+            self._log(logger, "info", f"⏳ Waiting for captcha solution (poll {attempt})...")
+            delay = self.retry_interval if attempt == 1 else min(delay * 1.5, self.max_interval)
+
+    def _learn(self, elapsed):
+        # Exponential moving average of observed solve times
+        with self.lock:
+            self.typical_solve_time = 0.7 * self.typical_solve_time + 0.3 * elapsed
+
+    # --- public API ---
+
+    def solve(self, sitekey, page_url, enterprise=True, logger=None, bot=None):
+        return self.poll(self.submit(sitekey, page_url, enterprise, logger), logger, bot)
+
+    def solve_async(self, sitekey, page_url, enterprise=True, logger=None, bot=None):
+        """
+        Start solving in the background and return a concurrent.futures.Future.
+        The calling thread's bot is captured here: executor threads have none.
+        """
+        return self.executor.submit(self.solve, sitekey, page_url, enterprise, logger, bot or current_bot())
+
+    async def asolve(self, sitekey, page_url, enterprise=True, logger=None, bot=None):
+        """asyncio variant of solve()."""
+        return await asyncio.wrap_future(self.solve_async(sitekey, page_url, enterprise, logger, bot))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    # --- browser side ---
+
+    @staticmethod
+    def find_sitekey(driver):
+        """Return the reCAPTCHA sitekey on the current page, or None if there is no captcha."""
+        from selenium.webdriver.common.by import By
+
+        frames = driver.find_elements(By.CSS_SELECTOR, "iframe[title='reCAPTCHA']")
+        if not frames:
+            return None
+        src = frames[0].get_attribute("src") or ""
+        if "k=" not in src:
+            return None
+        return src.split("k=")[1].split("&")[0]
+
+    @staticmethod
+    def inject(driver, token):
+        driver.execute_script("""
+            let response = document.getElementById('g-recaptcha-response');
+            if (!response) {
+                response = document.createElement('textarea');
+                response.id = 'g-recaptcha-response';
+                response.name = 'g-recaptcha-response';
+                response.style.display = 'block';
+                document.body.appendChild(response);
+            }
+            response.innerHTML = arguments[0];
+            response.value = arguments[0];
+            response.dispatchEvent(new Event('change', { bubbles: true }));
+        """, token)
+
+
+_solvers = {}
+_solvers_lock = threading.Lock()
+
+
+def get_solver(api_key):
+    """Shared solver per API key, so the HTTP pool and learned timings are reused."""
+    with _solvers_lock:
+        solver = _solvers.get(api_key)
+        if solver is None:
+            solver = _solvers[api_key] = CaptchaSolver(api_key)
+    return solver
@@ -0,0 +1,129 @@
+"""
+Fast browser start.
+
+- The chromedriver / Chrome binary paths and versions resolved on the first
+  run are kept in `$BROWSER_DIR/manifest.json`. Later runs pass them straight
+  to Selenium, so the driver is not looked up and validated again. An entry
+  is dropped when a binary disappears or changes (mtime), e.g. after an
+  upgrade.
+- Chrome's data/cache/crash folders come from a profile template created
+  once under `$BROWSER_DIR/template`. Each browser locks one reusable slot
+  (`$BROWSER_DIR/profiles/slot-N`) instead of creating a new temp tree, and
+  keeps the slot's disk cache warm for the next run.
+"""
+import fcntl
+import json
+import os
+import shutil
+import time
+
+BROWSER_DIR = os.getenv("BROWSER_DIR", "browser")
+MANIFEST_PATH = os.path.join(BROWSER_DIR, "manifest.json")
+TEMPLATE_DIR = os.path.join(BROWSER_DIR, "template")
+PROFILES_DIR = os.path.join(BROWSER_DIR, "profiles")
+PROFILE_SUBDIRS = ("data", "cache", "crash")
+MAX_SLOTS = 64
+
+CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Return the cached binaries if they are still in place, else None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    for key in ("chromedriver", "chrome"):
+        entry = manifest.get(key)
+        if entry and _mtime(entry["path"]) != entry["mtime"]:
+            return None
+    return manifest if manifest.get("chromedriver") else None
+
+
+def locate_binaries():
+    """Cheap lookup for the first run: env overrides, then PATH. Missing entries are None."""
+    driver = os.getenv("CHROMEDRIVER_PATH") or shutil.which("chromedriver")
+    chrome = os.getenv("CHROME_BIN")
+    if not chrome:
+        chrome = next((p for p in map(shutil.which, CHROME_CANDIDATES) if p), None)
+    return driver, chrome
+
+
+def save_manifest(driver_path, chrome_path, capabilities, path=MANIFEST_PATH):
+    """Record the binaries a browser actually started with."""
+    chrome_caps = capabilities.get("chrome", {})
+    manifest = {
+        "chromedriver": {
+            "path": driver_path,
+            "mtime": _mtime(driver_path),
+            "version": chrome_caps.get("chromedriverVersion", "").split(" ")[0] or None,
+        },
+        "chrome": {
+            "path": chrome_path,
+            "mtime": _mtime(chrome_path),
+            "version": capabilities.get("browserVersion"),
+        } if chrome_path else None,
+        "resolved_at": time.time(),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def clear_manifest(path=MANIFEST_PATH):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def ensure_template(template_dir=TEMPLATE_DIR):
+    for name in PROFILE_SUBDIRS:
+        os.makedirs(os.path.join(template_dir, name), exist_ok=True)
+    return template_dir
+
+
+class ProfileSlot:
+    """A locked, reusable profile folder for one running browser."""
+
+    def __init__(self, path, lock_file):
+        self.path = path
+        self.lock_file = lock_file
+
+    def dir(self, name):
+        return os.path.join(self.path, name)
+
+    def release(self):
+        if self.lock_file:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+
+    @classmethod
+    def acquire(cls, profiles_dir=PROFILES_DIR, template_dir=TEMPLATE_DIR):
+        """Lock the first free slot, creating it from the template if needed."""
+        os.makedirs(profiles_dir, exist_ok=True)
+        for index in range(MAX_SLOTS):
+            path = os.path.join(profiles_dir, f"slot-{index}")
+            lock_file = open(f"{path}.lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            if not os.path.isdir(path):
+                shutil.copytree(ensure_template(template_dir), path)
+            return cls(path, lock_file)
+        raise RuntimeError(f"All {MAX_SLOTS} browser profile slots are in use")
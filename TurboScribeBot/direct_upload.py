@@ -0,0 +1,179 @@
+"""
+Direct, resumable upload of local files with the browser's session cookies.
+
+`upload_file()` hands the file to the page's file input, so Chrome buffers it
+whole, reports no progress and starts over after any network error. The
+direct path sends the file to the resumable upload session the web uploader
+uses (`bot.upload_target()`), in fixed-size chunks read from disk one at a
+time:
+
+    PUT <session_url>   Content-Range: bytes <start>-<end>/<total>
+        308 Resume Incomplete, Range: bytes=0-<confirmed>   next chunk
+        200 / 201                                            upload complete
+
+After a failed chunk the confirmed offset is queried (`Content-Range:
+bytes */<total>`) and the upload continues from there. The session URL is
+kept in `.upload_<id>.json` next to the report, so `--resume` continues an
+interrupted upload of the same file instead of sending it again.
+"""
+import json
+import os
+import re
+import time
+
+import requests
+
+UPLOAD_CHUNK_MB = int(os.getenv("UPLOAD_CHUNK_MB", 8))
+CHUNK_ALIGN = 256 * 1024  # resumable sessions take chunks in multiples of 256 KiB
+
+
+class UploadError(Exception):
+    pass
+
+
+def _file_identity(path):
+    st = os.stat(path)
+    return {"name": os.path.basename(path), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+class DirectUploader:
+    def __init__(self, session, logger=None, chunk_size=UPLOAD_CHUNK_MB * 1024 * 1024,
+                 retries=5, timeout=(10, 120), on_progress=None):
+        self.session = session
+        self.logger = logger
+        self.chunk_size = max(CHUNK_ALIGN, chunk_size // CHUNK_ALIGN * CHUNK_ALIGN)
+        self.retries = retries
+        self.timeout = timeout
+        self.on_progress = on_progress  # (sent, total) after every confirmed chunk
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    # --- resume state ---
+
+    @staticmethod
+    def _load_state(state_path, identity):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get("file") == identity else None
+
+    @staticmethod
+    def _save_state(state_path, state):
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    # --- protocol ---
+
+    @staticmethod
+    def _confirmed(response):
+        """Bytes the server holds after a 308 answer."""
+        match = re.match(r"bytes=0-(\d+)", response.headers.get("Range", ""))
+        return int(match.group(1)) + 1 if match else 0
+
+    def _headers(self, target, content_range):
+        headers = dict(target.get("headers", {}))
+        headers["Content-Range"] = content_range
+        return headers
+
+    def query_offset(self, target, total):
+        """Confirmed offset of an existing session, None if the session is gone."""
+        return self._query(target, total)[0]
+
+    def _query(self, target, total):
+        """(confirmed offset or None, the completing response once the server has it all)"""
+        response = self.session.put(target["session_url"], data=b"", timeout=self.timeout,
+                                    headers=self._headers(target, f"bytes */{total}"))
+        if response.status_code == 308:
+            return self._confirmed(response), None
+        if response.status_code in (200, 201):
+            return total, response
+        return None, None
+
+    def _send(self, target, f, offset, total):
+        f.seek(offset)
+        chunk = f.read(min(self.chunk_size, total - offset))
+        end = offset + len(chunk) - 1
+        response = self.session.put(target["session_url"], data=chunk, timeout=self.timeout,
+                                    headers=self._headers(target, f"bytes {offset}-{end}/{total}"))
+        if response.status_code == 308:
+            return self._confirmed(response), None
+        if response.status_code in (200, 201):
+            return total, response
+        response.raise_for_status()
+        raise UploadError(f"Unexpected upload answer {response.status_code}")
+
+    def upload(self, path, new_target, state_path):
+        """
+        Upload `path`; `new_target()` opens a new upload session
+        ({"session_url", "headers"}) when there is none to resume.
+        Returns {"size", "seconds", "bytes_per_sec", "resumed_from", "retries", "target", "response"}.
+        """
+        identity = _file_identity(path)
+        total = identity["size"]
+        if not total:
+            raise UploadError("Empty file")
+        started = time.time()
+
+        state = self._load_state(state_path, identity)
+        offset, response = None, None
+        if state:
+            try:
+                offset, response = self._query(state["target"], total)
+            except requests.RequestException:
+                offset = None
+            if offset is None:
+                self._log("info", "📤 Previous upload session expired, starting over")
+        if offset is None:
+            state = {"file": identity, "target": new_target()}
+            offset = 0
+            self._save_state(state_path, state)
+        target = state["target"]
+        resumed_from = offset
+        if offset:
+            self._log("info", f"📤 Resuming upload at {offset / 1024 / 1024:.1f} of {total / 1024 / 1024:.1f} MB")
+
+        failures, retries = 0, 0
+        with open(path, "rb") as f:
+            while offset < total:
+                try:
+                    confirmed, response = self._send(target, f, offset, total)
+                    if confirmed <= offset:
+                        # e.g. a 308 without Range: counts against the retries
+                        raise UploadError(f"Chunk at {offset} not confirmed (server holds {confirmed} bytes)")
+                    offset, failures = confirmed, 0
+                    if self.on_progress:
+                        self.on_progress(offset, total)
+                except (requests.RequestException, UploadError) as e:
+                    failures += 1
+                    retries += 1
+                    if failures > self.retries:
+                        raise UploadError(f"Upload failed at {offset} of {total} bytes: {e}") from e
+                    self._log("warning", f"⚠️ Upload chunk at {offset} failed ({e}), retry {failures}/{self.retries}")
+                    time.sleep(min(2 ** failures, 30))
+                    try:
+                        confirmed, response = self._query(target, total)
+                    except requests.RequestException:
+                        continue
+                    if confirmed is None:
+                        raise UploadError("Upload session lost") from e
+                    offset = confirmed
+
+        try:
+            os.remove(state_path)
+        except FileNotFoundError:
+            pass
+
+        seconds = max(time.time() - started, 0.001)
+        sent = total - resumed_from
+        try:
+            answer = response.json() if response is not None else None
+        except ValueError:
+            answer = None
+        return {"size": total, "seconds": round(seconds, 3), "bytes_per_sec": int(sent / seconds),
+                "resumed_from": resumed_from, "retries": retries, "target": target, "response": answer}
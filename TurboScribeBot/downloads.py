@@ -0,0 +1,258 @@
+"""
+Event driven tracking of Chrome downloads in a folder.
+
+Chrome writes every download to `<name>.crdownload` and renames it to the
+final name when it is complete. On Linux the tracker watches the folder with
+inotify and sees each rename the moment it happens; elsewhere it falls back
+to a fast directory scan. Every completed file is reported with its size,
+duration and throughput.
+
+    tracker = DownloadTracker(output_dir)
+    tracker.start()          # arm *before* clicking the download button
+    ... click ...
+    files = tracker.wait()   # [{"file": ..., "size": ..., "seconds": ..., "bytes_per_sec": ...}]
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+TEMP_SUFFIX = ".crdownload"
+IGNORED_SUFFIXES = (".log", ".tmp", ".json", ".jsonl")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _inotify():
+    """Return libc with inotify support, or None on platforms without it."""
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1
+            _libc = libc
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+class DownloadError(RuntimeError):
+    """Every tracked download failed or was cancelled."""
+
+
+def _ignored(name):
+    return name.startswith(".") or name.endswith(IGNORED_SUFFIXES)
+
+
+class DownloadTracker:
+    def __init__(self, directory, logger=None, poll_interval=0.2):
+        self.directory = directory
+        self.logger = logger
+        self.poll_interval = poll_interval
+        self.fd = None
+        self.in_progress = {}   # temp name -> start time
+        self.moves = {}         # inotify cookie -> (temp name, start time)
+        self.completed = []
+        self.failed = []
+        self.baseline = {}
+
+    # --- lifecycle ---
+
+    def start(self):
+        """Arm the tracker. Only downloads started after this call are reported."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.baseline = self._scan()
+        for name in self.baseline:
+            if name.endswith(TEMP_SUFFIX):
+                self.in_progress[name] = time.time()
+
+        libc = _inotify()
+        if libc:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            mask = IN_CREATE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_DELETE
+            if fd >= 0 and libc.inotify_add_watch(fd, os.fsencode(self.directory), mask) >= 0:
+                self.fd = fd
+            elif fd >= 0:
+                os.close(fd)
+        return self
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- waiting ---
+
+    def wait(self, timeout=300, expected=1, start_timeout=60, required=True):
+        """
+        Block until `expected` downloads have completed and none is in progress.
+        Raises TimeoutError if nothing starts within `start_timeout` seconds
+        (returns [] instead when not `required`), or if the downloads do not
+        finish within `timeout` seconds, and DownloadError as soon as a
+        download failed with none left in progress.
+        """
+        now = time.time()
+        end_time = now + timeout
+        start_deadline = now + min(start_timeout, timeout)
+
+        while True:
+            self._collect(0)
+            busy = self.in_progress or self.moves
+            if len(self.completed) >= expected and not busy:
+                return list(self.completed)
+            if self.failed and not busy:
+                raise DownloadError(f"Download cancelled or failed: {self.failed[-1]['file']}")
+
+            now = time.time()
+            started = self.completed or self.in_progress or self.moves or self.failed
+            if not started and now >= start_deadline:
+                if not required:
+                    return []
+                raise TimeoutError("Download did not start within the expected time.")
+            if now >= end_time:
+                raise TimeoutError("Download did not complete within the expected time.")
+
+            deadline = end_time if started else start_deadline
+            self._collect(deadline - now)
+
+    # --- event sources ---
+
+    def _collect(self, timeout):
+        if self.fd is not None:
+            self._read_events(timeout)
+        else:
+            if timeout > 0:
+                time.sleep(min(timeout, self.poll_interval))
+            self._poll()
+
+    def _read_events(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        # A move out of the folder has no IN_MOVED_TO; give it one more read to arrive
+        stale = set(self.moves)
+        offset = 0
+        while offset < len(data):
+            _, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            self._on_event(mask, cookie, name)
+        for cookie in stale & set(self.moves):
+            self._fail(*self.moves.pop(cookie))
+
+    def _on_event(self, mask, cookie, name):
+        now = time.time()
+        if mask & IN_MOVED_TO and cookie in self.moves:
+            _, started = self.moves.pop(cookie)
+            if name.endswith(TEMP_SUFFIX):
+                # "Unconfirmed N.crdownload" -> "<name>.crdownload": still downloading
+                self.in_progress[name] = started
+            else:
+                self._complete(name, started)
+        elif name.endswith(TEMP_SUFFIX):
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self.in_progress.setdefault(name, now)
+            elif mask & IN_MOVED_FROM and name in self.in_progress:
+                self.moves[cookie] = (name, self.in_progress.pop(name))
+            elif mask & IN_DELETE and name in self.in_progress:
+                self._fail(name, self.in_progress.pop(name))
+        elif mask & IN_CLOSE_WRITE and self._is_direct_write(name):
+            # Written directly without a temp file (small files)
+            self._complete(name, now)
+
+    def _scan(self):
+        files = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        files[entry.name] = entry.stat().st_mtime
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _poll(self):
+        now = time.time()
+        files = self._scan()
+
+        new_temps = [name for name in files if name.endswith(TEMP_SUFFIX) and name not in self.in_progress]
+
+        for name in list(self.in_progress):
+            if name in files:
+                continue
+            started = self.in_progress.pop(name)
+            final = name[:-len(TEMP_SUFFIX)]
+            if final in files:
+                self._complete(final, started)
+            elif new_temps:
+                # Renamed to another temp name ("Unconfirmed N.crdownload" -> "<name>.crdownload")
+                self.in_progress[new_temps.pop(0)] = started
+            else:
+                self._fail(name, started)
+
+        for name in new_temps:
+            self.in_progress.setdefault(name, now)
+
+        for name, mtime in files.items():
+            if self.baseline.get(name) != mtime and self._is_direct_write(name):
+                self._complete(name, now)
+
+    def _is_direct_write(self, name):
+        """New non-empty file that is not a temp file, a placeholder or already reported."""
+        if name.endswith(TEMP_SUFFIX) or _ignored(name) or name + TEMP_SUFFIX in self.in_progress:
+            return False
+        if any(d["file"] == name for d in self.completed):
+            return False
+        try:
+            return os.path.getsize(os.path.join(self.directory, name)) > 0
+        except OSError:
+            return False
+
+    # --- results ---
+
+    def _complete(self, name, started):
+        path = os.path.join(self.directory, name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        seconds = max(time.time() - started, 0.001)
+        info = {
+            "file": name,
+            "path": path,
+            "size": size,
+            "seconds": round(seconds, 3),
+            "bytes_per_sec": int(size / seconds)
+        }
+        self.completed.append(info)
+        self.baseline[name] = os.path.getmtime(path) if os.path.exists(path) else None
+        if self.logger:
+            self.logger.info(f"📥 Download complete: {name} ({size} bytes, {info['bytes_per_sec']} B/s)")
+
+    def _fail(self, name, started):
+        self.failed.append({"file": name, "seconds": round(time.time() - started, 3)})
+        if self.logger:
+            self.logger.warning(f"⚠️ Download cancelled or failed: {name}")
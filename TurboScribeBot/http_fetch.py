@@ -0,0 +1,353 @@
+"""
+Direct HTTP download of result files with the browser's session cookies.
+
+Instead of clicking through the UI and waiting for Chrome's download manager,
+the authenticated cookies are copied from the Selenium driver into a pooled
+`requests.Session` and the file is streamed straight to disk in chunks.
+Interrupted downloads resume with a Range request from the `.part` file.
+
+Large source recordings (Zoom / OneDrive) use `fetch_segmented()`: the file
+is preallocated and DOWNLOAD_SEGMENTS Range requests fill their own byte
+ranges concurrently. Progress per segment is kept in a `.seg.json` file
+next to it, so an interrupted download continues where each segment stopped.
+The whole download must finish within a deadline that grows with the file
+size (DOWNLOAD_MIN_KBPS).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 1024 * 1024
+SEGMENTS = int(os.getenv("DOWNLOAD_SEGMENTS", 4))
+SEGMENT_MIN_BYTES = 8 * 1024 * 1024  # smaller files are fetched in one stream
+MIN_RATE = float(os.getenv("DOWNLOAD_MIN_KBPS", 256)) * 1024  # slowest acceptable average rate
+STATE_EVERY = 16 * 1024 * 1024  # bytes between segment state saves
+
+
+def session_from_driver(driver, session=None, pool_size=8):
+    """Create (or refresh) a pooled requests.Session carrying the driver's cookies."""
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie["name"], cookie["value"],
+            domain=cookie.get("domain"), path=cookie.get("path", "/")
+        )
+    return session
+
+
+def _filename(response, url):
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=UTF-8''([^;]+)", disposition) or re.search(r'filename="?([^";]+)"?', disposition)
+    if match:
+        return os.path.basename(unquote(match.group(1)))
+    return os.path.basename(unquote(urlparse(url).path)) or "download"
+
+
+class IntegrityError(Exception):
+    pass
+
+
+class HttpFetcher:
+    def __init__(self, session, logger=None, chunk_size=CHUNK_SIZE, retries=3, timeout=60):
+        self.session = session
+        self.logger = logger
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.timeout = timeout
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    def fetch(self, url, output_dir, filename=None, sha256=None):
+        """
+        Stream `url` into `output_dir`, resuming from a previous `.part` file.
+        Returns {"file", "path", "size", "seconds", "bytes_per_sec", "resumed", "attempts"}.
+        """
+        started = time.time()
+        resumed = False
+        last_error = None
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                path, size, resumed_now = self._fetch_once(url, output_dir, filename, sha256)
+                resumed = resumed or resumed_now
+                seconds = max(time.time() - started, 0.001)
+                info = {
+                    "file": os.path.basename(path),
+                    "path": path,
+                    "size": size,
+                    "seconds": round(seconds, 3),
+                    "bytes_per_sec": int(size / seconds),
+                    "resumed": resumed,
+                    "attempts": attempt
+                }
+                self._log("info", f"📥 Fetched {info['file']} over HTTP ({size} bytes, {info['bytes_per_sec']} B/s)")
+                return info
+            except (requests.RequestException, IntegrityError, OSError) as e:
+                last_error = e
+                self._log("warning", f"⚠️ HTTP fetch attempt {attempt} failed: {e}")
+                if attempt < self.retries:
+                    time.sleep(min(2 ** attempt, 10))
+
+        raise last_error
+
+    def _fetch_once(self, url, output_dir, filename, sha256):
+        # The name is only known once the server answers, so the partial file
+        # is keyed by URL until then.
+        part_path = os.path.join(output_dir, f".{hashlib.sha1(url.encode()).hexdigest()[:12]}.part")
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # Range not satisfiable: the part file is already complete or stale
+                os.remove(part_path)
+                raise IntegrityError("Stale partial download discarded")
+            response.raise_for_status()
+
+            if response.status_code != 206:
+                offset = 0  # server ignored the Range header, start over
+            total = self._expected_size(response, offset)
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+
+            name = filename or _filename(response, url)
+
+        size = os.path.getsize(part_path)
+        if total is not None and size != total:
+            raise IntegrityError(f"Size mismatch: got {size} bytes, expected {total}")
+        if sha256 and self._sha256(part_path) != sha256.lower():
+            os.remove(part_path)
+            raise IntegrityError("SHA-256 checksum mismatch")
+
+        path = os.path.join(output_dir, name)
+        os.replace(part_path, path)
+        return path, size, offset > 0
+
+    @staticmethod
+    def _expected_size(response, offset):
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range and not content_range.endswith("/*"):
+            return int(content_range.rsplit("/", 1)[1])
+        length = response.headers.get("Content-Length")
+        if length is not None and "Content-Encoding" not in response.headers:
+            return offset + int(length) if response.status_code == 206 else int(length)
+        return None
+
+    @staticmethod
+    def _sha256(path):
+        return HttpFetcher._digest(path, hashlib.sha256())
+
+    @staticmethod
+    def _digest(path, digest):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    # --- segmented download ---
+
+    def probe(self, url):
+        """(size, accepts ranges, etag, name, final url) from a one-byte Range request."""
+        with self.session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            name = _filename(response, url)
+            etag = response.headers.get("ETag")
+            if response.status_code == 206:
+                size = self._expected_size(response, 0)
+                return size, True, etag, name, response.url
+            return self._expected_size(response, 0), False, etag, name, response.url
+
+    def fetch_segmented(self, url, output_dir, filename=None, sha256=None, segments=SEGMENTS):
+        """
+        Download `url` with `segments` concurrent Range requests into a
+        preallocated file, resuming from a previous attempt. Falls back to
+        fetch() when the server does not take ranges or the file is small.
+        Returns fetch()'s info plus "segments".
+        """
+        started = time.time()
+        size, ranges, etag, name, final_url = self.probe(url)
+        name = filename or name
+        if not ranges or not size or size < SEGMENT_MIN_BYTES or segments < 2:
+            info = self.fetch(url, output_dir, filename=name, sha256=sha256)
+            info["segments"] = 1
+            return info
+
+        key = hashlib.sha1(f"{name}:{size}:{etag}".encode()).hexdigest()[:12]
+        part_path = os.path.join(output_dir, f".{key}.seg")
+        state_path = f"{part_path}.json"
+        state = self._load_segments(part_path, state_path, size, etag)
+        resumed = state is not None
+        if state is None:
+            state = self._new_segments(part_path, state_path, size, etag, segments)
+        todo = [seg for seg in state["ranges"] if seg[0] + seg[2] <= seg[1]]
+        if resumed:
+            remaining = sum(seg[1] + 1 - seg[0] - seg[2] for seg in todo)
+            self._log("info", f"📥 Resuming segmented download of {name}, {remaining} of {size} bytes left")
+
+        deadline = started + 60 + size / MIN_RATE
+        lock = threading.Lock()
+        unsaved = [0]
+        retries = [0]
+
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            def on_bytes(count):
+                with lock:
+                    unsaved[0] += count
+                    if unsaved[0] >= STATE_EVERY:
+                        unsaved[0] = 0
+                        os.fdatasync(fd)
+                        self._save_segments(state_path, state)
+
+            def on_retry():
+                with lock:
+                    retries[0] += 1
+
+            with ThreadPoolExecutor(max_workers=len(todo) or 1) as pool:
+                futures = [pool.submit(self._fetch_segment, final_url, fd, seg, deadline, on_bytes, on_retry)
+                           for seg in todo]
+                errors = []
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+        finally:
+            os.fsync(fd)  # the saved state must not claim bytes still in the page cache
+            os.close(fd)
+            with lock:
+                self._save_segments(state_path, state)
+        if errors:
+            raise errors[0]
+
+        self._verify(part_path, state_path, etag, sha256)
+        path = os.path.join(output_dir, name)
+        os.replace(part_path, path)
+        os.remove(state_path)
+
+        seconds = max(time.time() - started, 0.001)
+        info = {
+            "file": name,
+            "path": path,
+            "size": size,
+            "seconds": round(seconds, 3),
+            "bytes_per_sec": int(size / seconds),
+            "resumed": resumed,
+            "attempts": 1 + retries[0],
+            "segments": len(state["ranges"])
+        }
+        self._log("info", f"📥 Fetched {name} in {info['segments']} segments ({size} bytes, {info['bytes_per_sec']} B/s)")
+        return info
+
+    @staticmethod
+    def _load_segments(part_path, state_path, size, etag):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("size") != size or state.get("etag") != etag:
+            return None
+        if not os.path.exists(part_path) or os.path.getsize(part_path) != size:
+            return None
+        return state
+
+    def _new_segments(self, part_path, state_path, size, etag, segments):
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+            except (AttributeError, OSError):
+                pass  # sparse file, still written in place
+        step = -(-size // segments)
+        state = {"size": size, "etag": etag,
+                 "ranges": [[start, min(start + step, size) - 1, 0] for start in range(0, size, step)]}
+        self._save_segments(state_path, state)
+        return state
+
+    @staticmethod
+    def _save_segments(state_path, state):
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _fetch_segment(self, url, fd, seg, deadline, on_bytes, on_retry):
+        """Fill bytes seg[0]..seg[1] of the file; seg[2] counts the bytes already written."""
+        attempt = 0
+        while seg[0] + seg[2] <= seg[1]:
+            start = seg[0] + seg[2]
+            try:
+                headers = {"Range": f"bytes={start}-{seg[1]}"}
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206 or not response.headers.get("Content-Range", "").startswith(f"bytes {start}-"):
+                        raise IntegrityError(f"Range {start}-{seg[1]} not honoured")
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if not chunk:
+                            continue
+                        position = seg[0] + seg[2]
+                        if position + len(chunk) > seg[1] + 1:
+                            raise IntegrityError(f"Segment {seg[0]}-{seg[1]} got more bytes than requested")
+                        os.pwrite(fd, chunk, position)
+                        seg[2] += len(chunk)
+                        on_bytes(len(chunk))
+                        if time.time() > deadline:
+                            raise TimeoutError(f"Download slower than {MIN_RATE / 1024:.0f} KB/s on average")
+                if seg[0] + seg[2] <= seg[1]:
+                    raise IntegrityError(f"Segment {seg[0]}-{seg[1]} ended early")
+            except (requests.RequestException, IntegrityError) as e:
+                attempt += 1
+                on_retry()
+                if attempt >= self.retries or time.time() > deadline:
+                    raise
+                self._log("warning", f"⚠️ Segment {seg[0]}-{seg[1]} failed at {seg[0] + seg[2]}, retrying: {e}")
+                time.sleep(min(2 ** attempt, 10))
+
+    def _verify(self, part_path, state_path, etag, sha256):
+        """SHA-256 when given, else the MD5 of a single-part ETag when the server sends one."""
+        plain_md5 = etag and re.fullmatch(r'"?([0-9a-fA-F]{32})"?', etag)
+        if sha256:
+            expected, actual = sha256.lower(), self._sha256(part_path)
+        elif plain_md5:
+            expected, actual = plain_md5.group(1).lower(), self._digest(part_path, hashlib.md5())
+        else:
+            return
+        if actual != expected:
+            os.remove(part_path)
+            os.remove(state_path)
+            raise IntegrityError("Checksum mismatch after segmented download")
+
+    def fetch_many(self, items, output_dir, max_workers=4):
+        """
+        Fetch several {key: url} items concurrently.
+        Returns ({key: info}, {key: error}).
+        """
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {key: pool.submit(self.fetch, url, output_dir) for key, url in items.items()}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+        return results, errors
@@ -0,0 +1,167 @@
+"""
+Non-blocking job logs.
+
+Bot loggers only put records on one process-wide queue (`JobQueueHandler`);
+a single writer thread appends them to `{output}/{id}.log`. The writer keeps
+at most MAX_OPEN_FILES log files open (least recently used are closed), and
+rotates a file past LOG_MAX_MB into `{id}.log.1` ... `{id}.log.N`.
+
+`LOG_FORMAT=json` writes JSON lines instead of text:
+
+    {"time": "...", "level": "INFO", "job_id": "51", "step": "login",
+     "duration": null, "message": "..."}
+
+`step` is the instrumented bot step running when the record was logged and
+`duration` is set on the timing record written when a step ends.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from metrics import current_step
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_MAX_BYTES = int(float(os.getenv("LOG_MAX_MB", 20)) * 1024 * 1024)
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", 3))
+MAX_OPEN_FILES = 32
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "job_id": getattr(record, "job_id", None),
+            "step": getattr(record, "step", None),
+            "duration": getattr(record, "duration", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+def make_formatter(fmt=LOG_FORMAT):
+    if fmt == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+class _Writer(logging.Handler):
+    """Runs on the listener thread; routes records to their job's log file."""
+
+    def __init__(self, formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.files = OrderedDict()
+
+    def _file(self, path):
+        handler = self.files.pop(path, None)
+        if handler is None:
+            handler = logging.handlers.RotatingFileHandler(
+                path, mode="a", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(self.formatter)
+            while len(self.files) >= MAX_OPEN_FILES:
+                self.files.popitem(last=False)[1].close()
+        self.files[path] = handler
+        return handler
+
+    def _close(self, path):
+        handler = self.files.pop(path, None)
+        if handler:
+            handler.close()
+
+    def emit(self, record):
+        path = getattr(record, "log_path", None)
+        if not path:
+            return
+        if getattr(record, "close_log", False):
+            self._close(path)
+            return
+        try:
+            self._file(path).emit(record)
+        except OSError:
+            self.handleError(record)
+
+    def close(self):
+        for path in list(self.files):
+            self._close(path)
+        super().close()
+
+
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(_queue, _Writer(make_formatter()))
+            _listener.start()
+            atexit.register(shutdown)
+
+
+def shutdown():
+    """Write out everything still queued and close the files."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def console_logger(name):
+    """
+    Logger of a non-job module (worker, batch, accounts...): plain message
+    lines on stdout, without the job loggers' records.
+    """
+    parent = logging.getLogger("turboscribe")
+    with _listener_lock:
+        if not parent.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            parent.addHandler(handler)
+            parent.setLevel(logging.INFO)
+            parent.propagate = False
+    return parent.getChild(name)
+
+
+class JobQueueHandler(logging.handlers.QueueHandler):
+    """Tags records with the job and its log file and hands them to the writer thread."""
+
+    def __init__(self, job_id, log_path):
+        _ensure_listener()
+        super().__init__(_queue)
+        self.job_id = job_id
+        self.log_path = log_path
+
+    def prepare(self, record):
+        # Resolve message and traceback here: the writer may run much later
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.job_id = self.job_id
+        record.log_path = self.log_path
+        if getattr(record, "step", None) is None:
+            record.step = current_step()
+        return record
+
+    def close(self):
+        """Ask the writer to close this job's file once its pending records are written."""
+        marker = logging.makeLogRecord({"log_path": self.log_path, "close_log": True})
+        _queue.put_nowait(marker)
+        super().close()
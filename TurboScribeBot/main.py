@@ -1,24 +1,38 @@
 import argparse
-import json
 import os
+import shutil
 from dotenv import load_dotenv
+
+load_dotenv()  # loads from .env, before modules that read their settings at import
+
 from turboscribe_bot import TurboScribeBot
-import time
+from session_store import default_store
+from postprocess import PostProcessScheduler
+from result_cache import ResultCache
+from pipeline import Pipeline, StageBoundary
+from audio_prep import CODECS, UPLOAD_BITRATE, UPLOAD_CODEC, media_duration, prepare_upload
+from accounts import ACCOUNT_CLI_WAIT_TIMEOUT, ACCOUNT_WAIT_TIMEOUT, AccountLimitError, AccountPool
+from monitor import JobParked
+from retention import RETENTION_ENABLED, RetentionManager
+from render import parse_formats
 import sys
-#from helper import period_delete
-
-load_dotenv()  # loads from .env
+from datetime import datetime
 
 email = os.getenv("EMAIL")
 password = os.getenv("PASSWORD")
-days = os.getenv("DAY")
 HOST_OUTPUTS_BASE = os.getenv("HOST_OUTPUTS_BASE")
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="TurboScribe Automation Script")
 
-    parser.add_argument("--id", required=True, help="ID of the process")
-    parser.add_argument("--output", required=True, help="the path of the output folder")
+    parser.add_argument("--id", help="ID of the process (required unless --batch)")
+    parser.add_argument("--output", help="the path of the output folder (required unless --batch)")
+
+    # Batch workflow: many jobs in one process
+    parser.add_argument("--batch", help="JSONL manifest, one job per line with the CLI argument names as keys")
+    parser.add_argument("--concurrency", type=int, default=2, help="Browser sessions used in parallel by --batch and --split")
+    parser.add_argument("--stages", nargs="?", const="", help="Run --batch as pipelined stages, optionally with workers per stage, e.g. source=2,transcribe=16")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port during --batch")
 
     # Source workflow (Zoom/OneDrive)
     parser.add_argument(
@@ -54,10 +68,36 @@ def parse_args():
     parser.add_argument("--detail_summary", action="store_true", help="Summarize (detailed)")
     parser.add_argument("--translate", help="Translate output with Google Translate")
     parser.add_argument("--download_audio", action="store_true", help="Download audio file")
+    parser.add_argument("--formats", help="Render the transcript locally in these formats, e.g. txt,srt,vtt,docx,json")
+    parser.add_argument("--no_cache", action="store_true", help="Ignore cached results and transcribe again")
+    parser.add_argument("--resume", action="store_true", help="Continue a failed job from its last checkpoint")
+
+    # Upload pre-processing (local files only)
+    parser.add_argument("--upload_codec", default=UPLOAD_CODEC, choices=sorted(CODECS), help="Codec of the compact audio uploaded instead of the file")
+    parser.add_argument("--upload_bitrate", default=UPLOAD_BITRATE, help="Bitrate of the compact upload audio, e.g. 32k")
+    parser.add_argument("--no_compress", action="store_true", help="Upload the original file without extracting the audio")
+    parser.add_argument("--split", type=float, help="Transcribe local media longer than this many minutes as parallel parts")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # --- Validation logic ---
+    if args.batch:
+        if args.stages:
+            from batch import parse_stage_workers
+            try:
+                parse_stage_workers(args.stages, args.concurrency)
+            except ValueError as e:
+                parser.error(str(e))
+        return args
+    if not args.id or not args.output:
+        parser.error("--id and --output are required")
+
+    if args.formats:
+        try:
+            parse_formats(args.formats)
+        except ValueError as e:
+            parser.error(str(e))
+
     if args.source:
         # Zoom/OneDrive flow
         if args.with_transcription and not args.language:
@@ -71,6 +111,252 @@ def parse_args():
 
     return args
 
+def job_argv(job):
+    """
+    Turn a job dict (same field names as the CLI arguments) into an argv list,
+    so queued jobs go through the same parser and validation as the CLI.
+    """
+    argv = []
+    for key, value in job.items():
+        if value is None or value is False:
+            continue
+        flag = "--with-transcription" if key == "with_transcription" else f"--{key}"
+        if value is True or (key == "speakers" and value == -1):
+            argv.append(flag)
+        else:
+            argv.extend([flag, str(value)])
+    return argv
+
+def build_options(args):
+    """Convert args into the options dict for the bot."""
+    return {
+        "language": args.language,
+        "model": args.model,
+        "recognize_speakers": args.speakers,
+        "transcribe": args.transcribe,
+        "restore_audio": args.restore,
+        "timestamps": args.timestamps,
+        "short_summary": args.short_summary,
+        "detail_summary": args.detail_summary,
+        "translate": args.translate,
+        "download_audio": args.download_audio,
+        "formats": args.formats,
+    }
+
+def restore_from_cache(bot, cache, key, args, output_dir):
+    """Fill the job folder and report from a cached identical job. Returns True on a hit."""
+    cached = cache.restore(key, output_dir, args.id, copy=bool(args.owner))
+    if cached is None:
+        bot.report["job_metadata"]["cache_hit"] = False
+        return False
+
+    bot.logger.info("♻️ Identical media and options found in result cache, skipping transcription")
+    bot.report["outputs"] = cached.get("outputs", {})
+    bot.report["job_metadata"]["title"] = cached.get("job_metadata", {}).get("title")
+    bot.report["job_metadata"]["cache_hit"] = True
+    bot.report["status_log"].append({
+        "step": "result_cache",
+        "cache_hit": True,
+        "cached_job": cached.get("job_metadata", {}).get("id"),
+        "time": datetime.now().isoformat()
+    })
+
+    if args.owner:
+        bot.change_owner(output_dir, args.owner)
+
+    bot.generate_report(output_dir, args.id, True)
+    return True
+
+def transcribe_on_site(bot, args, output_dir, pipeline, resumed, monitor=None):
+    """
+    Upload, transcribe and post-process the job as one TurboScribe job.
+    With a `monitor` (pooled sessions), the job is parked after submit
+    (JobParked) and continues from its checkpoint once the monitor has seen
+    the transcript finish.
+    """
+    pipeline.step("login", bot.prepare_session, checkpoint=False)
+
+    def submit():
+        if args.link and not args.source:
+            bot.import_from_link(args.link)
+        elif args.file and args.no_compress:
+            bot.upload(args.file)
+        elif args.file:
+            # Kept in .upload until the job finishes (or prepared in the staged
+            # "prepare" stage), so --resume continues the upload of the same file
+            upload_path = pipeline.state.get("upload_path")
+            if not upload_path or not os.path.exists(upload_path):
+                pipeline.state["upload_path"] = upload_path = prepare_upload(
+                    args.file, os.path.join(output_dir, ".upload"), bot.logger,
+                    args.upload_codec, args.upload_bitrate, bot.report)
+                pipeline.save()
+            bot.upload(upload_path)
+
+        bot.select_options()
+        bot.waiter.settle("select_options")
+
+        bot.start_transcription()
+        bot.waiter.settle("start_transcription")
+        bot.check_limits()
+        if monitor:
+            pipeline.state["remote_id"] = bot.remote_job_id()
+
+    def transcribe():
+        result = monitor.take(bot.account, remote_id) if monitor and remote_id else None
+        if result and result["status"] == "failed":
+            raise RuntimeError(f"TurboScribe job {remote_id} failed: {result.get('error', 'failed on site')}")
+        if result and result.get("transcript_url"):
+            bot.driver.get(result["transcript_url"])
+        else:
+            with bot.progress.heartbeat("transcribe"):
+                bot.monitor_proccess()
+        bot.waiter.settle("transcript_page")
+        bot.remember_transcript()
+
+    pipeline.step("submit", submit)
+
+    remote_id = pipeline.state.get("remote_id")
+    if monitor and remote_id and "transcribe" not in pipeline.done and not monitor.ready(bot.account, remote_id):
+        bot.report["status_log"].append({
+            "step": "monitor",
+            "parked": True,
+            "remote_id": remote_id,
+            "time": datetime.now().isoformat()
+        })
+        pipeline.save()
+        bot.generate_report(output_dir, args.id)
+        raise JobParked(remote_id, bot.account)
+
+    pipeline.boundary("results")
+    pipeline.step("transcribe", transcribe)
+
+    if resumed and "transcribe" in pipeline.done and bot.transcript_url:
+        bot.driver.get(bot.transcript_url)
+
+    PostProcessScheduler(bot, args, output_dir, pipeline=pipeline).run()
+
+def run_job(bot, args, output_dir, monitor=None, stage=None):
+    """
+    Run one job on a bot whose browser is already started, as a checkpointed
+    pipeline (see pipeline.py). With --resume, steps completed by a previous
+    run are skipped.
+    With `stage`, only that stage of the job runs (StageBoundary at the next
+    one); local stages need no browser.
+    Returns False when the job stops after the source download only.
+    """
+    pipeline = Pipeline(bot, output_dir, args.id, stage)
+    resumed = args.resume and pipeline.load()
+    bot.generate_report(output_dir, args.id)
+
+    cache = None if args.no_cache else ResultCache.from_env()
+    cache_key = pipeline.state.get("cache_key")
+    # The cache holds no media, so --download_audio jobs are not served from it
+    if cache and not resumed and not args.download_audio and (not args.source or args.with_transcription):
+        cache_key = cache.key(bot.options, link=args.link, file=args.file, passcode=args.passcode)
+        if cache_key and restore_from_cache(bot, cache, cache_key, args, output_dir):
+            return True
+        pipeline.state["cache_key"] = cache_key
+
+    if args.source:
+        def source_download():
+            pipeline.state["file"] = bot.external_links(args.source, args.link, args.passcode)
+
+        pipeline.step("source_download", source_download)
+        args.file = pipeline.state.get("file")
+        print(args.file)
+
+        if not args.with_transcription:
+            bot.generate_report(output_dir, args.id, True)
+            pipeline.clear()
+            return False
+
+    pipeline.boundary("prepare")
+    if pipeline.staged and args.file and not (args.no_compress or args.split):
+        def prepare_audio():
+            pipeline.state["upload_path"] = prepare_upload(
+                args.file, os.path.join(output_dir, ".upload"), bot.logger,
+                args.upload_codec, args.upload_bitrate, bot.report)
+
+        pipeline.step("prepare_audio", prepare_audio)
+
+    pipeline.boundary("upload")
+    split = False
+    if args.split and args.file and not pipeline.reached("finish"):
+        from split_job import run_split
+        split = run_split(bot, args, output_dir, pipeline)
+    if not split and not pipeline.reached("finish"):
+        transcribe_on_site(bot, args, output_dir, pipeline, resumed, monitor)
+
+    pipeline.boundary("finish")
+    if args.owner:
+        pipeline.step("change_owner", lambda: bot.change_owner(output_dir, args.owner))
+
+    pipeline.clear()
+    shutil.rmtree(os.path.join(output_dir, ".upload"), ignore_errors=True)
+    bot.generate_report(output_dir, args.id, True)
+
+    if cache_key:
+        try:
+            cache.store(cache_key, output_dir, args.id, bot.report)
+        except OSError as e:
+            bot.logger.warning(f"⚠️ Could not store results in cache: {e}")
+    return True
+
+def run_with_failover(bot, args, output_dir, accounts, monitor=None, account=None, stage=None,
+                      wait_timeout=ACCOUNT_WAIT_TIMEOUT):
+    """
+    Run the job on the account picked by the account pool. When TurboScribe
+    refuses it for account limits, block that account and continue the job
+    from its checkpoint on another one.
+    `account` continues a parked or staged job on the account it was
+    submitted to (still reserved for it). `wait_timeout` bounds the wait
+    for a free account slot.
+    """
+    minutes = (media_duration(args.file) or 0) / 60 if args.file else 0
+    # A split job's parts reserve their own accounts and minutes
+    needed = 0 if args.split else minutes
+    tried, failovers = set(), []
+    bot.accounts = accounts
+
+    def release(minutes_used=0):
+        # A split parent gives its slot to its parts early (split_job.run_split)
+        if bot.account_reserved:
+            bot.account_reserved = False
+            accounts.release(account, args.id, minutes_used)
+
+    while True:
+        if account is None:
+            account = accounts.acquire(args.id, needed, exclude=tried,
+                                       prefer=bot.account.email if bot.account else None,
+                                       timeout=wait_timeout)
+            bot.logger.info(f"👤 Job {args.id} assigned to account {account.email}")
+        bot.use_account(account, default_store(account.password))
+        bot.account_reserved = True
+        try:
+            finished = run_job(bot, args, output_dir, monitor, stage)
+        except (JobParked, StageBoundary):
+            raise  # the account stays reserved for the rest of the job
+        except AccountLimitError as e:
+            release()
+            until = accounts.block(account, e)
+            tried.add(account.email)
+            failovers.append({"account": account.email, "kind": e.kind, "reason": str(e),
+                              "blocked_until": datetime.fromtimestamp(until).isoformat()})
+            bot.logger.warning(f"⚠️ Account {account.email} hit its {e.kind} limit, failing over: {e}")
+            args.resume = True
+            account = None
+            continue
+        except BaseException:
+            release()
+            raise
+
+        release(0 if "split" in bot.report else minutes)
+        bot.report["job_metadata"]["account"] = account.email
+        if failovers:
+            bot.report["account_failovers"] = failovers
+        bot.generate_report(output_dir, args.id)
+        return finished
+
 # def parse_args():
 #     parser = argparse.ArgumentParser(description="TurboScribe Automation Script")
 
@@ -126,92 +412,34 @@ def parse_args():
 
 if __name__ == "__main__":
     try:
-        #period_delete(days)
-
         args = parse_args()
 
-        # Convert args into dict for the bot
-        options = {
-            "language": args.language,
-            "model": args.model,
-            "recognize_speakers": args.speakers,
-            "transcribe": args.transcribe,
-            "restore_audio": args.restore,
-            "timestamps": args.timestamps,
-            "short_summary": args.short_summary,
-            "detail_summary": args.detail_summary,
-            "translate": args.translate,
-            "download_audio": args.download_audio,
-        }
+        if args.batch:
+            from batch import run_batch
+            sys.exit(0 if run_batch(args.batch, args.concurrency, args.stages, args.metrics_port) else 1)
+
+        options = build_options(args)
 
         output_dir = os.path.join(args.output, f"{args.id}")
         os.makedirs(output_dir, exist_ok=True)
 
-        bot = TurboScribeBot(args.id, email, password, options, output_dir)
-
-        bot.start_browser(True)
-        bot.generate_report(output_dir, args.id)
-
-        if args.source:
-            args.file = bot.external_links(args.source, args.link, args.passcode)
-            print(args.file)
-
-            if not args.with_transcription:
-                bot.generate_report(output_dir, args.id, True)
-                sys.exit(1)
-
-        bot.login()
-        time.sleep(1)
-
-        bot.open_language_menu()
-        bot.switch_to_arabic()
-        time.sleep(2)
+        # Old results are collected while this job runs (at most once per interval)
+        if RETENTION_ENABLED:
+            RetentionManager(args.output).run_once_in_background()
 
-        if args.link and not args.source:
-            bot.import_from_link(args.link)
-        elif args.file:
-            bot.upload_file(args.file)
-        
-        bot.select_options()
-        time.sleep(1)
+        bot = TurboScribeBot(args.id, email, password, options, output_dir, default_store(password))
 
-        bot.start_transcription()
-        time.sleep(1)
-
-        bot.monitor_proccess()
-        time.sleep(1)
-
-        if args.timestamps:
-            bot.export_download(output_dir, args.id)
-        else:
-            bot.download_results(output_dir, args.id)
-        time.sleep(1)
-
-        if args.download_audio:
-            bot.download_audio(output_dir, args.id)
-            time.sleep(1)
-
-        if args.short_summary or args.detail_summary:
-            bot.chatgpt_click()
-            time.sleep(0.5)
-
-            if args.short_summary:
-                bot.generate_short_summary(output_dir, args.id)
-
-            if args.detail_summary:
-                bot.generate_detailed_summary(output_dir, args.id)
-
-            bot.close_chatgpt()
-            time.sleep(0.5)
-
-
-        if args.translate:
-            bot.translate(args.translate, output_dir, args.id)
+        bot.start_browser(True)
 
-        if args.owner:
-            bot.change_owner(output_dir, args.owner)
+        try:
+            finished = run_with_failover(bot, args, output_dir, AccountPool.from_env(email, password),
+                                         wait_timeout=ACCOUNT_CLI_WAIT_TIMEOUT)
+        except Exception as e:
+            bot.mark_failed("main", e)
+            raise
 
-        bot.generate_report(output_dir, args.id, True)
+        if not finished:
+            sys.exit(1)
 
         print("✅ Job finished successfully!")
         
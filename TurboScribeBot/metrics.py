@@ -0,0 +1,242 @@
+"""
+Per-step latency instrumentation and Prometheus export.
+
+- `instrument(cls)` wraps every public method of a bot class and records wall
+  time and errors per step into `bot.report["metrics"]` and the process
+  registry.
+- `timed(step)` does the same for helper functions (captcha solving,
+  download waits); they are attributed to the bot method running on the
+  same thread.
+- At the end of each job the registry is merged into
+  `$METRICS_DIR/metrics_state.json` (file locked, so one-shot CLI processes
+  add up across jobs) and rendered as `$METRICS_DIR/turboscribe.prom` in
+  Prometheus text format. The worker can also serve `/metrics` over HTTP.
+"""
+import fcntl
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+_local = threading.local()
+
+
+def _process_started():
+    """Wall clock time the process was started (includes interpreter startup and imports)."""
+    try:
+        with open("/proc/self/stat") as f:
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+
+PROCESS_STARTED = _process_started()
+
+
+class Registry:
+    """Histograms of step seconds plus counters, keyed by step name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {}
+        self.pending = {}
+        self.gauges = {}  # (name, labels) -> value, live values of this process only
+
+    @staticmethod
+    def _empty():
+        return {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0,
+                "errors": 0, "retries": 0, "bytes": 0}
+
+    @staticmethod
+    def _add(target, step, seconds, errors, retries, size):
+        m = target.setdefault(step, Registry._empty())
+        if seconds is not None:
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    m["buckets"][i] += 1
+            m["count"] += 1
+            m["sum"] += seconds
+        m["errors"] += errors
+        m["retries"] += retries
+        m["bytes"] += size
+
+    def observe(self, step, seconds=None, errors=0, retries=0, size=0):
+        with self.lock:
+            self._add(self.totals, step, seconds, errors, retries, size)
+            self._add(self.pending, step, seconds, errors, retries, size)
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def render_gauges(self):
+        lines = []
+        for (name, labels), value in sorted(self.gauges.items()):
+            if not lines or not lines[-1].startswith(f"{name}{{"):
+                lines.append(f"# TYPE {name} gauge")
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @staticmethod
+    def render(data):
+        lines = [
+            "# HELP turboscribe_step_seconds Wall time of bot steps.",
+            "# TYPE turboscribe_step_seconds histogram",
+        ]
+        for step, m in sorted(data.items()):
+            for bound, count in zip(BUCKETS, m["buckets"]):
+                lines.append(f'turboscribe_step_seconds_bucket{{step="{step}",le="{bound}"}} {count}')
+            lines.append(f'turboscribe_step_seconds_bucket{{step="{step}",le="+Inf"}} {m["count"]}')
+            lines.append(f'turboscribe_step_seconds_sum{{step="{step}"}} {m["sum"]:.3f}')
+            lines.append(f'turboscribe_step_seconds_count{{step="{step}"}} {m["count"]}')
+
+        for name, key, help_text in (
+            ("turboscribe_step_errors_total", "errors", "Failed bot steps."),
+            ("turboscribe_step_retries_total", "retries", "Retries inside bot steps."),
+            ("turboscribe_step_bytes_total", "bytes", "Bytes moved by bot steps."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for step, m in sorted(data.items()):
+                lines.append(f'{name}{{step="{step}"}} {m[key]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self, directory=METRICS_DIR):
+        """Merge pending observations into the shared state file and rewrite the .prom file."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending or not directory:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        state_path = os.path.join(directory, "metrics_state.json")
+        with open(os.path.join(directory, ".metrics.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+
+            for step, m in pending.items():
+                s = state.setdefault(step, self._empty())
+                s["buckets"] = [a + b for a, b in zip(s["buckets"], m["buckets"])]
+                for key in ("count", "sum", "errors", "retries", "bytes"):
+                    s[key] += m[key]
+
+            for path, content in (
+                (state_path, json.dumps(state)),
+                (os.path.join(directory, "turboscribe.prom"), self.render(state)),
+            ):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+
+    def serve(self, port, host="0.0.0.0"):
+        """Serve the live registry at http://host:port/metrics (daemon mode)."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                with registry.lock:
+                    body = (registry.render(registry.totals) + registry.render_gauges()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = Registry()
+
+
+def record(bot, step, seconds=None, errors=0, retries=0, size=0):
+    """Add one observation to the bot's report and to the process registry."""
+    REGISTRY.observe(step, seconds, errors, retries, size)
+    if bot is None:
+        return
+
+    with bot.report_lock:
+        steps = bot.report.setdefault("metrics", {}).setdefault("steps", {})
+        m = steps.setdefault(step, {"calls": 0, "seconds": 0.0, "errors": 0, "retries": 0, "bytes": 0})
+        if seconds is not None:
+            m["calls"] += 1
+            m["seconds"] = round(m["seconds"] + seconds, 3)
+        m["errors"] += errors
+        m["retries"] += retries
+        m["bytes"] += size
+
+
+def current_bot():
+    return getattr(_local, "bot", None)
+
+
+def current_step():
+    """Innermost instrumented step running on this thread, or None."""
+    steps = getattr(_local, "steps", None)
+    return steps[-1] if steps else None
+
+
+def _wrap(func, step, bot_method):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bot = args[0] if bot_method else current_bot()
+        outer = bot_method and current_bot() is None
+        if outer:
+            _local.bot = bot
+        steps = _local.__dict__.setdefault("steps", [])
+        steps.append(step)
+        started = time.time()
+        errors = 0
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            errors = 1
+            raise
+        finally:
+            seconds = time.time() - started
+            steps.pop()
+            if outer:
+                _local.bot = None
+            record(bot, step, seconds, errors=errors)
+            logger = getattr(bot, "logger", None)
+            if logger:
+                logger.debug(f"⏱️ {step} {'failed' if errors else 'done'} in {seconds:.2f}s",
+                             extra={"step": step, "duration": round(seconds, 3)})
+    return wrapper
+
+
+def timed(step):
+    """Decorator for helper functions, attributed to the bot step on the same thread."""
+    def decorator(func):
+        return _wrap(func, step, bot_method=False)
+    return decorator
+
+
+def instrument(cls, exclude=()):
+    """Wrap every public method of `cls` (except `exclude`) with step timing."""
+    for name, func in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not callable(func):
+            continue
+        setattr(cls, name, _wrap(func, name, bot_method=True))
+    return cls
@@ -0,0 +1,213 @@
+"""
+Multi-job monitor for pooled sessions (worker and batch mode).
+
+`monitor_proccess()` keeps a job's browser on the dashboard for the whole
+transcription. With a monitor, a job only holds a browser for the
+interactive steps:
+
+    submit      upload, options, start; the remote job id is read back
+    (parked)    the browser goes back to the pool, the monitor watches the job
+    transcribe  a session on the same account opens the finished transcript
+
+One dashboard session per account (started for the first watched job of the
+account, closed after MONITOR_IDLE_CLOSE seconds without jobs) reads the
+status of all in-flight jobs in one pass (`bot.job_statuses()`). Each job has
+its own poll interval: MONITOR_MIN_POLL seconds after a status change, then
+growing by MONITOR_BACKOFF up to MONITOR_MAX_POLL while nothing changes. The
+dashboard is read whenever the earliest job of the account is due.
+"""
+import os
+import threading
+import time
+
+from metrics import record
+
+MONITOR_ENABLED = os.getenv("MONITOR_ENABLED", "1") != "0"
+MONITOR_MIN_POLL = float(os.getenv("MONITOR_MIN_POLL", 5))
+MONITOR_MAX_POLL = float(os.getenv("MONITOR_MAX_POLL", 60))
+MONITOR_BACKOFF = float(os.getenv("MONITOR_BACKOFF", 1.5))
+MONITOR_TIMEOUT = int(os.getenv("MONITOR_TIMEOUT", 6 * 3600))
+MONITOR_IDLE_CLOSE = int(os.getenv("MONITOR_IDLE_CLOSE", 300))
+# Jobs a pooled process keeps in flight; parked jobs do not hold a browser
+MONITOR_MAX_IN_FLIGHT = int(os.getenv("MONITOR_MAX_IN_FLIGHT", 8))
+FINAL = ("done", "failed", "unknown")
+
+
+class JobParked(Exception):
+    """Raised after submit to hand the job to the monitor until its transcript is ready."""
+
+    def __init__(self, remote_id, account):
+        super().__init__(f"Job {remote_id} parked until its transcript is ready")
+        self.remote_id = remote_id
+        self.account = account
+
+
+class _Watch:
+    def __init__(self, remote_id, on_ready, now, interval):
+        self.remote_id = remote_id
+        self.on_ready = on_ready
+        self.status = None
+        self.started = now
+        self.interval = interval
+        self.next_poll = now + interval
+
+
+class JobMonitor:
+    def __init__(self, open_session, logger=None, min_poll=MONITOR_MIN_POLL, max_poll=MONITOR_MAX_POLL,
+                 backoff=MONITOR_BACKOFF, timeout=MONITOR_TIMEOUT, idle_close=MONITOR_IDLE_CLOSE):
+        self.open_session = open_session  # account -> bot logged into that account
+        self.logger = logger
+        self.min_poll = min_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.timeout = timeout
+        self.idle_close = idle_close
+
+        self.accounts = {}    # email -> Account
+        self.watches = {}     # email -> {remote_id: _Watch}
+        self.results = {}     # (email, remote_id) -> {"status", "transcript_url", ...}
+        self.sessions = {}    # email -> dashboard bot
+        self.idle_since = {}  # email -> time its last job finished
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def _log(self, message, level="info"):
+        if self.logger:
+            getattr(self.logger, level)(message)
+        else:
+            print(message)
+
+    # --- jobs ---
+
+    def watch(self, account, remote_id, on_ready=None):
+        """Start following `remote_id`; `on_ready(result)` is called once it is done or failed."""
+        with self.cond:
+            key = (account.email, remote_id)
+            if key in self.results:
+                if on_ready:
+                    on_ready(self.results[key])
+                return
+            jobs = self.watches.setdefault(account.email, {})
+            if remote_id not in jobs:
+                self.accounts[account.email] = account
+                jobs[remote_id] = _Watch(remote_id, on_ready, time.time(), self.min_poll)
+                self.idle_since.pop(account.email, None)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="job-monitor", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def ready(self, account, remote_id):
+        with self.cond:
+            return (account.email, remote_id) in self.results
+
+    def wait(self, account, remote_id, timeout=None):
+        """Block until the job is done or failed and return its result."""
+        self.watch(account, remote_id)
+        key = (account.email, remote_id)
+        with self.cond:
+            if not self.cond.wait_for(lambda: key in self.results or self.stopped, timeout):
+                raise TimeoutError(f"Job {remote_id} still running after {timeout}s")
+            return self.results.get(key)
+
+    def take(self, account, remote_id):
+        """Hand over (and forget) the result of a finished job, None if not finished."""
+        with self.cond:
+            return self.results.pop((account.email, remote_id), None)
+
+    # --- polling ---
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                if self.stopped:
+                    return
+                now = time.time()
+                idle = [email for email, since in self.idle_since.items()
+                        if email in self.sessions and now - since > self.idle_close]
+                due, wake = [], now + self.idle_close
+                for email, jobs in self.watches.items():
+                    if not jobs:
+                        continue
+                    next_poll = min(w.next_poll for w in jobs.values())
+                    if next_poll <= now:
+                        due.append(email)
+                    wake = min(wake, next_poll)
+                if not due and not idle:
+                    self.cond.wait(max(wake - now, 0.05))
+                    continue
+
+            for email in idle:
+                self._close_session(email)
+            for email in due:
+                self._poll(email)
+
+    def _session(self, email):
+        bot = self.sessions.get(email)
+        if bot is None:
+            bot = self.open_session(self.accounts[email])
+            self.sessions[email] = bot
+            self._log(f"📡 Dashboard monitor session started for {email}")
+        return bot
+
+    def _close_session(self, email):
+        bot = self.sessions.pop(email, None)
+        self.idle_since.pop(email, None)
+        if bot:
+            bot.close()
+            self._log(f"📡 Dashboard monitor session for {email} closed")
+
+    def _poll(self, email):
+        started = time.time()
+        try:
+            statuses = self._session(email).job_statuses()
+            record(None, "monitor_poll", time.time() - started)
+        except Exception as e:
+            record(None, "monitor_poll", time.time() - started, errors=1)
+            self._log(f"⚠️ Dashboard poll for {email} failed: {e}", "warning")
+            self._close_session(email)  # reopened on the next poll
+            statuses = {}
+
+        now = time.time()
+        finished = []
+        with self.cond:
+            jobs = self.watches.get(email, {})
+            for remote_id, watch in list(jobs.items()):
+                if statuses is None:
+                    # Status scraping not available: let the job watch its own page
+                    info = {"status": "unknown"}
+                else:
+                    info = statuses.get(remote_id) or {}
+                status = info.get("status")
+
+                if status != watch.status:
+                    self._log(f"📡 Job {remote_id}: {watch.status or 'submitted'} -> {status or 'not listed'}")
+                    watch.status, watch.interval = status, self.min_poll
+                else:
+                    watch.interval = min(watch.interval * self.backoff, self.max_poll)
+                watch.next_poll = now + watch.interval
+
+                if status not in FINAL and now - watch.started > self.timeout:
+                    info = {"status": "failed", "error": f"not finished after {self.timeout}s"}
+                    status = "failed"
+                if status in FINAL:
+                    result = dict(info, remote_id=remote_id, seconds=round(now - watch.started, 3))
+                    self.results[(email, remote_id)] = result
+                    del jobs[remote_id]
+                    finished.append((watch, result))
+            if not jobs:
+                self.idle_since.setdefault(email, now)
+            self.cond.notify_all()
+
+        for watch, result in finished:
+            record(None, "monitor_wait", result["seconds"], errors=int(result["status"] == "failed"))
+            if watch.on_ready:
+                watch.on_ready(result)
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        for email in list(self.sessions):
+            self._close_session(email)
@@ -0,0 +1,136 @@
+"""
+Checkpointed job pipeline.
+
+The job is a list of named steps. After each completed step a
+`checkpoint_<id>.json` is written atomically next to the report, holding the
+bot report (whose `status_log` marks the completed steps), the remote
+transcript URL, the downloaded source file and the artifacts each step
+produced. `main.py --resume` loads it and continues after the last completed
+step instead of uploading and transcribing again.
+
+With a `stage` (staged batch execution, see stages.py) the job runs only up
+to the next stage: `boundary(name)` raises StageBoundary for a later stage
+and the executor continues the job from its checkpoint in that stage.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from progress import write_json_atomic
+
+STAGES = ("source", "prepare", "upload", "transcribe", "results", "finish")
+
+
+class StageBoundary(Exception):
+    """The job reached the start of a later stage."""
+
+    def __init__(self, stage):
+        super().__init__(f"Next stage: {stage}")
+        self.stage = stage
+
+
+class Pipeline:
+    def __init__(self, bot, output_dir, job_id, stage=None):
+        self.bot = bot
+        self.output_dir = output_dir
+        self.job_id = job_id
+        self.stage = stage
+        self.path = os.path.join(output_dir, f"checkpoint_{job_id}.json")
+        self.done = set()
+        self.state = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Restore report and state from a previous run. Returns True if a checkpoint was found."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        self.state = data.get("state", {})
+        report = data.get("report")
+        if report:
+            report["job_metadata"]["status"] = "processing"
+            report["job_metadata"]["finished_at"] = None
+            self.bot.report = report
+        self.bot.transcript_url = self.state.get("transcript_url")
+
+        self.done = {
+            entry["step"] for entry in self.bot.report["status_log"]
+            if entry.get("checkpoint") and entry.get("status") == "done"
+        }
+        self.bot.logger.info(f"⏩ Resuming job, completed steps: {sorted(self.done)}")
+        self.bot.report["status_log"].append({
+            "step": "resume",
+            "skipped": sorted(self.done),
+            "time": datetime.now().isoformat()
+        })
+        return True
+
+    def _files(self):
+        try:
+            return {e.name for e in os.scandir(self.output_dir) if e.is_file()}
+        except FileNotFoundError:
+            return set()
+
+    def mark(self, name, artifacts=(), seconds=None):
+        """Record a completed step in the status_log and write the checkpoint."""
+        with self.lock:
+            self.done.add(name)
+            entry = {
+                "step": name,
+                "status": "done",
+                "checkpoint": True,
+                "artifacts": sorted(artifacts),
+                "time": datetime.now().isoformat()
+            }
+            if seconds is not None:
+                entry["seconds"] = round(seconds, 3)
+            with self.bot.report_lock:
+                self.bot.report["status_log"].append(entry)
+            self.state["transcript_url"] = self.bot.transcript_url
+            self.save()
+
+    def save(self):
+        # Forked bots (concurrent postprocess groups) update the shared report meanwhile
+        with self.bot.report_lock:
+            write_json_atomic(self.path, {"state": self.state, "report": self.bot.report})
+
+    @property
+    def staged(self):
+        return self.stage is not None
+
+    def reached(self, stage):
+        """True when this run executes `stage` or a later one."""
+        return self.stage is not None and STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def boundary(self, stage):
+        """Stop here if `stage` comes after the stage this run executes."""
+        if self.stage is not None and STAGES.index(stage) > STAGES.index(self.stage):
+            self.save()
+            raise StageBoundary(stage)
+
+    def step(self, name, func, checkpoint=True):
+        """Run `func` unless the step already completed in a previous run."""
+        if name in self.done:
+            self.bot.logger.info(f"⏩ Skipping completed step: {name}")
+            return None
+
+        self.bot.note_first_action(name)
+        before = self._files()
+        started = time.time()
+        with self.bot.progress.step(name):
+            result = func()
+        if checkpoint:
+            self.mark(name, self._files() - before, time.time() - started)
+        return result
+
+    def clear(self):
+        """Remove the checkpoint once the job has finished."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,170 @@
+"""
+Post-transcription scheduler.
+
+Once `monitor_proccess()` has finished, the remaining steps fall into
+independent groups:
+
+    results    export_download / download_results, download_audio
+               (direct HTTP fetch with the session cookies, UI as fallback)
+    summaries  chatgpt_click, generate_short_summary, generate_detailed_summary
+    translate  translate
+
+The first group runs on the job's own browser; every other requested group
+runs at the same time in a forked browser that shares the login cookies and
+opens the same transcript page. A WebDriver session executes one command at a
+time, so tabs of a single driver would still run one after another; forked
+sessions are what actually lets the slow summary/translation steps overlap.
+"""
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from render import parse_formats, parse_segments, render
+
+
+class PostProcessScheduler:
+    def __init__(self, bot, args, output_dir, max_parallel=3, pipeline=None):
+        self.bot = bot
+        self.pipeline = pipeline
+        self.args = args
+        self.output_dir = output_dir
+        self.max_parallel = max_parallel
+        self.main_lock = threading.Lock()
+
+    # --- step groups ---
+
+    def _results(self, bot):
+        # With --formats, one timestamped export is enough: the rest is rendered locally
+        rich = self.args.timestamps or self.args.formats
+        steps = ["export_download" if rich else "download_results"]
+        if self.args.download_audio:
+            steps.append("download_audio")
+
+        # Direct HTTP fetch first (concurrently), UI clicks for whatever is left
+        fetched = bot.fetch_direct(steps, self.output_dir)
+        for step in steps:
+            if step not in fetched:
+                # The UI steps return once their download is complete
+                getattr(bot, step)(self.output_dir, self.args.id)
+
+        if self.args.formats:
+            self._render(bot)
+
+    def _render(self, bot):
+        """Render the requested formats from the export downloaded above."""
+        exports = [d["file"] for d in bot.report.get("downloads", []) if d["step"] == "export_download"]
+        if not exports:
+            bot.logger.warning("⚠️ No timestamped export found, skipping local rendering")
+            return
+        source = os.path.join(self.output_dir, exports[-1])
+        started = time.time()
+        paths = render(parse_segments(source), self.output_dir, self.args.id,
+                       parse_formats(self.args.formats), bool(self.args.timestamps))
+        bot.report["outputs"].update({f"transcript_{fmt}": path for fmt, path in paths.items()})
+        bot.artifacts.extend(os.path.basename(path) for path in paths.values())
+        bot.logger.info(f"📝 Rendered {', '.join(paths)} from {exports[-1]} in {time.time() - started:.2f}s")
+
+    def _summaries(self, bot):
+        bot.chatgpt_click()
+        bot.waiter.settle("chatgpt_panel")
+
+        # bot.download_dir: a forked session's private folder (see TurboScribeBot.fork)
+        if self.args.short_summary:
+            bot.generate_short_summary(bot.download_dir, self.args.id)
+
+        if self.args.detail_summary:
+            bot.generate_detailed_summary(bot.download_dir, self.args.id)
+
+        bot.close_chatgpt()
+        bot.waiter.settle("close_chatgpt")
+
+    def _translate(self, bot):
+        bot.translate(self.args.translate, bot.download_dir, self.args.id)
+
+    def groups(self):
+        groups = [("results", self._results)]
+        if self.args.short_summary or self.args.detail_summary:
+            groups.append(("summaries", self._summaries))
+        if self.args.translate:
+            groups.append(("translate", self._translate))
+
+        # Groups finished before a crash are skipped on --resume
+        if self.pipeline:
+            groups = [(n, f) for n, f in groups if f"postprocess:{n}" not in self.pipeline.done]
+        return groups
+
+    # --- execution ---
+
+    def _run_group(self, name, func, forked):
+        """
+        Run one group, on a forked session if requested, and log it in the
+        report. The group's artifacts are the files its own session saved
+        (other groups write to the job folder at the same time).
+        """
+        bot = self.bot
+        started = time.time()
+        entry = {"step": f"postprocess:{name}", "time": datetime.now().isoformat()}
+        artifacts = []
+        try:
+            if forked:
+                try:
+                    bot = self.bot.fork()
+                except Exception as e:
+                    # No second browser available, queue behind the main one instead
+                    self.bot.logger.warning(f"⚠️ Could not fork session for {name}, running serially: {e}")
+
+            with self.bot.progress.step(entry["step"]):
+                if bot is self.bot:
+                    with self.main_lock:
+                        first = len(bot.artifacts)
+                        func(bot)
+                        artifacts = bot.artifacts[first:]
+                else:
+                    func(bot)
+            entry["status"] = "done"
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+            self.bot.logger.error(f"❌ Post-processing group {name} failed: {e}", exc_info=True)
+            raise
+        finally:
+            if bot is not self.bot:
+                bot.close()  # moves the fork's files into the job folder
+                artifacts = bot.artifacts
+            entry["seconds"] = round(time.time() - started, 3)
+            if self.pipeline and entry.get("status") == "done":
+                self.pipeline.mark(entry["step"], set(artifacts), entry["seconds"])
+            else:
+                self.bot.report["status_log"].append(entry)
+
+    def run(self):
+        groups = self.groups()
+        if not groups:
+            return
+        if not self.bot.transcript_url:
+            self.bot.remember_transcript()
+
+        if len(groups) == 1 or self.max_parallel <= 1:
+            for name, func in groups:
+                self._run_group(name, func, forked=False)
+            return
+
+        self.bot.logger.info(f"⚡ Running post-processing in parallel: {[name for name, _ in groups]}")
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            futures = [
+                pool.submit(self._run_group, name, func, index > 0)
+                for index, (name, func) in enumerate(groups)
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    traceback.print_exc()
+                    errors.append(e)
+
+        if errors:
+            raise errors[0]
@@ -0,0 +1,89 @@
+"""
+Incremental job progress and atomic report writing.
+
+Every job gets an append-only `progress_<id>.jsonl` stream with one JSON
+object per line, written as things happen:
+
+    {"ts": "...", "job": "51", "event": "step_start", "step": "submit"}
+    {"ts": "...", "job": "51", "event": "step_end", "step": "submit", "status": "done", "duration": 12.4}
+    {"ts": "...", "job": "51", "event": "heartbeat", "step": "transcribe"}
+    {"ts": "...", "job": "51", "event": "job_end", "status": "completed"}
+
+`ts` carries the UTC offset. Long waits (transcription, a parked job) emit a
+heartbeat every PROGRESS_HEARTBEAT seconds, so readers can tell a quiet job
+from a dead one. Readers can remember their byte offset and only read the
+new tail.
+`write_json_atomic` writes a temp file and renames it over the target, so
+readers of `report_<id>.json` never see a half-written file.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+PROGRESS_HEARTBEAT = int(os.getenv("PROGRESS_HEARTBEAT", 60))
+
+
+def write_json_atomic(path, data):
+    directory = os.path.dirname(path) or "."
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ProgressWriter:
+    def __init__(self, output_dir, job_id):
+        self.job_id = job_id
+        self.path = os.path.join(output_dir, f"progress_{job_id}.jsonl")
+        self.lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {"ts": datetime.now().astimezone().isoformat(), "job": self.job_id, "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        # One write per line on an O_APPEND file: lines never interleave
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    @contextmanager
+    def step(self, name):
+        """Emit step_start / step_end (with duration and error) around a block."""
+        started = time.time()
+        self.emit("step_start", step=name)
+        try:
+            yield
+        except BaseException as e:
+            self.emit("step_end", step=name, status="failed",
+                      duration=round(time.time() - started, 3), error=str(e) or type(e).__name__)
+            raise
+        self.emit("step_end", step=name, status="done", duration=round(time.time() - started, 3))
+
+    @contextmanager
+    def heartbeat(self, step, interval=PROGRESS_HEARTBEAT):
+        """Emit a heartbeat event every `interval` seconds while a long wait runs."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.emit("heartbeat", step=step)
+                except OSError:
+                    pass
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{self.job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,307 @@
+"""
+Local transcript rendering (`--formats txt,srt,vtt,docx,json`).
+
+One rich export (the timestamped transcript, with speaker labels when speaker
+recognition is on) is downloaded from TurboScribe, and every other format is
+rendered from it locally instead of with more UI round trips:
+
+    transcript_<id>.txt   plain text, "Speaker N: ..." per segment
+    transcript_<id>.srt   numbered cues
+    transcript_<id>.vtt   cues with <v Speaker N> voice tags
+    transcript_<id>.docx  one paragraph per segment
+    transcript_<id>.json  {"job_id": ..., "segments": [{"start", "end", "speaker", "text"}, ...]}
+
+The export is parsed line by line into segments and all writers consume the
+same segment stream, so only the current segment is held in memory. The JSON
+output keeps one segment per line and can be read back as a source too.
+"""
+import json
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+FORMATS = ("txt", "srt", "vtt", "docx", "json")
+
+TS = r"(?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?"
+TS_TOKEN = re.compile(TS)
+TS_PREFIX = re.compile(rf"^[\s\[(]*{TS}(?:\s*(?:-->|-|–)\s*{TS})?[\])]?")
+SPEAKER = re.compile(r"\b(Speaker|المتحدث)\s+(\d+)\b")
+SPEAKER_LINE = re.compile(rf"^\s*((?:Speaker|المتحدث)\s+\d+)\s*:?\s*(?:[\[(]?({TS})[\])]?)?\s*:?\s*(.*)$")
+VOICE_TAG = re.compile(r"^<v\s+([^>]+)>(.*?)(?:</v>)?$")
+SECONDS_PER_WORD = 0.4
+
+
+def parse_timestamp(token):
+    """'01:02:03,5' -> 3723.5"""
+    fraction = ""
+    if "," in token or "." in token:
+        token, fraction = re.split(r"[.,]", token)
+    value = 0
+    for part in token.split(":"):
+        value = value * 60 + int(part)
+    return value + (int(fraction) / 10 ** len(fraction) if fraction else 0)
+
+
+def format_timestamp(seconds, like="00:00:00"):
+    """Format `seconds` in the style of the timestamp `like`."""
+    separator = "," if "," in like else "." if "." in like else None
+    digits = len(re.split(r"[.,]", like)[1]) if separator else 0
+    seconds = round(max(seconds, 0), digits)
+    whole = int(seconds)
+    h, m, s = whole // 3600, whole // 60 % 60, whole % 60
+    clock = like.split(",")[0].split(".")[0]
+    if clock.count(":") == 2 or h:
+        text = f"{h:0{len(clock.split(':')[0]) if clock.count(':') == 2 else 2}d}:{m:02d}:{s:02d}"
+    else:
+        text = f"{m:0{len(clock.split(':')[0])}d}:{s:02d}"
+    if separator:
+        text += f"{separator}{round((seconds - whole) * 10 ** digits):0{digits}d}"
+    return text
+
+
+# --- parsing ---
+
+def _json_segments(f):
+    for line in f:
+        line = line.strip().rstrip(",")
+        if line.startswith('{"start"'):
+            yield json.loads(line)
+
+
+def _with_next(f):
+    """(line, following line or None) pairs, stripped."""
+    previous = None
+    for line in f:
+        line = line.strip()
+        if previous is not None:
+            yield previous, line
+        previous = line
+    if previous is not None:
+        yield previous, None
+
+
+def _text_segments(f, subtitle):
+    """Segments of a timestamped TXT/SRT/VTT export, end times may be None."""
+    current, speaker = None, None
+    for line, following in _with_next(f):
+        if not line or line == "WEBVTT":
+            continue
+        if subtitle and line.isdigit() and following and "-->" in following:
+            continue  # cue number; a cue whose text is a number is kept
+
+        prefix = TS_PREFIX.match(line)
+        labelled = SPEAKER_LINE.match(line)
+        if prefix:
+            times = TS_TOKEN.findall(prefix.group())
+            rest = line[prefix.end():].strip(" :-–")
+            if current:
+                yield current
+            current = {"start": parse_timestamp(times[0]),
+                       "end": parse_timestamp(times[1]) if len(times) > 1 else None,
+                       "speaker": speaker, "text": ""}
+            line = rest
+            labelled = SPEAKER_LINE.match(line) if line else None
+        elif labelled and labelled.group(2):
+            # "Speaker 1 (00:05): ..." starts a segment too
+            if current:
+                yield current
+            current = {"start": parse_timestamp(labelled.group(2)), "end": None, "speaker": None, "text": ""}
+
+        voice = VOICE_TAG.match(line)
+        if voice:
+            labelled, speaker, line = None, voice.group(1).strip(), voice.group(2)
+        if labelled:
+            speaker, line = labelled.group(1), labelled.group(3)
+        if current is None:
+            current = {"start": 0.0, "end": None, "speaker": speaker, "text": ""}
+        if speaker and not current["text"]:
+            current["speaker"] = speaker
+        if line:
+            current["text"] = f"{current['text']} {line}".strip()
+    if current:
+        yield current
+
+
+def parse_segments(path):
+    """Yield {"start", "end", "speaker", "text"} from an export, one at a time."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        source = _json_segments(f) if ext == ".json" else _text_segments(f, ext in (".srt", ".vtt"))
+        previous = None
+        for segment in source:
+            if not segment["text"]:
+                continue
+            if previous:
+                if previous["end"] is None:
+                    previous["end"] = segment["start"]
+                yield previous
+            previous = segment
+        if previous:
+            if previous["end"] is None:
+                previous["end"] = previous["start"] + max(1.0, len(previous["text"].split()) * SECONDS_PER_WORD)
+            yield previous
+
+
+# --- writers ---
+
+class _TextWriter:
+    ext = "txt"
+
+    def __init__(self, path, job_id, timestamps):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.f = open(self.tmp_path, "w", encoding="utf-8")
+        self.timestamps = timestamps
+        self.count = 0
+        self.header(job_id)
+
+    def header(self, job_id):
+        pass
+
+    def label(self, segment):
+        return f"{segment['speaker']}: " if segment["speaker"] else ""
+
+    def write(self, segment):
+        self.count += 1
+        stamp = f"[{format_timestamp(segment['start'])}] " if self.timestamps else ""
+        self.f.write(f"{stamp}{self.label(segment)}{segment['text']}\n\n")
+
+    def close(self):
+        self.footer()
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def footer(self):
+        pass
+
+    def abort(self):
+        self.f.close()
+        os.remove(self.tmp_path)
+
+
+class _SrtWriter(_TextWriter):
+    ext = "srt"
+
+    def write(self, segment):
+        self.count += 1
+        start = format_timestamp(segment["start"], "00:00:00,000")
+        end = format_timestamp(segment["end"], "00:00:00,000")
+        self.f.write(f"{self.count}\n{start} --> {end}\n{self.label(segment)}{segment['text']}\n\n")
+
+
+class _VttWriter(_TextWriter):
+    ext = "vtt"
+
+    def header(self, job_id):
+        self.f.write("WEBVTT\n\n")
+
+    def write(self, segment):
+        self.count += 1
+        start = format_timestamp(segment["start"], "00:00:00.000")
+        end = format_timestamp(segment["end"], "00:00:00.000")
+        voice = f"<v {segment['speaker']}>" if segment["speaker"] else ""
+        self.f.write(f"{start} --> {end}\n{voice}{segment['text']}\n\n")
+
+
+class _JsonWriter(_TextWriter):
+    ext = "json"
+
+    def header(self, job_id):
+        self.f.write(f'{{"job_id": {json.dumps(str(job_id))}, "segments": [\n')
+
+    def write(self, segment):
+        if self.count:
+            self.f.write(",\n")
+        self.count += 1
+        data = {"start": round(segment["start"], 3), "end": round(segment["end"], 3),
+                "speaker": segment["speaker"], "text": segment["text"]}
+        self.f.write(json.dumps(data, ensure_ascii=False))
+
+    def footer(self):
+        self.f.write("\n]}\n")
+
+
+DOCX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'),
+}
+
+
+class _DocxWriter(_TextWriter):
+    """Minimal WordprocessingML package, document.xml streamed into the zip."""
+    ext = "docx"
+
+    def __init__(self, path, job_id, timestamps):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.zip = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_DEFLATED)
+        for name, content in DOCX_PARTS.items():
+            self.zip.writestr(name, content)
+        self.f = self.zip.open("word/document.xml", "w")
+        self.timestamps = timestamps
+        self.count = 0
+        self.f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                     b'<w:body>')
+
+    def write(self, segment):
+        self.count += 1
+        lead = f"[{format_timestamp(segment['start'])}] " if self.timestamps else ""
+        lead += f"{segment['speaker']}: " if segment["speaker"] else ""
+        runs = f'<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">{escape(lead)}</w:t></w:r>' if lead else ""
+        runs += f'<w:r><w:t xml:space="preserve">{escape(segment["text"])}</w:t></w:r>'
+        self.f.write(f"<w:p>{runs}</w:p>".encode("utf-8"))
+
+    def close(self):
+        self.f.write(b"<w:sectPr/></w:body></w:document>")
+        self.f.close()
+        self.zip.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.f.close()
+        self.zip.close()
+        os.remove(self.tmp_path)
+
+
+WRITERS = {w.ext: w for w in (_TextWriter, _SrtWriter, _VttWriter, _DocxWriter, _JsonWriter)}
+
+
+def render(segments, output_dir, job_id, formats, timestamps=False):
+    """Write every format in `formats` from one pass over `segments`. Returns {format: path}."""
+    writers = [WRITERS[fmt](os.path.join(output_dir, f"transcript_{job_id}.{fmt}"), job_id, timestamps)
+               for fmt in formats]
+    try:
+        for segment in segments:
+            for writer in writers:
+                writer.write(segment)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.close()
+    return {fmt: writer.path for fmt, writer in zip(formats, writers)}
+
+
+def parse_formats(value):
+    """'txt,srt' -> ["txt", "srt"]; raises ValueError for unknown formats."""
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown formats: {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+    return list(dict.fromkeys(formats))
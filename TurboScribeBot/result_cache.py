@@ -0,0 +1,216 @@
+"""
+Content addressed cache of finished jobs.
+
+The key is a streaming SHA-256 of the media file (or the normalized link)
+plus the transcription options. On a hit the cached outputs are hardlinked
+(or copied) into the new job folder and the job skips upload/transcription.
+Only transcript outputs are cached, never the (possibly multi-GB) media.
+
+Configured from .env:
+    RESULT_CACHE_DIR       cache folder (default: cache), empty to disable
+    RESULT_CACHE_MAX_GB    size budget (default: 20)
+    RESULT_CACHE_MAX_DAYS  entries older than this are evicted (default: 30)
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+CHUNK_SIZE = 1024 * 1024
+MEDIA_SUFFIXES = (".mp3", ".mp4", ".m4a", ".wav", ".webm", ".ogg", ".opus", ".aac", ".flac",
+                  ".mkv", ".mov", ".avi")
+TRACKING_PARAMS = ("si", "feature", "fbclid", "gclid")
+
+
+def normalize_link(link):
+    """Normalize a media link so trivially different URLs share a cache entry."""
+    parsed = urlparse(link.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+
+    # youtu.be/<id> and youtube.com/shorts/<id> -> youtube.com/watch?v=<id>
+    if host == "youtu.be":
+        host, query, path = "youtube.com", [("v", path.lstrip("/"))] + query, "/watch"
+    elif host.endswith("youtube.com") and path.startswith("/shorts/"):
+        host, query, path = "youtube.com", [("v", path.split("/")[2])] + query, "/watch"
+
+    return urlunparse(("https", host, path, "", urlencode(sorted(query)), ""))
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory, max_bytes, max_age):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        directory = os.getenv("RESULT_CACHE_DIR", "cache")
+        if not directory:
+            return None
+        max_bytes = int(float(os.getenv("RESULT_CACHE_MAX_GB", 20)) * 1024 ** 3)
+        max_age = int(float(os.getenv("RESULT_CACHE_MAX_DAYS", 30)) * 86400)
+        return cls(directory, max_bytes, max_age)
+
+    # --- keys ---
+
+    def key(self, options, link=None, file=None, passcode=None):
+        if file:
+            media = f"file:{hash_file(file)}"
+        elif link:
+            media = f"link:{normalize_link(link)}|{passcode or ''}"
+        else:
+            return None
+        payload = json.dumps({"media": media, "options": options}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def _meta(self, key):
+        try:
+            with open(os.path.join(self._entry(key), "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry, meta):
+        tmp_path = os.path.join(entry, f".meta.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(entry, "meta.json"))
+
+    # --- lookup / store ---
+
+    def restore(self, key, output_dir, job_id, copy=False):
+        """
+        Link the cached outputs of `key` into output_dir; with `copy` (the job
+        folder changes owner afterwards) they are copied, so the shared
+        inodes of the cache and other jobs keep theirs.
+        Returns the cached report (with paths and ids rewritten) or None on a miss.
+        """
+        meta = self._meta(key)
+        if not meta or time.time() - meta["created"] > self.max_age:
+            return None
+
+        entry = self._entry(key)
+        # Rename files that carry the old job id, e.g. summary_51.txt -> summary_52.txt
+        old_id = re.compile(rf"(?<![0-9A-Za-z]){re.escape(str(meta['job_id']))}(?![0-9A-Za-z])")
+        for name in meta["files"]:
+            target = os.path.join(output_dir, old_id.sub(str(job_id), name))
+            if os.path.exists(target):
+                os.remove(target)
+            if copy:
+                shutil.copy2(os.path.join(entry, name), target)
+                continue
+            try:
+                os.link(os.path.join(entry, name), target)
+            except OSError:
+                shutil.copy2(os.path.join(entry, name), target)
+
+        meta["last_used"] = time.time()
+        meta["hits"] = meta.get("hits", 0) + 1
+        self._write_meta(entry, meta)
+
+        def rewrite(value):
+            # Point output paths of the cached report at the new job folder
+            if isinstance(value, dict):
+                return {k: rewrite(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [rewrite(v) for v in value]
+            if isinstance(value, str) and value.startswith(meta["output_dir"]):
+                name = os.path.basename(value)
+                if name not in meta["files"]:
+                    return None  # not cached (media)
+                return os.path.join(output_dir, old_id.sub(str(job_id), name))
+            return value
+
+        return rewrite(meta["report"])
+
+    def store(self, key, output_dir, job_id, report):
+        """
+        Copy the finished outputs of a job into the cache. Only completed
+        jobs are stored: partial or failed outputs would be served to every
+        later identical request. Returns True if an entry was written.
+        """
+        if report.get("job_metadata", {}).get("status") != "completed":
+            return False
+        entry = self._entry(key)
+        if os.path.exists(entry):
+            return False
+
+        skip = {f"{job_id}.log", f"report_{job_id}.json", f"progress_{job_id}.jsonl", f"checkpoint_{job_id}.json"}
+        tmp_entry = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(tmp_entry)
+
+        files, size = [], 0
+        for item in os.scandir(output_dir):
+            if (not item.is_file() or item.name in skip or item.name.startswith(".")
+                    or item.name.endswith(".crdownload") or item.name.lower().endswith(MEDIA_SUFFIXES)):
+                continue
+            try:
+                os.link(item.path, os.path.join(tmp_entry, item.name))
+            except OSError:
+                shutil.copy2(item.path, os.path.join(tmp_entry, item.name))
+            files.append(item.name)
+            size += item.stat().st_size
+
+        now = time.time()
+        self._write_meta(tmp_entry, {
+            "job_id": job_id,
+            "output_dir": output_dir,
+            "files": files,
+            "size": size,
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+            "report": report
+        })
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            shutil.rmtree(tmp_entry, ignore_errors=True)  # stored concurrently by another job
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size budget."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith("."):
+                continue
+            meta = self._meta(name)
+            if not meta or now - meta["created"] > self.max_age:
+                shutil.rmtree(self._entry(name), ignore_errors=True)
+                continue
+            entries.append((meta["last_used"], meta["size"], name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry(name), ignore_errors=True)
+            total -= size
@@ -0,0 +1,277 @@
+"""
+Retention for the outputs folder (replaces helper.period_delete).
+
+A small index (`<outputs>/.retention_index.json`) keeps, per job folder,
+its size, creation and last access time and the report status. Each pass:
+
+1. rescans only folders whose mtime changed since the last pass,
+2. picks expired jobs (not accessed for OUTPUTS_MAX_DAYS), then the least
+   recently used ones until the total is under OUTPUTS_MAX_GB,
+3. never picks running jobs (report status "processing" with activity in
+   the last RETENTION_RUNNING_GRACE seconds, or a fresh folder without a
+   report yet),
+4. renames picked folders to `.trash-*` (instant, atomic for readers) and
+   deletes trash a bounded number of files at a time.
+
+Passes run in a background thread; `run_once_in_background()` lets one-shot
+CLI processes share one pass per RETENTION_INTERVAL through a lock file.
+
+Retention is opt-in: nothing is deleted unless OUTPUTS_MAX_DAYS or
+OUTPUTS_MAX_GB is set, and an unset limit does not apply. The old DAY
+setting (read by the never-enabled period_delete) is ignored.
+"""
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+_MAX_GB = os.getenv("OUTPUTS_MAX_GB")
+_MAX_DAYS = os.getenv("OUTPUTS_MAX_DAYS")
+RETENTION_ENABLED = bool(_MAX_GB or _MAX_DAYS)
+OUTPUTS_MAX_BYTES = float(_MAX_GB) * 1024 ** 3 if _MAX_GB else float("inf")
+OUTPUTS_MAX_AGE = float(_MAX_DAYS) * 24 * 3600 if _MAX_DAYS else float("inf")
+RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", 600))
+RETENTION_RUNNING_GRACE = int(os.getenv("RETENTION_RUNNING_GRACE", 12 * 3600))
+DELETE_BATCH = 500  # files removed per step before yielding
+INDEX_NAME = ".retention_index.json"
+TRASH_PREFIX = ".trash-"
+
+
+def _scan(path):
+    """(total size, newest mtime, newest atime) of a folder tree."""
+    size, newest, accessed = 0, 0.0, 0.0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+            accessed = max(accessed, st.st_atime)
+    return size, newest, accessed
+
+
+def _report_status(path, name):
+    try:
+        with open(os.path.join(path, f"report_{name}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["job_metadata"]["status"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+class RetentionManager:
+    def __init__(self, root, max_bytes=OUTPUTS_MAX_BYTES, max_age=OUTPUTS_MAX_AGE,
+                 running_grace=RETENTION_RUNNING_GRACE, logger=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.running_grace = running_grace
+        self.logger = logger
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.stop_event = threading.Event()
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+
+    # --- index ---
+
+    def load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self, index):
+        tmp_path = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, index):
+        """Update the index for new / changed job folders and drop vanished ones."""
+        seen = set()
+        for entry in os.scandir(self.root):
+            if not entry.is_dir(follow_symlinks=False) or entry.name.startswith("."):
+                continue
+            seen.add(entry.name)
+            mtime = entry.stat().st_mtime
+            known = index.get(entry.name)
+            if known and known["dir_mtime"] == mtime and known["status"] != "processing":
+                continue
+            size, newest, accessed = _scan(entry.path)
+            index[entry.name] = {
+                "size": size,
+                "created": known["created"] if known else entry.stat().st_ctime,
+                "last_access": max(newest, accessed, known["last_access"] if known else 0),
+                "last_write": newest,
+                "status": _report_status(entry.path, entry.name),
+                "dir_mtime": mtime,
+            }
+        for name in set(index) - seen:
+            del index[name]
+        return index
+
+    def touch(self, job_id):
+        """Mark a job as used (e.g. when its results are served)."""
+        with self._locked() as locked:
+            if not locked:
+                return
+            index = self.load_index()
+            if job_id in index:
+                index[job_id]["last_access"] = time.time()
+                self.save_index(index)
+
+    # --- eviction ---
+
+    def running(self, info, now):
+        if info["status"] == "processing" or info["status"] is None:
+            return now - max(info["last_write"], info["created"]) < self.running_grace
+        return False
+
+    def select(self, index, now=None):
+        """Job folders to evict: expired first, then least recently used over the budget."""
+        now = now or time.time()
+        candidates = {name: info for name, info in index.items() if not self.running(info, now)}
+        victims = [name for name, info in candidates.items() if now - info["last_access"] > self.max_age]
+
+        total = sum(info["size"] for name, info in index.items() if name not in victims)
+        for name in sorted(set(candidates) - set(victims), key=lambda n: candidates[n]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            victims.append(name)
+            total -= candidates[name]["size"]
+        return victims
+
+    def empty_trash(self):
+        """Delete trashed folders, a batch of files at a time."""
+        for entry in os.scandir(self.root):
+            if not entry.name.startswith(TRASH_PREFIX):
+                continue
+            removed = 0
+            for dirpath, dirnames, filenames in os.walk(entry.path, topdown=False):
+                for name in filenames:
+                    try:
+                        os.remove(os.path.join(dirpath, name))
+                    except OSError:
+                        pass
+                    removed += 1
+                    if removed % DELETE_BATCH == 0:
+                        if self.stop_event.is_set():
+                            return
+                        time.sleep(0.01)  # let job I/O through
+                for name in dirnames:
+                    try:
+                        os.rmdir(os.path.join(dirpath, name))
+                    except OSError:
+                        pass
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def run_pass(self):
+        """One refresh + evict + delete pass. Returns the evicted job ids."""
+        if not os.path.isdir(self.root):
+            return []
+        with self._locked() as locked:
+            if not locked:
+                return []  # another process is collecting
+            index = self.refresh(self.load_index())
+            victims = self.select(index)
+            freed = 0
+            for name in victims:
+                try:
+                    os.rename(os.path.join(self.root, name),
+                              os.path.join(self.root, f"{TRASH_PREFIX}{name}-{uuid.uuid4().hex[:6]}"))
+                except OSError:
+                    continue
+                freed += index.pop(name)["size"]
+            self.save_index(index)
+        if victims:
+            self._log(f"🧹 Retention: evicting {len(victims)} job folder(s), {freed / 1024 / 1024:.1f} MB")
+        self.empty_trash()
+        return victims
+
+    def _locked(self):
+        return _FileLock(os.path.join(self.root, ".retention.lock"))
+
+    # --- background ---
+
+    def start(self, interval=RETENTION_INTERVAL):
+        """Run passes every `interval` seconds in a daemon thread."""
+        def loop():
+            while not self.stop_event.is_set():
+                try:
+                    self.run_pass()
+                except OSError as e:
+                    self._log(f"⚠️ Retention pass failed: {e}")
+                self.stop_event.wait(interval)
+
+        thread = threading.Thread(target=loop, name="retention", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_once_in_background(self, interval=RETENTION_INTERVAL):
+        """Start a single pass unless one ran in the last `interval` seconds (any process)."""
+        stamp = os.path.join(self.root, ".retention_last_run")
+        try:
+            if time.time() - os.path.getmtime(stamp) < interval:
+                return None
+        except OSError:
+            pass
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(stamp, "w"):
+                pass
+        except OSError:
+            return None
+
+        def once():
+            try:
+                self.run_pass()
+            except OSError as e:
+                self._log(f"⚠️ Retention pass failed: {e}")
+
+        thread = threading.Thread(target=once, name="retention", daemon=True)
+        thread.start()
+        return thread
+
+
+class _FileLock:
+    """Non-blocking exclusive flock; yields False if already held."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "w")
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            self.file.close()
+            self.file = None
+            return False
+
+    def __exit__(self, *exc):
+        if self.file:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        return False
@@ -0,0 +1,100 @@
+"""
+Encrypted on-disk store for authenticated browser sessions.
+
+After a successful login the bot saves its cookies and localStorage here,
+keyed by account. Later runs restore them into the driver and only fall
+back to the login form (and captcha solving) when the restored session
+no longer works. Without a secret (SESSION_KEY or the account password)
+nothing is persisted.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from cryptography.fernet import Fernet, InvalidToken
+
+SESSION_DIR = os.getenv("SESSION_DIR", "sessions")
+SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", 7 * 24 * 3600))
+
+
+class SessionStore:
+    def __init__(self, directory, secret, max_age=SESSION_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        self.secret = secret
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.secret)
+
+    @staticmethod
+    def _account(account):
+        """E-mail addresses are case-insensitive: one file and key per account."""
+        return account.strip().lower()
+
+    def _fernet(self, account):
+        # Key derived from the secret, salted with the account so every
+        # account file is encrypted with its own key.
+        raw = hashlib.pbkdf2_hmac("sha256", self.secret.encode(), self._account(account).encode(), 100_000)
+        return Fernet(base64.urlsafe_b64encode(raw))
+
+    def _path(self, account):
+        name = hashlib.sha256(self._account(account).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}.session")
+
+    def save(self, account, cookies, local_storage):
+        if not self.enabled:
+            raise ValueError("no SESSION_KEY or password to encrypt the session with")
+        data = {
+            "saved_at": time.time(),
+            "cookies": cookies,
+            "local_storage": local_storage
+        }
+        token = self._fernet(account).encrypt(json.dumps(data).encode())
+
+        path = self._path(account)
+        # Private from the start, and one temp file per writer
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self, account):
+        """Return the saved session dict, or None if missing, expired or unreadable."""
+        path = self._path(account)
+        if not self.enabled or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = json.loads(self._fernet(account).decrypt(f.read()))
+        except (OSError, ValueError, InvalidToken):
+            self.clear(account)
+            return None
+
+        if time.time() - data.get("saved_at", 0) > self.max_age:
+            self.clear(account)
+            return None
+        return data
+
+    def clear(self, account):
+        try:
+            os.remove(self._path(account))
+        except FileNotFoundError:
+            pass
+
+
+def default_store(password):
+    """Store configured from .env; SESSION_KEY falls back to the account password."""
+    return SessionStore(SESSION_DIR, os.getenv("SESSION_KEY") or password or "")
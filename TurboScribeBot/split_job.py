@@ -0,0 +1,456 @@
+"""
+Split-and-parallel transcription of long recordings (`--split MINUTES`).
+
+1. The local media is cut with ffmpeg into parts of about MINUTES each,
+   at the quietest point (silencedetect) near every target cut.
+2. Every part runs as an ordinary job (`<id>_p<k>`, outputs under
+   `{output}/{id}/parts/`) on pooled logged-in browser sessions, so
+   TurboScribe transcribes them in parallel: the worker's or batch's pool
+   when the job runs on one (with one extra slot while the job waits), else
+   a pool of `--concurrency` sessions. Parts keep their own checkpoints and
+   cache entries, so --resume only redoes missing parts.
+3. The parts' outputs are stitched into the job folder under the names a
+   single job would use: timestamps are shifted by each part's offset,
+   SRT/VTT cues renumbered, DOCX bodies concatenated, and speaker labels of
+   later parts mapped onto the labels already used (by talk time rank, the
+   best match available without the audio). Parts are always transcribed
+   with timestamps (to place them on the job timeline); without
+   --timestamps they are stripped from the stitched transcript again.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+from audio_prep import CODECS, UPLOAD_BITRATE, UPLOAD_CODEC, encode, media_duration, probe
+from render import (SPEAKER, SPEAKER_LINE, TS_PREFIX, TS_TOKEN, format_timestamp, parse_formats,
+                    parse_segments, parse_timestamp, render)
+
+SILENCE_NOISE = os.getenv("SPLIT_SILENCE_NOISE", "-35dB")
+SILENCE_MIN = float(os.getenv("SPLIT_SILENCE_MIN", "0.4"))
+SEARCH_WINDOW = 60  # seconds around each target cut searched for silence
+
+BOOKKEEPING = re.compile(r"(^report_.*\.json$|^progress_.*\.jsonl$|^checkpoint_.*\.json$|\.log$)")
+MEDIA_EXT = {".mp3", ".mp4", ".m4a", ".ogg", ".opus", ".wav", ".webm", ".aac", ".flac", ".mkv", ".mov"}
+
+DOCX_TEXT = re.compile(r"(<w:t(?:\s[^>]*)?>)([^<]*)(</w:t>)")
+DOCX_BODY = re.compile(r"<w:body>(.*?)(<w:sectPr\b(?:[^>]*/>|.*?</w:sectPr>))?\s*</w:body>", re.S)
+
+
+# --- cutting ---
+
+def silences(path, start, length):
+    """[(silence_start, silence_end), ...] in absolute seconds within the window."""
+    result = subprocess.run(
+        [shutil.which("ffmpeg"), "-nostdin", "-hide_banner", "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+         "-i", path, "-vn", "-af", f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN}", "-f", "null", "-"],
+        capture_output=True, text=True
+    )
+    found, current = [], None
+    for line in result.stderr.splitlines():
+        if "silence_start:" in line:
+            current = float(line.rsplit("silence_start:", 1)[1].split()[0])
+        elif "silence_end:" in line and current is not None:
+            end = float(line.rsplit("silence_end:", 1)[1].split()[0])
+            found.append((start + current, start + end))
+            current = None
+    return found
+
+
+def cut_points(path, duration, part_seconds):
+    """Cut positions (seconds) at the silence closest to each even split."""
+    count = math.ceil(duration / part_seconds)
+    points = []
+    for k in range(1, count):
+        target = duration * k / count
+        window_start = max(target - SEARCH_WINDOW, 0)
+        candidates = silences(path, window_start, 2 * SEARCH_WINDOW)
+        if candidates:
+            # middle of the longest silence, ties broken by distance to the target
+            best = max(candidates, key=lambda s: (round(s[1] - s[0], 1), -abs((s[0] + s[1]) / 2 - target)))
+            target = (best[0] + best[1]) / 2
+        points.append(round(target, 3))
+    return points
+
+
+def cut(path, points, duration, directory, codec=UPLOAD_CODEC, bitrate=UPLOAD_BITRATE):
+    """Write one compact audio file per part. Returns [{"file", "offset", "duration"}]."""
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    bounds = [0.0] + points + [duration]
+    segments = []
+    for k, (start, end) in enumerate(zip(bounds, bounds[1:]), 1):
+        target = os.path.join(directory, f"{stem}_part{k}{CODECS[codec][0]}")
+        encode(path, target, codec, bitrate, start=start, duration=end - start)
+        segments.append({"file": target, "offset": start, "duration": end - start})
+    return segments
+
+
+# --- stitching ---
+
+def shift_line(line, offset):
+    """Shift the leading timestamp(s) of a transcript/SRT/VTT line."""
+    prefix = TS_PREFIX.match(line)
+    if not prefix or not offset:
+        return line
+    shifted = TS_TOKEN.sub(lambda m: format_timestamp(parse_timestamp(m.group()) + offset, m.group()), prefix.group())
+    return shifted + line[prefix.end():]
+
+
+def strip_timestamps(line):
+    """'[00:05] Speaker 1: hi' / 'Speaker 1 (00:05): hi' -> 'Speaker 1: hi'"""
+    prefix = TS_PREFIX.match(line)
+    if prefix:
+        line = line[prefix.end():].lstrip(" :-–")
+    labelled = SPEAKER_LINE.match(line)
+    if labelled and labelled.group(2):
+        line = f"{labelled.group(1)}: {labelled.group(3)}"
+    return line
+
+
+def talk_time(text):
+    """Characters spoken per speaker number."""
+    counts, speaker = {}, None
+    for line in text.splitlines():
+        match = SPEAKER.search(line)
+        if match:
+            speaker = match.group(2)
+            line = line[match.end():]
+        if speaker:
+            counts[speaker] = counts.get(speaker, 0) + len(line.strip())
+    return counts
+
+
+def speaker_maps(texts):
+    """
+    Map each part's speaker numbers onto the job-wide ones: speakers are
+    matched by talk time rank against the totals so far; extra speakers get
+    new numbers.
+    """
+    totals, maps = {}, []
+    for text in texts:
+        counts = talk_time(text)
+        if not totals:
+            maps.append({speaker: speaker for speaker in counts})
+            totals.update(counts)
+            continue
+        ranked_global = sorted(totals, key=lambda s: -totals[s])
+        mapping = {}
+        next_number = max([int(s) for s in totals] + [0]) + 1
+        for rank, speaker in enumerate(sorted(counts, key=lambda s: -counts[s])):
+            if rank < len(ranked_global):
+                mapping[speaker] = ranked_global[rank]
+            else:
+                mapping[speaker] = str(next_number)
+                next_number += 1
+        for speaker, count in counts.items():
+            totals[mapping[speaker]] = totals.get(mapping[speaker], 0) + count
+        maps.append(mapping)
+    return maps
+
+
+def relabel(text, mapping):
+    return SPEAKER.sub(lambda m: f"{m.group(1)} {mapping.get(m.group(2), m.group(2))}", text)
+
+
+def stitch_text(texts, offsets, maps, name, timestamps=True):
+    """Join text outputs; subtitles get renumbered cues."""
+    subtitle = os.path.splitext(name)[1].lower() in (".srt", ".vtt")
+    strip = not timestamps and not subtitle
+    out, cue = [], 0
+    for k, (text, offset) in enumerate(zip(texts, offsets)):
+        lines = relabel(text, maps[k]).splitlines()
+        if subtitle and k and lines and lines[0].startswith("WEBVTT"):
+            lines = lines[1:]
+        for i, line in enumerate(lines):
+            if subtitle and line.strip().isdigit() and i + 1 < len(lines) and "-->" in lines[i + 1]:
+                cue += 1
+                line = str(cue)
+            if strip:
+                stripped = strip_timestamps(line)
+                if line.strip() and not stripped.strip():
+                    continue  # timestamp-only line
+                out.append(stripped)
+                continue
+            out.append(shift_line(line, offset))
+        if out and out[-1].strip():
+            out.append("")
+    return "\n".join(out).rstrip("\n") + "\n"
+
+
+def stitch_summaries(texts, offsets, durations):
+    """Summaries cannot be merged; keep one section per part."""
+    sections = []
+    for k, (text, offset, length) in enumerate(zip(texts, offsets, durations), 1):
+        header = f"[{format_timestamp(offset)} - {format_timestamp(offset + length)}]"
+        sections.append(f"{header}\n{text.strip()}")
+    return "\n\n".join(sections) + "\n"
+
+
+def stitch_docx(paths, offsets, maps, target, timestamps=True):
+    """Append the bodies of later parts' documents to the first one."""
+    place = shift_line if timestamps else (lambda text, offset: strip_timestamps(text))
+    bodies = []
+    for k, (path, offset) in enumerate(zip(paths, offsets)):
+        with zipfile.ZipFile(path) as z:
+            xml = z.read("word/document.xml").decode("utf-8")
+        body = DOCX_BODY.search(xml)
+        if not body:
+            raise ValueError(f"No document body in {path}")
+        content = DOCX_TEXT.sub(
+            lambda m: m.group(1) + relabel(place(m.group(2), offset), maps[k]) + m.group(3),
+            body.group(1))
+        bodies.append(content)
+        if k == 0:
+            first_xml, section = xml, body.group(2) or ""
+
+    merged = DOCX_BODY.sub(lambda m: f"<w:body>{''.join(bodies)}{section}</w:body>", first_xml, count=1)
+    tmp_path = f"{target}.tmp"
+    with zipfile.ZipFile(paths[0]) as src, zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = merged.encode("utf-8") if item.filename == "word/document.xml" else src.read(item)
+            dst.writestr(item, data)
+    os.replace(tmp_path, target)
+
+
+PART_ID, PART_TITLE = "\0id\0", "\0title\0"
+
+
+def part_outputs(part, k):
+    """
+    {name key: file name} of a part's outputs to stitch. The key replaces the
+    part id and the `_part<k>` of the exported title (the cut file's name),
+    so the same output matches across parts whatever TurboScribe names it.
+    """
+    rendered = f"transcript_{part['id']}."  # re-rendered from the parts' segments instead
+    id_re = re.compile(rf"(?<![0-9A-Za-z]){re.escape(part['id'])}(?![0-9A-Za-z])")
+    title_re = re.compile(rf"_part{k}(?![0-9])")
+    files = {}
+    for name in os.listdir(part["dir"]):
+        if (BOOKKEEPING.search(name) or os.path.splitext(name)[1].lower() in MEDIA_EXT
+                or name.startswith(rendered) or not os.path.isfile(os.path.join(part["dir"], name))):
+            continue
+        files[title_re.sub(PART_TITLE, id_re.sub(PART_ID, name))] = name
+    return files
+
+
+def job_audio(args, output_dir):
+    """--download_audio for a split job: the recording's audio track, not the (video) input."""
+    info = probe(args.file)
+    if info and not info[0]:
+        return shutil.copy2(args.file, os.path.join(output_dir, os.path.basename(args.file)))
+    stem = os.path.splitext(os.path.basename(args.file))[0]
+    target = os.path.join(output_dir, stem + CODECS[args.upload_codec][0])
+    encode(args.file, target, args.upload_codec, args.upload_bitrate)
+    return target
+
+
+def stitch(parts, output_dir, job_id, recognize_speakers, timestamps=True):
+    """
+    Merge the outputs of `parts` ([{"id", "dir", "offset", "duration"}]) into
+    output_dir; without `timestamps` they are stripped from transcript text.
+    Returns {output file name: source part file names}.
+    """
+    by_part = [part_outputs(p, k) for k, p in enumerate(parts, 1)]
+    offsets = [p["offset"] for p in parts]
+    texts_by_name, maps = {}, None
+    merged = {}
+
+    for key in sorted(by_part[0]):
+        name = by_part[0][key]
+        missing = [f"{p['dir']}: {key}" for p, files in zip(parts, by_part) if key not in files]
+        if missing:
+            raise FileNotFoundError(f"Part outputs missing: {missing}")
+        part_files = [os.path.join(p["dir"], files[key]) for p, files in zip(parts, by_part)]
+        target = os.path.join(output_dir, key.replace(PART_ID, str(job_id)).replace(PART_TITLE, ""))
+        ext = os.path.splitext(name)[1].lower()
+
+        if ext == ".docx":
+            texts_by_name[name] = (part_files, target, "docx")
+            continue
+        if ext not in (".txt", ".srt", ".vtt", ".md"):
+            shutil.copy2(part_files[0], target)
+            merged[os.path.basename(target)] = [os.path.basename(part_files[0])]
+            continue
+        texts = []
+        for f in part_files:
+            with open(f, "r", encoding="utf-8") as fh:
+                texts.append(fh.read())
+        texts_by_name[name] = (part_files, target, texts)
+
+    # Speaker numbers are matched on the longest text output (the transcript)
+    identity = [{} for _ in parts]
+    if recognize_speakers:
+        plain = [v for v in texts_by_name.values() if v[2] != "docx" and "summary" not in v[1]]
+        if plain:
+            maps = speaker_maps(max(plain, key=lambda v: sum(map(len, v[2])))[2])
+    maps = maps or identity
+
+    for name, (part_files, target, texts) in texts_by_name.items():
+        if texts == "docx":
+            stitch_docx(part_files, offsets, maps, target, timestamps)
+        else:
+            if "summary" in name.lower():
+                content = stitch_summaries(texts, offsets, [p["duration"] for p in parts])
+            else:
+                content = stitch_text(texts, offsets, maps, name, timestamps)
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+        merged[os.path.basename(target)] = [os.path.basename(f) for f in part_files]
+    return merged, maps
+
+
+def stitched_segments(parts, maps):
+    """The parts' rendered JSON segments on the job timeline, one at a time."""
+    for k, part in enumerate(parts):
+        for segment in parse_segments(os.path.join(part["dir"], f"transcript_{part['id']}.json")):
+            segment["start"] += part["offset"]
+            segment["end"] += part["offset"]
+            if segment["speaker"]:
+                segment["speaker"] = relabel(segment["speaker"], maps[k])
+            yield segment
+
+
+# --- job flow ---
+
+def part_job(args, segment, part_id, parts_dir):
+    """CLI-style job dict for one part (same options, local segment upload)."""
+    job = {
+        "id": part_id,
+        "output": parts_dir,
+        "file": segment["file"],
+        "language": args.language,
+        "model": args.model,
+        "speakers": args.speakers,
+        "transcribe": args.transcribe,
+        "restore": args.restore,
+        "timestamps": True,  # needed to place the part's text on the job timeline
+        "short_summary": args.short_summary,
+        "detail_summary": args.detail_summary,
+        "translate": args.translate,
+        "no_cache": args.no_cache,
+        "resume": args.resume,
+        "no_compress": True,
+    }
+    if args.formats:
+        job["formats"] = "json"  # segments for rendering the job-wide formats
+    return job
+
+
+def run_split(bot, args, output_dir, pipeline):
+    """
+    Transcribe `args.file` as parallel parts when it is longer than
+    --split minutes. Returns False (nothing done) for shorter media.
+    """
+    from main import job_argv, parse_args
+    from session_store import SESSION_DIR
+    from worker import SessionPool, run_on_pool
+
+    part_seconds = args.split * 60
+    duration = pipeline.state.get("split_duration") or media_duration(args.file)
+    if not duration or duration <= part_seconds * 1.2:
+        if not duration:
+            bot.logger.warning("⚠️ Media duration unknown (ffprobe missing?), transcribing as one job")
+        return False
+    pipeline.state["split_duration"] = duration
+
+    parts_dir = os.path.join(output_dir, "parts")
+
+    def split_media():
+        points = cut_points(args.file, duration, part_seconds)
+        segments = cut(args.file, points, duration, os.path.join(parts_dir, "media"))
+        pipeline.state["segments"] = segments
+        bot.logger.info(f"✂️ Split {duration / 60:.1f} min into {len(segments)} parts at {points}")
+
+    pipeline.step("split_media", split_media)
+    segments = pipeline.state["segments"]
+    parts = [
+        dict(segment, id=f"{args.id}_p{k}", dir=os.path.join(parts_dir, f"{args.id}_p{k}"))
+        for k, segment in enumerate(segments, 1)
+    ]
+
+    def transcribe_parts():
+        pending = []
+        for part, segment in zip(parts, segments):
+            if args.resume and _part_done(part):
+                bot.logger.info(f"⏩ Part {part['id']} already completed")
+                continue
+            pending.append(parse_args(job_argv(part_job(args, segment, part["id"], parts_dir))))
+        if not pending:
+            return
+        if bot.accounts and bot.account_reserved:
+            # The parent submits nothing itself: free its account slot for the parts
+            bot.account_reserved = False
+            bot.accounts.release(bot.account, args.id)
+
+        size = max(1, min(args.concurrency, len(pending)))
+        pool = bot.pool
+        if pool:
+            # Worker / batch: the parts share the caller's pool. This job keeps
+            # its session meanwhile, so the pool gets one extra slot.
+            bot.logger.info(f"🚀 Transcribing {len(pending)} part(s) on the shared session pool")
+            slot = pool.extra_slot()
+        else:
+            bot.logger.info(f"🚀 Transcribing {len(pending)} part(s) on {size} browser session(s)")
+            # CLI: the parts' sessions schedule on the parent's account pool
+            pool = SessionPool(size, os.path.join(SESSION_DIR, "pool"), headless=bot.headless,
+                               accounts=bot.accounts)
+            slot = nullcontext()
+        try:
+            with slot:
+                if not bot.pool:
+                    pool.warm_up()
+                with ThreadPoolExecutor(max_workers=size) as executor:
+                    results = list(executor.map(lambda part_args: run_on_pool(pool, part_args), pending))
+        finally:
+            if not bot.pool:
+                pool.shutdown()
+        failed = [a.id for a, ok in zip(pending, results) if not ok]
+        if failed:
+            raise RuntimeError(f"Parts failed: {failed} (rerun with --resume)")
+
+    pipeline.step("transcribe_parts", transcribe_parts)
+
+    def merge():
+        outputs, maps = stitch(parts, output_dir, args.id, bool(args.speakers), bool(args.timestamps))
+        bot.report["split"] = {
+            "duration": round(duration, 3),
+            "parts": [{"id": p["id"], "offset": round(p["offset"], 3), "duration": round(p["duration"], 3)}
+                      for p in parts],
+            "outputs": outputs,
+            "speaker_map": maps if args.speakers else None,
+        }
+        bot.report["outputs"].update({
+            name: os.path.join(output_dir, name) for name in outputs
+        })
+        bot.report["status_log"].append({
+            "step": "stitch",
+            "files": sorted(outputs),
+            "time": datetime.now().isoformat()
+        })
+        if args.formats:
+            paths = render(stitched_segments(parts, maps), output_dir, args.id,
+                           parse_formats(args.formats), bool(args.timestamps))
+            bot.report["outputs"].update({f"transcript_{fmt}": path for fmt, path in paths.items()})
+        if args.download_audio:
+            bot.report["outputs"]["audio"] = job_audio(args, output_dir)
+        shutil.rmtree(os.path.join(parts_dir, "media"), ignore_errors=True)
+
+    pipeline.step("stitch", merge)
+    return True
+
+
+def _part_done(part):
+    try:
+        with open(os.path.join(part["dir"], f"report_{part['id']}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["job_metadata"]["status"] == "completed"
+    except (OSError, ValueError, KeyError):
+        return False
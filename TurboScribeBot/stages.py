@@ -0,0 +1,163 @@
+"""
+Staged executor: every stage has its own bounded queue and worker pool.
+
+    executor = StagedExecutor([Stage("source", fetch, workers=2), Stage("upload", upload, workers=2), ...])
+    executor.start()
+    executor.submit(job, "source")
+    executor.join()
+
+A stage function takes the job and returns the name of the stage it moves to
+next (always a later one), or None when the job is finished. A full queue
+blocks the stage feeding it, so a slow stage holds back the ones before it
+instead of piling up work.
+
+Per stage the executor tracks queue depth, busy workers, utilization (busy
+worker time / (workers x elapsed time)) and throughput. `stats()` returns
+them, they are served as gauges on the worker's /metrics endpoint and
+written to `$METRICS_DIR/stages.json` every STAGE_STATS_INTERVAL seconds, so
+each pool can be sized to its load.
+"""
+import os
+import queue
+import threading
+import time
+
+from job_logging import console_logger
+from metrics import METRICS_DIR, REGISTRY
+from progress import write_json_atomic
+
+logger = console_logger("stages")
+
+STAGE_STATS_INTERVAL = int(os.getenv("STAGE_STATS_INTERVAL", 30))
+_STOP = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1, capacity=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=capacity if capacity is not None else workers * 2)
+        self.busy = {}  # thread name -> start time of the job it runs
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self.failed = 0
+
+
+class StagedExecutor:
+    def __init__(self, stages, on_done=None, stats_path=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.on_done = on_done  # (job, error) once a job leaves the last stage it needs
+        self.stats_path = stats_path or (os.path.join(METRICS_DIR, "stages.json") if METRICS_DIR else None)
+        self.lock = threading.Lock()
+        self.finished = threading.Condition(self.lock)
+        self.in_flight = 0
+        self.started = None
+        self.threads = []
+        self.stop_event = threading.Event()
+
+    def start(self):
+        self.started = time.time()
+        for stage in self.stages.values():
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(stage,), name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        threading.Thread(target=self._report_loop, name="stage-stats", daemon=True).start()
+        return self
+
+    def submit(self, job, stage):
+        """Queue a job at `stage`; blocks while that stage's queue is full."""
+        with self.lock:
+            self.in_flight += 1
+        self.stages[stage].queue.put(job)
+
+    def _work(self, stage):
+        name = threading.current_thread().name
+        while True:
+            job = stage.queue.get()
+            if job is _STOP:
+                return
+            started = time.time()
+            with self.lock:
+                stage.busy[name] = started
+            next_stage, error = None, None
+            try:
+                next_stage = stage.func(job)
+                if next_stage and self.order.index(next_stage) <= self.order.index(stage.name):
+                    raise RuntimeError(f"Stage {stage.name} cannot move a job back to {next_stage}")
+            except Exception as e:
+                error = e
+
+            seconds = time.time() - started
+            with self.lock:
+                del stage.busy[name]
+                stage.busy_seconds += seconds
+                stage.processed += 1
+                stage.failed += error is not None
+            REGISTRY.observe(f"stage:{stage.name}", seconds, errors=int(error is not None))
+
+            if next_stage and error is None:
+                self.stages[next_stage].queue.put(job)
+                continue
+            if self.on_done:
+                self.on_done(job, error)
+            with self.lock:
+                self.in_flight -= 1
+                self.finished.notify_all()
+
+    def stats(self):
+        """{stage: {"workers", "queued", "busy", "utilization", "processed", "failed", "avg_seconds"}}"""
+        now = time.time()
+        elapsed = max(now - (self.started or now), 0.001)
+        result = {}
+        with self.lock:
+            for name in self.order:
+                stage = self.stages[name]
+                busy_time = stage.busy_seconds + sum(now - since for since in stage.busy.values())
+                result[name] = {
+                    "workers": stage.workers,
+                    "queued": stage.queue.qsize(),
+                    "busy": len(stage.busy),
+                    "utilization": round(busy_time / (stage.workers * elapsed), 3),
+                    "processed": stage.processed,
+                    "failed": stage.failed,
+                    "avg_seconds": round(stage.busy_seconds / stage.processed, 3) if stage.processed else None,
+                }
+        return result
+
+    def publish(self):
+        """Update the /metrics gauges and the stats file."""
+        stats = self.stats()
+        for name, s in stats.items():
+            REGISTRY.set_gauge("turboscribe_stage_queue_depth", s["queued"], stage=name)
+            REGISTRY.set_gauge("turboscribe_stage_busy_workers", s["busy"], stage=name)
+            REGISTRY.set_gauge("turboscribe_stage_workers", s["workers"], stage=name)
+            REGISTRY.set_gauge("turboscribe_stage_utilization", s["utilization"], stage=name)
+        if self.stats_path:
+            try:
+                os.makedirs(os.path.dirname(self.stats_path) or ".", exist_ok=True)
+                write_json_atomic(self.stats_path, {"elapsed": round(time.time() - self.started, 3), "stages": stats})
+            except OSError:
+                pass
+        return stats
+
+    def _report_loop(self):
+        while not self.stop_event.wait(STAGE_STATS_INTERVAL):
+            stats = self.publish()
+            logger.info("📊 Stages: " + ", ".join(
+                f"{name} {s['busy']}/{s['workers']} busy, {s['queued']} queued, {s['utilization']:.0%}"
+                for name, s in stats.items()))
+
+    def join(self):
+        """Wait until every submitted job is finished, then stop the workers."""
+        with self.lock:
+            self.finished.wait_for(lambda: self.in_flight == 0)
+        self.stop_event.set()
+        for stage in self.stages.values():
+            for _ in range(stage.workers):
+                stage.queue.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        return self.publish()
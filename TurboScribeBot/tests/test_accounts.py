@@ -0,0 +1,29 @@
+import json
+import logging
+
+import pytest
+
+pytest.importorskip("cryptography")  # session_store, imported for its SESSION_DIR
+
+import accounts
+from accounts import Account, AccountPool, NoAccountAvailable
+
+
+def test_unknown_account_keys_are_ignored(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps([{"email": "a@x", "password": "p", "max_concurrent": 2, "note": "team"}]))
+    monkeypatch.setattr(accounts, "ACCOUNTS_FILE", str(path))
+    with caplog.at_level(logging.WARNING, logger="turboscribe.accounts"):
+        pool = AccountPool.from_env()
+    assert pool.accounts["a@x"].max_concurrent == 2
+    assert "note" in caplog.text
+
+
+def test_wait_for_a_slot_is_logged_and_bounded(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(accounts, "ACCOUNT_WAIT_POLL", 0.05)
+    pool = AccountPool([Account("a@x", "p", max_concurrent=1)], state_path=str(tmp_path / "state.json"))
+    pool.acquire("1")
+    caplog.set_level(logging.INFO, logger="turboscribe.accounts")
+    with pytest.raises(NoAccountAvailable):
+        pool.acquire("2", timeout=0.2)
+    assert "Job 2 waiting for a free account slot" in caplog.text
@@ -0,0 +1,164 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from captcha import CaptchaError, CaptchaSolver, get_solver
+
+
+class Fake2Captcha:
+    """in.php / res.php of 2Captcha: each captcha is ready after `polls` not-ready answers."""
+
+    def __init__(self, polls=1, fail_submit=False):
+        self.polls = polls
+        self.fail_submit = fail_submit
+        self.pending = {}
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+                if fake.fail_submit:
+                    return self._answer({"status": 0, "request": "ERROR_WRONG_USER_KEY"})
+                with fake.lock:
+                    captcha_id = str(len(fake.pending) + 1)
+                    fake.pending[captcha_id] = [fake.polls, form["googlekey"][0]]
+                self._answer({"status": 1, "request": captcha_id})
+
+            def do_GET(self):
+                captcha_id = parse_qs(urlparse(self.path).query)["id"][0]
+                with fake.lock:
+                    entry = fake.pending[captcha_id]
+                    entry[0] -= 1
+                    ready = entry[0] < 0
+                if ready:
+                    return self._answer({"status": 1, "request": f"token-{entry[1]}"})
+                self._answer({"status": 0, "request": "CAPCHA_NOT_READY"})
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def fake():
+    server = Fake2Captcha()
+    yield server
+    server.close()
+
+
+def make_solver(url):
+    return CaptchaSolver("key", base_url=url, typical_solve_time=0.01, retry_interval=0.01, max_interval=0.02)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def job_logger(name):
+    logger = logging.getLogger(f"test-captcha-{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = ListHandler()
+    logger.handlers = [handler]
+    return logger, handler.messages
+
+
+def test_solve_polls_until_ready(fake):
+    solver = make_solver(fake.url)
+    assert solver.solve("site-a", "https://example.com") == "token-site-a"
+    solver.close()
+
+
+def test_submit_error_raises():
+    server = Fake2Captcha(fail_submit=True)
+    solver = make_solver(server.url)
+    with pytest.raises(CaptchaError):
+        solver.solve("site-a", "https://example.com")
+    solver.close()
+    server.close()
+
+
+def test_timeout_raises():
+    server = Fake2Captcha(polls=1000)
+    solver = CaptchaSolver("key", base_url=server.url, typical_solve_time=0.01,
+                           retry_interval=0.01, max_interval=0.01, timeout=0.2)
+    with pytest.raises(CaptchaError):
+        solver.solve("site-a", "https://example.com")
+    solver.close()
+    server.close()
+
+
+def test_concurrent_jobs_log_to_their_own_logger(fake):
+    solver = make_solver(fake.url)
+    logger_a, lines_a = job_logger("a")
+    logger_b, lines_b = job_logger("b")
+
+    future_a = solver.solve_async("site-a", "https://a.example", logger=logger_a)
+    future_b = solver.solve_async("site-b", "https://b.example", logger=logger_b)
+    assert future_a.result(timeout=10) == "token-site-a"
+    assert future_b.result(timeout=10) == "token-site-b"
+
+    sent_a = [line for line in lines_a if "sent to 2Captcha" in line]
+    sent_b = [line for line in lines_b if "sent to 2Captcha" in line]
+    assert len(sent_a) == 1 and len(sent_b) == 1 and sent_a != sent_b
+    assert sum("solved" in line for line in lines_a) == 1
+    assert sum("solved" in line for line in lines_b) == 1
+    solver.close()
+
+
+def test_shared_solver_per_key():
+    assert get_solver("same-key") is get_solver("same-key")
+    assert get_solver("same-key") is not get_solver("other-key")
+
+
+def test_learns_typical_solve_time(fake):
+    solver = make_solver(fake.url)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda i: solver.solve(f"site-{i}", "https://example.com"), range(2)))
+    assert solver.typical_solve_time > 0.01 * 0.7
+    solver.close()
+
+
+def test_background_solve_records_on_the_calling_bot(fake):
+    import metrics
+
+    class Bot:
+        def __init__(self):
+            self.report = {}
+            self.report_lock = threading.Lock()
+
+    solver = make_solver(fake.url)
+    explicit, implicit = Bot(), Bot()
+    solver.solve_async("site-a", "https://example.com", bot=explicit).result(timeout=10)
+    metrics._local.bot = implicit
+    try:
+        solver.solve_async("site-b", "https://example.com").result(timeout=10)
+    finally:
+        metrics._local.bot = None
+    assert explicit.report["metrics"]["steps"]["captcha_service"]["calls"] == 1
+    assert implicit.report["metrics"]["steps"]["captcha_service"]["calls"] == 1
+    solver.close()
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import direct_upload
+from direct_upload import CHUNK_ALIGN, DirectUploader, UploadError
+
+
+class FakeResumable:
+    """Resumable upload session: 308 + Range per chunk, 201 + JSON when complete."""
+
+    def __init__(self, fail_puts=(), omit_range=False):
+        self.data = bytearray()
+        self.fail_puts = set(fail_puts)  # indexes of PUTs answered with 500
+        self.omit_range = omit_range
+        self.puts = 0
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self, status, headers=None, body=b""):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                match = re.match(r"bytes (?:(\d+)-(\d+)|\*)/(\d+)", self.headers["Content-Range"])
+                total = int(match.group(3))
+                with fake.lock:
+                    fake.puts += 1
+                    if fake.puts in fake.fail_puts:
+                        return self._answer(500)
+                    if match.group(1) is not None and int(match.group(1)) == len(fake.data):
+                        fake.data += body
+                    held = len(fake.data)
+                if held >= total:
+                    return self._answer(201, body=json.dumps({"file_id": "f1", "size": held}).encode())
+                headers = {} if fake.omit_range or not held else {"Range": f"bytes=0-{held - 1}"}
+                self._answer(308, headers)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/session"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(direct_upload.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "talk.opus"
+    path.write_bytes(os.urandom(3 * CHUNK_ALIGN + 1000))
+    return str(path)
+
+
+def uploader(**kwargs):
+    return DirectUploader(requests.Session(), chunk_size=CHUNK_ALIGN, **kwargs)
+
+
+def test_upload_in_chunks(media, tmp_path):
+    fake = FakeResumable()
+    progress = []
+    try:
+        info = uploader(on_progress=lambda sent, total: progress.append(sent)).upload(
+            media, lambda: {"session_url": fake.url}, str(tmp_path / "state.json"))
+    finally:
+        fake.close()
+    with open(media, "rb") as f:
+        assert bytes(fake.data) == f.read()
+    assert progress == [CHUNK_ALIGN, 2 * CHUNK_ALIGN, 3 * CHUNK_ALIGN, os.path.getsize(media)]
+    assert info["response"] == {"file_id": "f1", "size": os.path.getsize(media)}
+    assert info["resumed_from"] == 0 and info["retries"] == 0
+    assert not os.path.exists(tmp_path / "state.json")
+
+
+def test_failed_chunk_continues_from_confirmed_offset(media, tmp_path):
+    fake = FakeResumable(fail_puts={2})
+    try:
+        info = uploader().upload(media, lambda: {"session_url": fake.url}, str(tmp_path / "state.json"))
+    finally:
+        fake.close()
+    with open(media, "rb") as f:
+        assert bytes(fake.data) == f.read()
+    assert info["retries"] == 1
+
+
+def test_unconfirmed_chunks_count_as_failures(media, tmp_path):
+    fake = FakeResumable(omit_range=True)
+    try:
+        with pytest.raises(UploadError):
+            uploader(retries=3).upload(media, lambda: {"session_url": fake.url}, str(tmp_path / "state.json"))
+    finally:
+        fake.close()
+    assert fake.puts < 20
+
+
+def test_resume_from_saved_session(media, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    fake = FakeResumable(fail_puts={3})
+    try:
+        with pytest.raises(UploadError):
+            uploader(retries=0).upload(media, lambda: {"session_url": fake.url}, state_path)
+        assert os.path.exists(state_path)
+
+        info = uploader().upload(media, lambda: pytest.fail("new session opened"), state_path)
+    finally:
+        fake.close()
+    with open(media, "rb") as f:
+        assert bytes(fake.data) == f.read()
+    assert info["resumed_from"] == 2 * CHUNK_ALIGN
+
+
+def test_resume_of_complete_upload_keeps_the_answer(media, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    fake = FakeResumable()
+    try:
+        uploader().upload(media, lambda: {"session_url": fake.url}, state_path)
+        # The previous run was interrupted after the last chunk, before its state was removed
+        with open(state_path, "w") as f:
+            json.dump({"file": direct_upload._file_identity(media), "target": {"session_url": fake.url}}, f)
+        info = uploader().upload(media, lambda: pytest.fail("new session opened"), state_path)
+    finally:
+        fake.close()
+    assert info["resumed_from"] == os.path.getsize(media)
+    assert info["response"]["file_id"] == "f1"
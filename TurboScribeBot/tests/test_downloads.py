@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+import pytest
+
+from downloads import IN_CREATE, IN_DELETE, IN_MOVED_FROM, IN_MOVED_TO, DownloadError, DownloadTracker
+
+
+def later(seconds, func, *args):
+    timer = threading.Timer(seconds, func, args)
+    timer.start()
+    return timer
+
+
+def write(path, data=b"x" * 1000):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def tracker(request, tmp_path):
+    tracker = DownloadTracker(str(tmp_path), poll_interval=0.02).start()
+    if request.param == "poll":
+        tracker.close()  # no watch: the directory scan fallback
+    elif tracker.fd is None:
+        pytest.skip("inotify unavailable")
+    yield tracker
+    tracker.close()
+
+
+def test_rename_completes_download(tracker, tmp_path):
+    temp = tmp_path / "audio.mp3.crdownload"
+    write(temp)
+    later(0.1, os.rename, temp, tmp_path / "audio.mp3")
+    files = tracker.wait(timeout=5)
+    assert [f["file"] for f in files] == ["audio.mp3"] and files[0]["size"] == 1000
+
+
+def test_temp_to_temp_rename_is_followed(tracker, tmp_path):
+    unconfirmed = tmp_path / "Unconfirmed 123.crdownload"
+    write(unconfirmed)
+
+    def finish():
+        os.rename(unconfirmed, tmp_path / "audio.mp3.crdownload")
+        time.sleep(0.1)
+        os.rename(tmp_path / "audio.mp3.crdownload", tmp_path / "audio.mp3")
+
+    later(0.1, finish)
+    assert [f["file"] for f in tracker.wait(timeout=5)] == ["audio.mp3"]
+    assert not tracker.failed
+
+
+def test_failed_download_raises_at_once(tracker, tmp_path):
+    temp = tmp_path / "audio.mp3.crdownload"
+    write(temp)
+    later(0.1, os.remove, temp)
+    started = time.time()
+    with pytest.raises(DownloadError):
+        tracker.wait(timeout=30)
+    assert time.time() - started < 5
+
+
+def test_no_download(tracker):
+    assert tracker.wait(timeout=5, start_timeout=0.2, required=False) == []
+    with pytest.raises(TimeoutError):
+        tracker.wait(timeout=5, start_timeout=0.2)
+
+
+def test_direct_write_and_ignored_files(tracker, tmp_path):
+    write(tmp_path / "job.log")
+    write(tmp_path / ".hidden")
+    later(0.1, write, tmp_path / "summary.txt")
+    assert [f["file"] for f in tracker.wait(timeout=5)] == ["summary.txt"]
+
+
+def test_event_sequence(tmp_path):
+    tracker = DownloadTracker(str(tmp_path))
+    tracker._on_event(IN_CREATE, 0, "Unconfirmed 1.crdownload")
+    tracker._on_event(IN_MOVED_FROM, 7, "Unconfirmed 1.crdownload")
+    tracker._on_event(IN_MOVED_TO, 7, "talk.mp3.crdownload")
+    assert list(tracker.in_progress) == ["talk.mp3.crdownload"] and not tracker.moves
+
+    tracker._on_event(IN_MOVED_FROM, 8, "talk.mp3.crdownload")
+    tracker._on_event(IN_MOVED_TO, 8, "talk.mp3")
+    assert [f["file"] for f in tracker.completed] == ["talk.mp3"]
+    assert not tracker.in_progress and not tracker.moves
+
+    tracker._on_event(IN_CREATE, 0, "other.mp3.crdownload")
+    tracker._on_event(IN_DELETE, 0, "other.mp3.crdownload")
+    assert [f["file"] for f in tracker.failed] == ["other.mp3.crdownload"]
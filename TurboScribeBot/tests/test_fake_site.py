@@ -0,0 +1,31 @@
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+
+import fake_site  # noqa: E402
+
+
+def get(url, headers=None):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def test_media_route_serves_audio_with_ranges():
+    server, base_url = fake_site.start(media_seconds=2)
+    try:
+        status, headers, mp3 = get(f"{base_url}/media/1.mp3")
+        assert status == 200 and headers["Content-Type"] == "audio/mpeg"
+        frame = len(fake_site.MP3_FRAME)
+        assert len(mp3) % frame == 0 and len(mp3) // frame == int(2 * 44100 / 1152)
+        assert all(mp3[i:i + 2] == b"\xff\xfb" for i in range(0, len(mp3), frame))
+
+        status, headers, part = get(f"{base_url}/media/1.mp3", {"Range": "bytes=100-199"})
+        assert status == 206 and part == mp3[100:200]
+        assert headers["Content-Range"] == f"bytes 100-199/{len(mp3)}"
+
+        status, headers, wav = get(f"{base_url}/media/2.wav")
+        assert wav[:4] == b"RIFF" and wav[8:12] == b"WAVE" and len(wav) == 44 + 2 * 16000 * 2
+    finally:
+        server.shutdown()
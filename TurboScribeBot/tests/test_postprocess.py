@@ -0,0 +1,60 @@
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from postprocess import PostProcessScheduler
+
+
+class FakeBot:
+    """Saves files into the job folder like the bot's download steps do."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.artifacts = []
+        self.logger = logging.getLogger("test_postprocess")
+        self.report = {"status_log": []}
+        self.progress = SimpleNamespace(step=lambda name: nullcontext())
+        self.transcript_url = "https://example.com/t/1"
+
+    def save(self, name):
+        with open(os.path.join(self.output_dir, name), "w") as f:
+            f.write(name)
+        self.artifacts.append(name)
+
+    def fork(self):
+        return FakeBot(self.output_dir)
+
+    def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self):
+        self.done, self.marks = set(), {}
+
+    def mark(self, name, artifacts=(), seconds=None):
+        self.marks[name] = sorted(artifacts)
+
+
+def test_concurrent_groups_keep_their_own_artifacts(tmp_path):
+    bot, pipeline = FakeBot(str(tmp_path)), FakePipeline()
+    args = SimpleNamespace(short_summary=True, detail_summary=False, translate=None)
+    scheduler = PostProcessScheduler(bot, args, str(tmp_path), pipeline=pipeline)
+    barrier = threading.Barrier(2)
+
+    def group(*names):
+        def run(session):
+            barrier.wait(timeout=5)  # both groups write to the folder at the same time
+            for name in names:
+                session.save(name)
+                time.sleep(0.01)
+        return run
+
+    scheduler.groups = lambda: [("results", group("transcript.txt", "audio.mp3")),
+                                ("summaries", group("summary.txt"))]
+    scheduler.run()
+    assert pipeline.marks == {"postprocess:results": ["audio.mp3", "transcript.txt"],
+                              "postprocess:summaries": ["summary.txt"]}
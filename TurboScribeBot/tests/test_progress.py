@@ -0,0 +1,49 @@
+import json
+import time
+from datetime import datetime
+
+from progress import ProgressWriter, write_json_atomic
+
+
+def read_events(writer):
+    with open(writer.path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_events_carry_utc_offset(tmp_path):
+    writer = ProgressWriter(str(tmp_path), "51")
+    writer.emit("job_start")
+    ts = datetime.fromisoformat(read_events(writer)[0]["ts"])
+    assert ts.tzinfo is not None
+
+
+def test_heartbeat_during_long_wait(tmp_path):
+    writer = ProgressWriter(str(tmp_path), "51")
+    with writer.heartbeat("transcribe", interval=0.05):
+        time.sleep(0.3)
+    events = read_events(writer)
+    assert len(events) >= 3
+    assert {e["event"] for e in events} == {"heartbeat"} and events[0]["step"] == "transcribe"
+
+    # No more beats once the wait is over
+    count = len(events)
+    time.sleep(0.15)
+    assert len(read_events(writer)) == count
+
+
+def test_step_records_failure(tmp_path):
+    writer = ProgressWriter(str(tmp_path), "51")
+    try:
+        with writer.step("submit"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    start, end = read_events(writer)
+    assert (start["event"], end["status"], end["error"]) == ("step_start", "failed", "boom")
+
+
+def test_write_json_atomic_leaves_no_temp(tmp_path):
+    path = tmp_path / "report_51.json"
+    write_json_atomic(str(path), {"a": 1})
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["report_51.json"]
@@ -0,0 +1,79 @@
+import json
+import zipfile
+
+import pytest
+
+from render import format_timestamp, parse_formats, parse_segments, parse_timestamp, render
+
+SRT = """1
+00:00:00,000 --> 00:00:02,500
+Speaker 1: Hello there.
+
+2
+00:00:02,500 --> 00:00:04,000
+42
+
+3
+00:00:04,000 --> 00:00:06,000
+Speaker 2: 7
+"""
+
+TXT = """[00:00] Speaker 1: Good morning.
+[00:04] Speaker 2: Hi,
+how are you?
+Speaker 1 (00:09): Fine.
+"""
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_timestamps_round_trip():
+    assert parse_timestamp("01:02:03,5") == 3723.5
+    assert parse_timestamp("00:05") == 5
+    assert format_timestamp(3723.5, "00:00:00,000") == "01:02:03,500"
+    assert format_timestamp(65) == "00:01:05"
+
+
+def test_srt_keeps_cues_whose_text_is_a_number(tmp_path):
+    segments = list(parse_segments(write(tmp_path / "t.srt", SRT)))
+    assert [s["text"] for s in segments] == ["Hello there.", "42", "7"]
+    assert [s["speaker"] for s in segments] == ["Speaker 1", "Speaker 1", "Speaker 2"]
+    assert segments[1]["start"] == 2.5 and segments[1]["end"] == 4.0
+
+
+def test_txt_segments_and_speakers(tmp_path):
+    segments = list(parse_segments(write(tmp_path / "t.txt", TXT)))
+    assert [(s["start"], s["speaker"], s["text"]) for s in segments] == [
+        (0, "Speaker 1", "Good morning."),
+        (4, "Speaker 2", "Hi, how are you?"),
+        (9, "Speaker 1", "Fine."),
+    ]
+    assert segments[0]["end"] == 4 and segments[1]["end"] == 9
+
+
+def test_render_formats_and_json_round_trip(tmp_path):
+    segments = list(parse_segments(write(tmp_path / "t.srt", SRT)))
+    paths = render(segments, str(tmp_path), "51", ["txt", "srt", "vtt", "docx", "json"], timestamps=True)
+
+    with open(paths["srt"], encoding="utf-8") as f:
+        srt = f.read()
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:02,500\nSpeaker 1: Hello there.\n")
+    assert "3\n00:00:04,000 --> 00:00:06,000\nSpeaker 2: 7\n" in srt
+    with open(paths["vtt"], encoding="utf-8") as f:
+        assert f.read().startswith("WEBVTT\n\n00:00:00.000 --> 00:00:02.500\n<v Speaker 1>Hello there.")
+    with open(paths["txt"], encoding="utf-8") as f:
+        assert f.readline() == "[00:00:00] Speaker 1: Hello there.\n"
+    with zipfile.ZipFile(paths["docx"]) as z:
+        assert "Hello there." in z.read("word/document.xml").decode("utf-8")
+    with open(paths["json"], encoding="utf-8") as f:
+        assert json.load(f)["job_id"] == "51"
+    assert [s["text"] for s in parse_segments(paths["json"])] == ["Hello there.", "42", "7"]
+
+
+def test_parse_formats():
+    assert parse_formats("TXT, srt,txt") == ["txt", "srt"]
+    with pytest.raises(ValueError):
+        parse_formats("txt,pdf")
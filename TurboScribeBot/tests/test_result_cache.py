@@ -0,0 +1,70 @@
+import os
+
+from result_cache import ResultCache, normalize_link
+
+
+def job_folder(path, job_id, status):
+    os.makedirs(path)
+    with open(os.path.join(path, f"transcript_{job_id}.txt"), "w") as f:
+        f.write("hello")
+    with open(os.path.join(path, f"{job_id}.log"), "w") as f:
+        f.write("log")
+    with open(os.path.join(path, "audio.mp3.crdownload"), "w") as f:
+        f.write("partial")
+    return {"job_metadata": {"id": job_id, "status": status}, "outputs": {
+        "transcript": os.path.join(path, f"transcript_{job_id}.txt")}}
+
+
+def test_only_completed_jobs_are_stored(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), 1024 ** 3, 86400)
+    for status in ("failed", "processing"):
+        report = job_folder(str(tmp_path / status), "51", status)
+        assert cache.store(f"key-{status}", str(tmp_path / status), "51", report) is False
+        assert cache.restore(f"key-{status}", str(tmp_path), "52") is None
+
+
+def test_store_and_restore_rewrites_ids(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), 1024 ** 3, 86400)
+    report = job_folder(str(tmp_path / "51"), "51", "completed")
+    assert cache.store("key", str(tmp_path / "51"), "51", report) is True
+    assert cache.store("key", str(tmp_path / "51"), "51", report) is False
+
+    target = tmp_path / "52"
+    target.mkdir()
+    restored = cache.restore("key", str(target), "52")
+    assert sorted(os.listdir(target)) == ["transcript_52.txt"]
+    assert restored["outputs"]["transcript"] == str(target / "transcript_52.txt")
+
+
+def test_normalize_link():
+    assert normalize_link("https://youtu.be/abc?si=x") == normalize_link("https://www.youtube.com/watch?v=abc")
+    assert normalize_link("https://youtube.com/shorts/abc/") == "https://youtube.com/watch?v=abc"
+
+
+def test_media_is_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), 1024 ** 3, 86400)
+    report = job_folder(str(tmp_path / "51"), "51", "completed")
+    with open(tmp_path / "51" / "talk.MP4", "wb") as f:
+        f.write(b"video")
+    report["outputs"]["audio"] = str(tmp_path / "51" / "talk.MP4")
+    cache.store("key", str(tmp_path / "51"), "51", report)
+
+    target = tmp_path / "52"
+    target.mkdir()
+    restored = cache.restore("key", str(target), "52")
+    assert sorted(os.listdir(target)) == ["transcript_52.txt"]
+    assert restored["outputs"]["audio"] is None
+
+
+def test_restore_copies_for_owner_change(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), 1024 ** 3, 86400)
+    report = job_folder(str(tmp_path / "51"), "51", "completed")
+    cache.store("key", str(tmp_path / "51"), "51", report)
+
+    linked, copied = tmp_path / "52", tmp_path / "53"
+    linked.mkdir()
+    copied.mkdir()
+    cache.restore("key", str(linked), "52")
+    cache.restore("key", str(copied), "53", copy=True)
+    assert os.stat(linked / "transcript_52.txt").st_nlink > 1
+    assert os.stat(copied / "transcript_53.txt").st_nlink == 1
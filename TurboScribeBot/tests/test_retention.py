@@ -0,0 +1,70 @@
+import json
+import os
+import time
+
+from retention import RetentionManager
+
+DAY = 24 * 3600
+
+
+def job_folder(root, name, size, status="completed", age=0):
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    with open(os.path.join(path, "transcript.txt"), "wb") as f:
+        f.write(b"x" * size)
+    if status:
+        with open(os.path.join(path, f"report_{name}.json"), "w") as f:
+            json.dump({"job_metadata": {"status": status}}, f)
+    stamp = time.time() - age
+    for entry in os.listdir(path):
+        os.utime(os.path.join(path, entry), (stamp, stamp))
+    return path
+
+
+def manager(root, max_bytes=float("inf"), max_age=float("inf")):
+    return RetentionManager(str(root), max_bytes=max_bytes, max_age=max_age, running_grace=DAY)
+
+
+def test_nothing_evicted_without_limits(tmp_path):
+    job_folder(tmp_path, "old", 100, age=400 * DAY)
+    assert manager(tmp_path).run_pass() == []
+    assert os.path.isdir(tmp_path / "old")
+
+
+def test_expired_jobs_are_evicted(tmp_path):
+    job_folder(tmp_path, "old", 100, age=40 * DAY)
+    job_folder(tmp_path, "new", 100, age=DAY)
+    assert manager(tmp_path, max_age=30 * DAY).run_pass() == ["old"]
+    assert sorted(os.listdir(tmp_path)) == [".retention.lock", ".retention_index.json", "new"]
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    job_folder(tmp_path, "a", 1000, age=3 * DAY)
+    job_folder(tmp_path, "b", 1000, age=2 * DAY)
+    job_folder(tmp_path, "c", 1000, age=1 * DAY)
+    retention = manager(tmp_path, max_bytes=2500)
+    index = retention.refresh({})
+    assert retention.select(index) == ["a"]
+    retention.max_bytes = 1500
+    assert retention.select(index) == ["a", "b"]
+
+
+def test_running_jobs_are_never_evicted(tmp_path):
+    job_folder(tmp_path, "running", 1000, status="processing", age=40 * DAY)
+    job_folder(tmp_path, "fresh", 1000, status=None)
+    job_folder(tmp_path, "done", 1000, age=2 * DAY)
+    retention = manager(tmp_path, max_bytes=0, max_age=30 * DAY)
+    index = retention.refresh({})
+    assert retention.select(index) == ["done"]
+    # A "processing" job silent for longer than the grace period is stale
+    index["running"]["created"] = time.time() - 40 * DAY
+    assert sorted(retention.select(index)) == ["done", "running"]
+
+
+def test_refresh_tracks_changes_and_vanished_folders(tmp_path):
+    job_folder(tmp_path, "a", 10)
+    retention = manager(tmp_path)
+    index = retention.refresh({})
+    assert index["a"]["size"] > 10 and index["a"]["status"] == "completed"
+    os.rename(tmp_path / "a", tmp_path / ".trash-a")
+    assert retention.refresh(index) == {}
@@ -0,0 +1,35 @@
+import os
+import stat
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from session_store import SessionStore  # noqa: E402
+
+
+def test_round_trip_is_case_insensitive_and_private(tmp_path):
+    store = SessionStore(str(tmp_path), "secret")
+    store.save("User@Example.com", [{"name": "sid", "value": "1"}], {"k": "v"})
+    data = store.load("user@example.com")
+    assert data["cookies"] == [{"name": "sid", "value": "1"}] and data["local_storage"] == {"k": "v"}
+    (path,) = [p for p in os.listdir(tmp_path)]
+    assert path.endswith(".session")
+    assert stat.S_IMODE(os.stat(tmp_path / path).st_mode) == 0o600
+
+
+def test_wrong_secret_or_expired_session_is_dropped(tmp_path):
+    SessionStore(str(tmp_path), "secret").save("a@example.com", [], {})
+    assert SessionStore(str(tmp_path), "other").load("a@example.com") is None
+    assert os.listdir(tmp_path) == []
+
+    SessionStore(str(tmp_path), "secret").save("a@example.com", [], {})
+    assert SessionStore(str(tmp_path), "secret", max_age=-1).load("a@example.com") is None
+
+
+def test_no_secret_persists_nothing(tmp_path):
+    store = SessionStore(str(tmp_path), "")
+    with pytest.raises(ValueError):
+        store.save("a@example.com", [], {})
+    assert store.load("a@example.com") is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,30 @@
+import pytest
+
+from split_job import stitch
+
+SRT = "1\n00:00:00,000 --> 00:00:02,000\nSpeaker 1: {}\n"
+
+
+def part(tmp_path, k, part_id, offset, names):
+    path = tmp_path / f"p{k}"
+    path.mkdir()
+    for name in names:
+        (path / name.format(id=part_id)).write_text(SRT.format(f"part {k}"), encoding="utf-8")
+    (path / f"report_{part_id}.json").write_text("{}", encoding="utf-8")
+    return {"id": part_id, "dir": str(path), "offset": offset, "duration": 60}
+
+
+def test_parts_named_after_their_title_are_matched_by_index(tmp_path):
+    parts = [part(tmp_path, k, f"51_p{k}", 60 * (k - 1), [f"talk_part{k}.srt", "subtitles_{id}.srt"])
+             for k in (1, 2)]
+    merged, _ = stitch(parts, str(tmp_path), "51", recognize_speakers=False)
+    assert merged == {"talk.srt": ["talk_part1.srt", "talk_part2.srt"],
+                      "subtitles_51.srt": ["subtitles_51_p1.srt", "subtitles_51_p2.srt"]}
+    text = (tmp_path / "talk.srt").read_text(encoding="utf-8")
+    assert "part 1" in text and "00:01:00,000 --> 00:01:02,000" in text
+
+
+def test_part_missing_an_output(tmp_path):
+    parts = [part(tmp_path, 1, "51_p1", 0, ["talk_part1.srt"]), part(tmp_path, 2, "51_p2", 60, [])]
+    with pytest.raises(FileNotFoundError, match="p2"):
+        stitch(parts, str(tmp_path), "51", recognize_speakers=False)
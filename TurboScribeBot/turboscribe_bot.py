@@ -1,48 +1,118 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.action_chains import ActionChains
+# Selenium's webdriver package and requests are imported on first use (see
+# _Lazy below), so runs that stop early (cache hit, bad arguments) skip them.
 from datetime import datetime
+import importlib
 import logging
 import json, os, re
-import requests
-from selenium.webdriver.common.by import By
+import shutil
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from selenium.common.exceptions import NoSuchElementException, WebDriverException
 import sys
-import time
 import tempfile
+import time
 import uuid
+from contextlib import contextmanager
+from downloads import DownloadTracker
+from progress import ProgressWriter, write_json_atomic
+from metrics import PROCESS_STARTED, REGISTRY, instrument, record
+from waits import STATS as WAIT_STATS, Waiter
+from blocking import NetworkBlocker
+from job_logging import JobQueueHandler
+import chrome_setup
+import threading
 from helper import get_language_name, wait_for_download, solve_recaptcha_2captcha
 
+IMPORTED_AT = time.time()
+_first_job = True
+
+
+class _Lazy:
+    """Module (or one of its attributes) imported on first attribute access or call."""
+
+    def __init__(self, module, name=None):
+        self._module = module
+        self._name = name
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            module = importlib.import_module(self._module)
+            self._target = getattr(module, self._name) if self._name else module
+        return self._target
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+
+# Used by the page steps
+webdriver = _Lazy("selenium.webdriver")
+Options = _Lazy("selenium.webdriver.chrome.options", "Options")
+By = _Lazy("selenium.webdriver.common.by", "By")
+Keys = _Lazy("selenium.webdriver.common.keys", "Keys")
+WebDriverWait = _Lazy("selenium.webdriver.support.ui", "WebDriverWait")
+EC = _Lazy("selenium.webdriver.support.expected_conditions")
+Select = _Lazy("selenium.webdriver.support.ui", "Select")
+ActionChains = _Lazy("selenium.webdriver.common.action_chains", "ActionChains")
+requests = _Lazy("requests")
+
+BASE_URL = os.getenv("TURBOSCRIBE_URL", "https://turboscribe.ai").rstrip("/")
+DASHBOARD_URL = f"{BASE_URL}/dashboard"
+
 class TurboScribeBot:
-    def __init__(self, id, email, password, options, output_dir):
+    def __init__(self, id, email, password, options, output_dir, session_store=None):
         self.email = email
         self.password = password
-        self.options = options
+        self.session_store = session_store
+        self.account = None
+        self.accounts = None
+        self.account_reserved = False  # the job holds a slot of self.account
+        self.pool = None  # SessionPool the session belongs to, if any
         self.driver = None
         self.wait = None
+        self.logger = None
+        self.session_ready = False
+        self.jobs_done = 0
+        self.headless = False
+        self.owns_logger = True
+        self.transcript_url = None
+        self.http = None
+        self.captcha_future = None
+        self.profile = None
+        self.browser_seconds = None
+        self.fork_of = None  # job folder a forked session hands its files to
+        self.artifacts = []  # files this session saved, in order
+        self.report_lock = threading.Lock()
+        self.waiter = Waiter(self)
+        self.blocker = NetworkBlocker(self)
+
+        self.bind_job(id, options, output_dir)
+
+    def bind_job(self, id, options, output_dir):
+        """
+        Point this bot at a (new) job: logger, report and download folder.
+        Lets a warm browser session be reused across jobs without relaunching.
+        """
+        if self.driver:
+            self.blocker.collect()  # requests so far belong to the previous job
         self.id = id
+        self.options = options
         self.download_dir = output_dir
+        self.job_started = time.time()
+        self.first_action = None
 
         # Setup logger specific to this bot instance
+        self.release_logger()
         log_filename = os.path.join(output_dir, f"{self.id}.log")
         self.logger = logging.getLogger(f"TurboScribeBot-{self.id}")
         self.logger.setLevel(logging.DEBUG)
 
-        # Avoid adding multiple handlers if logger already has them
+        # Avoid adding multiple handlers if logger already has them.
+        # Records go through the shared writer thread (job_logging.py).
         if not self.logger.handlers:
-            file_handler = logging.FileHandler(log_filename, mode="a", encoding="utf-8")
-            formatter = logging.Formatter(
-                "%(asctime)s [%(levelname)s] %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S"
-            )
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            self.logger.addHandler(JobQueueHandler(self.id, log_filename))
 
         self.logger.info("TurboScribeBot initialized")
 
@@ -61,18 +131,38 @@ class TurboScribeBot:
             "status_log": []
         }
 
-    def start_browser(self, headless=False):
+        self.progress = ProgressWriter(output_dir, self.id)
+        self.progress.emit("job_start")
+
+        if self.driver:
+            self.report["job_metadata"]["started_at"] = datetime.now().isoformat()
+            self.set_download_dir(output_dir)
+
+    def release_logger(self):
+        """Detach the job logger; its file is closed once queued records are written."""
+        if not self.logger or not self.owns_logger:
+            return
+        for handler in list(self.logger.handlers):
+            handler.close()
+            self.logger.removeHandler(handler)
+
+    def start_browser(self, headless=False, exit_on_error=True):
+        self.headless = headless
+        started = time.time()
         try:
+            from selenium.webdriver.chrome.service import Service
+
             self.report["job_metadata"]["started_at"] = datetime.now().isoformat()
 
             options = webdriver.ChromeOptions()
             options.headless = headless
 
-            # safer isolated tmp dirs, but no --user-data-dir
-            tmp_dir = tempfile.mkdtemp(prefix=f"chrome_{uuid.uuid4()}_")
-            options.add_argument(f"--data-path={tmp_dir}")
-            options.add_argument(f"--disk-cache-dir={tmp_dir}")
-            options.add_argument(f"--crash-dumps-dir={tmp_dir}")
+            # isolated, reused profile slot, but no --user-data-dir
+            if not self.profile:
+                self.profile = chrome_setup.ProfileSlot.acquire()
+            options.add_argument(f"--data-path={self.profile.dir('data')}")
+            options.add_argument(f"--disk-cache-dir={self.profile.dir('cache')}")
+            options.add_argument(f"--crash-dumps-dir={self.profile.dir('crash')}")
 
             prefs = {
                 "download.default_directory": self.download_dir,
@@ -82,6 +172,7 @@ class TurboScribeBot:
                 "profile.default_content_setting_values.automatic_downloads": 1
             }
             options.add_experimental_option("prefs", prefs)
+            self.blocker.chrome_options(options)
 
             if headless:
                 options.add_argument("--headless=new")
@@ -95,13 +186,48 @@ class TurboScribeBot:
                                     "Chrome/126.0.0.0 Safari/537.36")
                 options.add_argument("--window-size=1280,800")
 
-            self.driver = webdriver.Chrome(options=options)
+            manifest = chrome_setup.load_manifest()
+            if manifest:
+                driver_path = manifest["chromedriver"]["path"]
+                chrome_path = (manifest.get("chrome") or {}).get("path")
+            else:
+                driver_path, chrome_path = chrome_setup.locate_binaries()
+            if chrome_path:
+                options.binary_location = chrome_path
+
+            try:
+                self.driver = webdriver.Chrome(options=options, service=Service(executable_path=driver_path))
+            except WebDriverException:
+                if not manifest:
+                    raise
+                # Cached binaries no longer work together, resolve them again
+                self.logger.warning("⚠️ Cached chromedriver failed, resolving it again")
+                chrome_setup.clear_manifest()
+                options.binary_location = ""
+                self.driver = webdriver.Chrome(options=options)
+
+            if not manifest:
+                try:
+                    chrome_setup.save_manifest(self.driver.service.path, chrome_path, self.driver.capabilities)
+                except (OSError, AttributeError) as e:
+                    self.logger.warning(f"⚠️ Could not write driver manifest: {e}")
+
             self.wait = WebDriverWait(self.driver, 30)
+            self.waiter.install()
+            self.blocker.install()
 
-            self.logger.info("Browser started successfully")
+            self.browser_seconds = time.time() - started
+            self.logger.info(f"Browser started successfully in {self.browser_seconds:.2f}s")
 
         except Exception as e:
             self.logger.error(f"Failed to start browser: {str(e)}", exc_info=True)
+            if not exit_on_error:
+                if getattr(self, "driver", None):
+                    self.close()
+                elif self.profile:
+                    self.profile.release()
+                    self.profile = None
+                raise
             self.report["job_metadata"]["status"] = "failed"
             self.report["job_metadata"]["finished_at"] = datetime.now().isoformat()
             self.report["status_log"].append({
@@ -118,16 +244,283 @@ class TurboScribeBot:
             sys.exit(1)
 
 
+    def set_download_dir(self, directory):
+        """Redirect Chrome downloads of the running session to another folder."""
+        try:
+            self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": os.path.abspath(directory)
+            })
+            self.logger.info(f"📁 Download folder set to {directory}")
+        except WebDriverException as e:
+            self.logger.warning(f"⚠️ Could not change download folder: {e}")
+
+    def reset_page(self):
+        """
+        Bring a warm session back to a clean dashboard between jobs:
+        close extra tabs, drop per-page state and reload the dashboard.
+        Returns True if the session is still usable.
+        """
+        try:
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+
+            self.driver.get(DASHBOARD_URL)
+            self.driver.execute_script("window.sessionStorage.clear();")
+            self.logger.info("🔄 Page state reset")
+            return True
+        except WebDriverException as e:
+            self.logger.error(f"❌ Failed to reset page: {e}", exc_info=True)
+            return False
+
+    @contextmanager
+    def track_downloads(self, step, expected=1, timeout=300):
+        """
+        Arm a DownloadTracker around the click that starts browser downloads.
+        Waits for the files when the block returns and records them in the report.
+        A block that started no download records nothing.
+        """
+        tracker = DownloadTracker(self.download_dir, self.logger).start()
+        try:
+            yield tracker
+            files = tracker.wait(timeout=timeout, expected=expected, required=False)
+            if not files:
+                self.logger.info(f"ℹ️ No download started in {step}")
+                return
+            record(self, step, size=sum(info["size"] for info in files))
+            for info in files:
+                self.artifacts.append(info["file"])
+                self.report.setdefault("downloads", []).append({
+                    "step": step,
+                    "file": info["file"],
+                    "size": info["size"],
+                    "seconds": info["seconds"],
+                    "bytes_per_sec": info["bytes_per_sec"]
+                })
+        finally:
+            tracker.close()
+
+    def fork(self):
+        """
+        Start another browser on the same login session and job, used to run
+        independent post-processing steps in parallel. The fork shares this
+        bot's logger and report. It downloads into a private subfolder, so the
+        download tracking of other sessions does not count its files; close()
+        moves them into the job folder.
+        """
+        fork_dir = tempfile.mkdtemp(prefix=".fork_", dir=self.download_dir)
+        child = TurboScribeBot(self.id, self.email, self.password, self.options, fork_dir)
+        # Shared before the browser starts: a failed start closes the child
+        child.logger = self.logger
+        child.owns_logger = False
+        child.report = self.report
+        child.report_lock = self.report_lock
+        child.progress = self.progress
+        child.transcript_url = self.transcript_url
+        child.fork_of = self.download_dir
+        child.fork_files = set(os.listdir(fork_dir))
+        try:
+            child.start_browser(self.headless, exit_on_error=False)
+        except BaseException:
+            shutil.rmtree(fork_dir, ignore_errors=True)
+            raise
+
+        child.driver.get(BASE_URL)
+        for cookie in self.driver.get_cookies():
+            cookie.pop("sameSite", None)
+            try:
+                child.driver.add_cookie(cookie)
+            except WebDriverException:
+                pass
+        child.session_ready = True
+
+        if self.transcript_url:
+            child.driver.get(self.transcript_url)
+        return child
+
+    def note_first_action(self, step):
+        """
+        Record the time to the first job step: from process start for the
+        first job of a process (imports + browser launch), else from job start.
+        """
+        global _first_job
+        if self.first_action is not None:
+            return
+        now = time.time()
+        since = "process" if _first_job else "job"
+        _first_job = False
+
+        startup = {"since": since, "first_step": step,
+                   "seconds": round(now - (PROCESS_STARTED if since == "process" else self.job_started), 3)}
+        if since == "process":
+            startup["imports_seconds"] = round(IMPORTED_AT - PROCESS_STARTED, 3)
+            if self.browser_seconds is not None:
+                startup["browser_seconds"] = round(self.browser_seconds, 3)
+        self.first_action = startup
+
+        record(self, "time_to_first_action", startup["seconds"])
+        with self.report_lock:
+            self.report.setdefault("metrics", {})["startup"] = startup
+        self.logger.info(f"🚀 First action ({step}) {startup['seconds']:.2f}s after {since} start")
+
+    def prepare_session(self):
+        """Log in and switch the UI language once per browser session."""
+        if self.session_ready:
+            self.logger.info("♻️ Reusing warm session, skipping login")
+            return
+
+        self.login()
+        self.waiter.settle("login")
+
+        self.open_language_menu()
+        self.switch_to_arabic()
+        self.waiter.settle("switch_language")
+
+        self.session_ready = True
+        if self.accounts:
+            self.accounts.refresh_usage(self)
+
+    def use_account(self, account, session_store=None):
+        """
+        Run the next jobs as `account`. A session logged into another account
+        is logged out, so prepare_session() logs in again.
+        """
+        if self.account and self.account.email == account.email:
+            return
+        if self.driver and self.session_ready:
+            try:
+                self.driver.get(BASE_URL)
+                self.driver.delete_all_cookies()
+                self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException as e:
+                self.logger.warning(f"⚠️ Could not clear previous account session: {e}")
+            self.session_ready = False
+            self.logger.info(f"👤 Switching account to {account.email}")
+
+        self.account = account
+        self.email = account.email
+        self.password = account.password
+        if session_store is not None:
+            self.session_store = session_store
+
+    def account_usage(self):
+        """
+        Jobs in flight and remaining transcription minutes read from the
+        account page: {"in_flight": int, "remaining_minutes": float or None}.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def check_limits(self):
+        """
+        Raise accounts.AccountLimitError when the dashboard refuses the job
+        because of the account's concurrency or daily limit.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def close(self):
+        """Quit the browser and release the job logger."""
+        if self.driver:
+            self.blocker.stop()
+            self.blocker.collect()
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        if self.profile:
+            self.profile.release()
+            self.profile = None
+        self.session_ready = False
+        self.release_logger()
+        if self.fork_of:
+            self._hand_over_files()
+
+    def _hand_over_files(self):
+        """Move what a forked session downloaded into the job folder (artifacts: their new names)."""
+        self.artifacts = []
+        for name in os.listdir(self.download_dir):
+            if name in self.fork_files or name.endswith(".crdownload"):
+                continue
+            target = os.path.join(self.fork_of, name)
+            if os.path.exists(target):
+                stem, ext = os.path.splitext(name)
+                target = os.path.join(self.fork_of, f"{stem}_{uuid.uuid4().hex[:6]}{ext}")
+            shutil.move(os.path.join(self.download_dir, name), target)
+            self.artifacts.append(os.path.basename(target))
+        shutil.rmtree(self.download_dir, ignore_errors=True)
+        self.fork_of = None
+
+
     def external_links(self, source, link, passcode=None):
-        if source == "zoom":
-            print("passcode", passcode)
-            return self.zoom_link(link, passcode)
-        elif source == "onedrive":
-            print("passcode", passcode)
-            return self.onedrive_link(link, passcode)
-        else:
+        if source not in ("zoom", "onedrive"):
             raise ValueError(f"Unsupported source: {source}")
 
+        # The site's allowlist stays on until the download has finished
+        self.blocker.use_site(source)
+        try:
+            path = self.fetch_source(source, link, passcode)
+            if path:
+                return path
+            if source == "zoom":
+                print("passcode", passcode)
+                return self.zoom_link(link, passcode)
+            else:
+                print("passcode", passcode)
+                return self.onedrive_link(link, passcode)
+        finally:
+            self.blocker.use_site("turboscribe")
+
+
+    def source_media_url(self, source, link, passcode):
+        """
+        Open the Zoom / OneDrive share page (passcode, captcha) and return the
+        authenticated URL of the recording file, or None to download it
+        through the page instead.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def fetch_source(self, source, link, passcode):
+        """
+        Download the recording with parallel Range requests on the browser's
+        cookies. Returns the file path, or None to fall back to the page download.
+        """
+        try:
+            url = self.source_media_url(source, link, passcode)
+        except WebDriverException as e:
+            self.logger.warning(f"⚠️ Could not resolve the {source} media URL: {e}")
+            url = None
+        if not url:
+            return None
+
+        from http_fetch import SEGMENTS, HttpFetcher, IntegrityError, session_from_driver
+        step = f"{source}_download"
+        try:
+            self.http = session_from_driver(self.driver, self.http, pool_size=max(8, SEGMENTS))
+            self.http.headers["Referer"] = self.driver.current_url
+            info = HttpFetcher(self.http, self.logger).fetch_segmented(url, self.download_dir)
+        except (requests.RequestException, IntegrityError, TimeoutError, OSError, WebDriverException) as e:
+            self.logger.warning(f"⚠️ Segmented {source} download failed, downloading through the page: {e}")
+            return None
+        finally:
+            if self.http is not None:
+                self.http.headers.pop("Referer", None)
+
+        record(self, step, info["seconds"], retries=info["attempts"] - 1, size=info["size"])
+        self.artifacts.append(info["file"])
+        self.report.setdefault("downloads", []).append({
+            "step": step,
+            "method": "http",
+            "file": info["file"],
+            "size": info["size"],
+            "seconds": info["seconds"],
+            "bytes_per_sec": info["bytes_per_sec"],
+            "resumed": info["resumed"],
+            "segments": info["segments"]
+        })
+        return info["path"]
 
     def zoom_link(self, link, passcode):
         """
@@ -149,8 +542,140 @@ class TurboScribeBot:
 
 
     def login(self):
+        """
+        Restore a cached session if it is still valid, otherwise run the
+        full login form and cache the new session.
+        """
+        if self.restore_session():
+            self.report["status_log"].append({
+                "step": "login",
+                "session_restored": True,
+                "time": datetime.now().isoformat()
+            })
+            return True
+
+        with self.blocker.suspended():  # the form may show a reCAPTCHA widget
+            self._open_login_form()
+            self.begin_captcha()  # 2Captcha works while the form is filled
+            self._fill_login_form()
+            if not self.finish_captcha():
+                return False
+            result = self._submit_login_form()
+        self.save_session()
+        return result
+
+    def _open_login_form(self):
+        return {"message": "Scraping logic hidden in public demo."}
+
+    def _fill_login_form(self):
         return {"message": "Scraping logic hidden in public demo."}
 
+    def _submit_login_form(self):
+        return {"message": "Scraping logic hidden in public demo."}
+
+    def begin_captcha(self):
+        """
+        Start solving the page's reCAPTCHA in the background as soon as the
+        sitekey is visible, so the rest of the form can be filled meanwhile.
+        Returns True if a solve was started.
+        """
+        from captcha import CaptchaSolver, get_solver
+
+        api_key = os.getenv("CAPTCHA_API_KEY")
+        try:
+            sitekey = CaptchaSolver.find_sitekey(self.driver)
+        except WebDriverException:
+            sitekey = None
+        if not api_key or not sitekey:
+            return False
+
+        self.logger.info(f"🔑 Captcha sitekey found, solving in background: {sitekey}")
+        self.captcha_future = get_solver(api_key).solve_async(
+            sitekey, self.driver.current_url, logger=self.logger, bot=self)
+        return True
+
+    def finish_captcha(self, timeout=180):
+        """Wait for the background solve started by begin_captcha() and inject the token."""
+        if not self.captcha_future:
+            return True
+        from captcha import CaptchaSolver
+
+        future, self.captcha_future = self.captcha_future, None
+        try:
+            CaptchaSolver.inject(self.driver, future.result(timeout=timeout))
+            self.logger.info("✅ Captcha token injected")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Captcha solving failed: {e}", exc_info=True)
+            self.driver.save_screenshot(os.path.join(self.download_dir, "captcha_error.png"))
+            return False
+
+    def _session_valid(self):
+        """Cheap probe: the dashboard redirects to the login page when logged out."""
+        try:
+            self.driver.get(DASHBOARD_URL)
+            return "login" not in self.driver.current_url
+        except WebDriverException:
+            return False
+
+    def restore_session(self):
+        """Load cookies and localStorage from the session store into the driver."""
+        if not self.session_store or not self.email:
+            return False
+
+        data = self.session_store.load(self.email)
+        if not data:
+            self.logger.info("🍪 No cached session, using login form")
+            return False
+
+        try:
+            # Cookies can only be set for the domain currently loaded
+            self.driver.get(BASE_URL)
+            for cookie in data["cookies"]:
+                cookie.pop("sameSite", None)
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException as e:
+                    self.logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+
+            self.driver.execute_script("""
+                const items = arguments[0];
+                for (const key in items) { window.localStorage.setItem(key, items[key]); }
+            """, data.get("local_storage", {}))
+
+            if self._session_valid():
+                self.logger.info("🍪 Cached session restored, login skipped")
+                return True
+        except WebDriverException as e:
+            self.logger.warning(f"⚠️ Failed to restore cached session: {e}")
+
+        self.logger.info("🍪 Cached session expired, using login form")
+        self.session_store.clear(self.email)
+        self.driver.delete_all_cookies()
+        return False
+
+    def save_session(self):
+        """Save cookies and localStorage of a logged-in driver to the session store."""
+        if not self.session_store or not self.email:
+            return
+        if not self._session_valid():
+            self.logger.warning("⚠️ Not logged in, session not cached")
+            return
+
+        try:
+            local_storage = self.driver.execute_script("""
+                const items = {};
+                for (let i = 0; i < window.localStorage.length; i++) {
+                    const key = window.localStorage.key(i);
+                    items[key] = window.localStorage.getItem(key);
+                }
+                return items;
+            """)
+            self.session_store.save(self.email, self.driver.get_cookies(), local_storage)
+            self.logger.info("🍪 Session cached for next runs")
+        except (WebDriverException, OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ Could not cache session: {e}")
+
 
     def open_language_menu(self):
         """Click the language toggle button to open the dropdown."""
@@ -164,6 +689,65 @@ class TurboScribeBot:
     def upload_file(self, file_path):
         return {"message": "Scraping logic hidden in public demo."}
 
+    def upload_target(self, file_path):
+        """
+        Open a resumable upload session through the web uploader for
+        `file_path`: {"session_url": str, "headers": dict}, or None to use
+        the browser upload.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def complete_upload(self, upload):
+        """Hand a finished direct upload (DirectUploader result) to the page, like the file input would."""
+        return {"message": "Scraping logic hidden in public demo."}
+
+    def upload(self, file_path):
+        """
+        Upload a local file directly over HTTP in resumable chunks, with
+        progress in the report; the browser file input is the fallback.
+        """
+        from direct_upload import DirectUploader, UploadError
+        from http_fetch import session_from_driver
+
+        size = os.path.getsize(file_path)
+        progress = {"method": "direct", "file": os.path.basename(file_path), "size": size,
+                    "sent": 0, "percent": 0}
+        self.report["upload"] = progress
+        last_write = [0.0]
+
+        def on_progress(sent, total):
+            progress["sent"], progress["percent"] = sent, round(sent * 100 / total, 1)
+            self.progress.emit("upload_progress", sent=sent, total=total)
+            if time.time() - last_write[0] >= 5 or sent == total:
+                last_write[0] = time.time()
+                self.generate_report(self.download_dir, self.id)
+
+        try:
+            self.http = session_from_driver(self.driver, self.http)
+            uploader = DirectUploader(self.http, self.logger, on_progress=on_progress)
+
+            def new_target():
+                target = self.upload_target(file_path)
+                if not target:
+                    raise UploadError("No direct upload session available")
+                return target
+
+            state_path = os.path.join(self.download_dir, f".upload_{self.id}.json")
+            info = uploader.upload(file_path, new_target, state_path)
+            self.complete_upload(info)
+        except (UploadError, WebDriverException, OSError) as e:
+            self.logger.warning(f"⚠️ Direct upload unavailable, using the browser upload: {e}")
+            self.report["upload"] = {"method": "browser", "file": os.path.basename(file_path),
+                                     "size": size, "direct_error": str(e)}
+            return self.upload_file(file_path)
+
+        progress.update(seconds=info["seconds"], bytes_per_sec=info["bytes_per_sec"],
+                        resumed_from=info["resumed_from"], retries=info["retries"])
+        record(self, "direct_upload", info["seconds"], retries=info["retries"], size=size)
+        self.logger.info(f"📤 Uploaded {progress['file']} directly ({size / 1024 / 1024:.1f} MB, "
+                         f"{info['bytes_per_sec'] / 1024 / 1024:.1f} MB/s)")
+        return info
+
     
     def import_from_link(self, url: str):
 
@@ -191,9 +775,34 @@ class TurboScribeBot:
         return {"message": "Scraping logic hidden in public demo."}
 
 
+    def remote_job_id(self):
+        """
+        TurboScribe's id of the job just submitted (first row of the jobs
+        table), so the monitor can follow it. None if it cannot be read.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def job_statuses(self):
+        """
+        Status of every job in the dashboard's jobs table, read in one pass:
+        {remote_id: {"status": "queued" | "processing" | "done" | "failed",
+                     "transcript_url": str or None}}.
+        """
+        return None  # Scraping logic hidden in public demo.
+
     def click_transcript_link(self):
         return {"message": "Scraping logic hidden in public demo."}
 
+    def remember_transcript(self):
+        """Remember the finished transcript page so other tabs/sessions can open it."""
+        try:
+            self.transcript_url = self.driver.current_url
+            self.report["job_metadata"]["transcript_url"] = self.transcript_url
+            self.logger.info(f"🔗 Transcript page: {self.transcript_url}")
+        except WebDriverException as e:
+            self.logger.warning(f"⚠️ Could not read transcript URL: {e}")
+        return self.transcript_url
+
 
     def export_download(self, output_dir, job_id):
         return {"message": "Scraping logic hidden in public demo."}
@@ -203,6 +812,58 @@ class TurboScribeBot:
         return {"message": "Scraping logic hidden in public demo."}
 
 
+    def result_url(self, step):
+        """
+        Direct URL behind a result button on the transcript page
+        (export_download, download_results or download_audio),
+        or None to use the UI download instead.
+        """
+        return None  # Scraping logic hidden in public demo.
+
+    def fetch_direct(self, steps, output_dir):
+        """
+        Download result files over HTTP with the browser's cookies, several at once.
+        Returns the set of steps fetched; the caller falls back to the UI for the rest.
+        """
+        urls = {}
+        for step in steps:
+            try:
+                url = self.result_url(step)
+            except WebDriverException as e:
+                self.logger.warning(f"⚠️ No direct URL for {step}: {e}")
+                url = None
+            if url:
+                urls[step] = url
+        if not urls:
+            return set()
+
+        from http_fetch import HttpFetcher, session_from_driver
+        try:
+            self.http = session_from_driver(self.driver, self.http)
+        except WebDriverException as e:
+            self.logger.warning(f"⚠️ Could not copy browser cookies: {e}")
+            return set()
+
+        fetcher = HttpFetcher(self.http, self.logger)
+        results, errors = fetcher.fetch_many(urls, output_dir)
+
+        for step, info in results.items():
+            record(self, step, retries=info["attempts"] - 1, size=info["size"])
+            self.artifacts.append(info["file"])
+            self.report.setdefault("downloads", []).append({
+                "step": step,
+                "method": "http",
+                "file": info["file"],
+                "size": info["size"],
+                "seconds": info["seconds"],
+                "bytes_per_sec": info["bytes_per_sec"],
+                "resumed": info["resumed"]
+            })
+        for step, error in errors.items():
+            self.logger.warning(f"⚠️ Direct download of {step} failed, falling back to UI: {error}")
+
+        return set(results)
+
     def chatgpt_click(self):
         return {"message": "Scraping logic hidden in public demo."}
 
@@ -234,7 +895,8 @@ class TurboScribeBot:
             output_dir (str): Directory where file will be saved
             job_id (str): Unique job identifier for naming
         """
-        return {"message": "Scraping logic hidden in public demo."}
+        with self.blocker.allowing("media"):
+            return {"message": "Scraping logic hidden in public demo."}
 
     def change_owner(self, output_dir, owner):
         """
@@ -243,5 +905,43 @@ class TurboScribeBot:
         """
         return {"message": "Scraping logic hidden in public demo."}
 
+    def mark_failed(self, step, error):
+        """Record a job failure in the report and progress stream and write the final report."""
+        self.logger.error(f"❌ Job failed in {step}: {error}")
+        self.report["job_metadata"]["status"] = "failed"
+        self.report["status_log"].append({
+            "step": step,
+            "error": str(error),
+            "time": datetime.now().isoformat()
+        })
+        self.generate_report(self.download_dir, self.id, True)
+
     def generate_report(self, output_dir, id, finished=False):
-        return {"message": "Scraping logic hidden in public demo."}
+        """
+        Write report_<id>.json atomically (temp file + rename), so pollers
+        never read a half-written report.
+        """
+        meta = self.report["job_metadata"]
+        if finished:
+            if self.driver:
+                self.blocker.collect()
+            meta["finished_at"] = datetime.now().isoformat()
+            if meta["status"] == "processing":
+                meta["status"] = "completed"
+
+        path = os.path.join(output_dir, f"report_{id}.json")
+        with self.report_lock:
+            write_json_atomic(path, self.report)
+
+        if finished:
+            self.progress.emit("job_end", status=meta["status"])
+            REGISTRY.flush()
+            WAIT_STATS.save()
+        return path
+
+
+# Time every public step; bookkeeping methods are left out
+instrument(TurboScribeBot, exclude=(
+    "bind_job", "release_logger", "track_downloads", "close",
+    "generate_report", "mark_failed", "note_first_action", "use_account"
+))
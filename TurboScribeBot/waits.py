@@ -0,0 +1,204 @@
+"""
+Condition based waits for the job flow.
+
+Instead of fixed `time.sleep()` calls, every step waits for a DOM or network
+condition with its own timeout:
+
+    bot.waiter.until("select_options", page_settled())
+    bot.waiter.until("chatgpt_panel", element_visible((By.ID, "chatgpt-panel")))
+
+The poll interval adapts to how long the same wait took before (fast waits
+poll often, slow ones back off), and every wait's actual duration is logged
+and recorded in the job metrics as `wait:<step>`. Recorded durations are kept
+in `WAIT_STATS_PATH` so the adaptation carries over between runs.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from metrics import record
+
+WAIT_STATS_PATH = os.getenv("WAIT_STATS_PATH", os.path.join(os.getenv("METRICS_DIR", "metrics"), "wait_stats.json"))
+DEFAULT_TIMEOUT = 30
+STEP_TIMEOUTS = {
+    "login": 45,
+    "switch_language": 20,
+    "start_transcription": 60,
+    "transcript_page": 60,
+    "chatgpt_panel": 120,
+}
+HISTORY = 50
+
+# Counts in-flight fetch/XHR requests so "network idle" can be detected.
+NETWORK_SHIM = """
+(() => {
+  if (window.__tsPending !== undefined) return;
+  window.__tsPending = 0;
+  const origFetch = window.fetch;
+  if (origFetch) {
+    window.fetch = function() {
+      window.__tsPending++;
+      return origFetch.apply(this, arguments).finally(() => { window.__tsPending--; });
+    };
+  }
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function() {
+    window.__tsPending++;
+    this.addEventListener('loadend', () => { window.__tsPending--; });
+    return origSend.apply(this, arguments);
+  };
+})();
+"""
+
+
+# --- conditions (callables taking the driver) ---
+
+def document_ready():
+    return lambda driver: driver.execute_script("return document.readyState") == "complete"
+
+
+def network_idle(quiet=0.3):
+    """No pending fetch/XHR for `quiet` seconds."""
+    state = {"idle_since": None}
+
+    def check(driver):
+        pending = driver.execute_script("return window.__tsPending || 0")
+        now = time.time()
+        if pending:
+            state["idle_since"] = None
+            return False
+        if state["idle_since"] is None:
+            state["idle_since"] = now
+        return now - state["idle_since"] >= quiet
+    return check
+
+
+def page_settled(quiet=0.3):
+    """Document loaded and network idle."""
+    ready, idle = document_ready(), network_idle(quiet)
+    return lambda driver: ready(driver) and idle(driver)
+
+
+def element_visible(locator):
+    def check(driver):
+        elements = driver.find_elements(*locator)
+        return next((e for e in elements if e.is_displayed()), False)
+    return check
+
+
+def element_clickable(locator):
+    def check(driver):
+        elements = driver.find_elements(*locator)
+        return next((e for e in elements if e.is_displayed() and e.is_enabled()), False)
+    return check
+
+
+def element_gone(locator):
+    return lambda driver: not any(e.is_displayed() for e in driver.find_elements(*locator))
+
+
+def url_contains(fragment):
+    return lambda driver: fragment in driver.current_url
+
+
+# --- recorded latencies ---
+
+class WaitStats:
+    def __init__(self, path=WAIT_STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.samples = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for step, values in json.load(f).items():
+                    self.samples[step] = deque(values, maxlen=HISTORY)
+        except (OSError, ValueError):
+            pass
+
+    def add(self, step, seconds):
+        with self.lock:
+            self.samples.setdefault(step, deque(maxlen=HISTORY)).append(round(seconds, 3))
+
+    def poll_interval(self, step):
+        """About 20 polls over the typical duration, between 50 ms and 1 s."""
+        values = self.samples.get(step)
+        if not values:
+            return 0.1
+        return min(max(statistics.median(values) / 20, 0.05), 1.0)
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = {step: list(values) for step, values in self.samples.items()}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+STATS = WaitStats()
+
+
+class Waiter:
+    def __init__(self, bot, stats=STATS):
+        self.bot = bot
+        self.stats = stats
+
+    def install(self):
+        """Inject the network counter into every page the driver opens."""
+        try:
+            self.bot.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_SHIM})
+            self.bot.driver.execute_script(NETWORK_SHIM)
+        except WebDriverException as e:
+            self.bot.logger.warning(f"⚠️ Network idle detection unavailable: {e}")
+
+    def until(self, step, condition, timeout=None, poll=None, fatal=True):
+        """
+        Poll `condition(driver)` until it returns something truthy and return it.
+        Raises TimeoutException after the step's timeout, or logs it and
+        returns None when not `fatal`.
+        """
+        timeout = timeout or STEP_TIMEOUTS.get(step, DEFAULT_TIMEOUT)
+        poll = poll or self.stats.poll_interval(step)
+        started = time.time()
+        end_time = started + timeout
+        last_error = None
+
+        while True:
+            try:
+                result = condition(self.bot.driver)
+                if result:
+                    break
+            except WebDriverException as e:
+                # Page in the middle of navigating, stale element, ...
+                last_error = e
+            if time.time() >= end_time:
+                seconds = time.time() - started
+                record(self.bot, f"wait:{step}", seconds, errors=1)
+                if not fatal:
+                    self.bot.logger.warning(f"⏱️ Wait for {step} timed out after {seconds:.2f}s, continuing")
+                    return None
+                self.bot.logger.error(f"⏱️ Wait for {step} timed out after {seconds:.2f}s")
+                raise TimeoutException(f"Timed out waiting for {step} after {timeout}s") from last_error
+            time.sleep(poll)
+
+        seconds = time.time() - started
+        self.stats.add(step, seconds)
+        record(self.bot, f"wait:{step}", seconds)
+        self.bot.logger.debug(f"⏱️ Waited {seconds:.2f}s for {step}")
+        return result
+
+    def settle(self, step, timeout=None):
+        """
+        Wait until the page is loaded and its network requests are done.
+        This replaces a fixed pause, so a page that never goes idle (long
+        polling, streaming) only logs the timeout. Returns True if it settled.
+        """
+        return bool(self.until(step, page_settled(), timeout, fatal=False))
@@ -0,0 +1,413 @@
+"""
+Long-running worker mode for TurboScribeBot.
+
+Instead of starting a fresh `main.py` process (new Chrome, new login) per job,
+the worker keeps a pool of warm, logged-in browser sessions and takes jobs
+from a queue directory. Each job is a JSON file with the same fields as the
+CLI arguments, e.g.:
+
+    {"id": "51", "output": "/app/outputs", "link": "https://youtu.be/...", "language": "ar"}
+
+Usage:
+    python worker.py --queue /app/queue --sessions 2
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from main import email, password, parse_args, job_argv, build_options, run_with_failover
+from accounts import AccountPool
+from turboscribe_bot import TurboScribeBot
+from session_store import default_store
+from job_logging import console_logger
+from metrics import REGISTRY
+from retention import RETENTION_ENABLED, RetentionManager
+from monitor import MONITOR_ENABLED, MONITOR_MAX_IN_FLIGHT, JobMonitor, JobParked
+
+logger = console_logger("worker")
+
+# Seconds a job waits for a free browser session before it fails
+POOL_ACQUIRE_TIMEOUT = int(os.getenv("POOL_ACQUIRE_TIMEOUT", 3600))
+
+
+class DirectoryQueue:
+    """
+    File based job queue:
+        incoming/   new jobs (*.json)
+        processing/ claimed by a worker
+        done/       finished jobs
+        failed/     jobs that raised or failed validation
+    Claiming is an atomic rename, so several workers can share one queue.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = {}
+        for name in ("incoming", "processing", "done", "failed"):
+            self.dirs[name] = os.path.join(root, name)
+            os.makedirs(self.dirs[name], exist_ok=True)
+
+    def submit(self, job):
+        """Write a job atomically into incoming/ and return its path."""
+        name = f"{int(time.time() * 1000)}_{job.get('id', uuid.uuid4())}.json"
+        tmp_path = os.path.join(self.root, f".{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        path = os.path.join(self.dirs["incoming"], name)
+        os.replace(tmp_path, path)
+        return path
+
+    def claim(self):
+        """Move the oldest incoming job to processing/. Returns (path, job) or None."""
+        try:
+            names = sorted(n for n in os.listdir(self.dirs["incoming"]) if n.endswith(".json"))
+        except FileNotFoundError:
+            return None
+
+        for name in names:
+            src = os.path.join(self.dirs["incoming"], name)
+            dst = os.path.join(self.dirs["processing"], name)
+            try:
+                os.rename(src, dst)
+            except FileNotFoundError:
+                continue  # another worker got it first
+            try:
+                with open(dst, "r", encoding="utf-8") as f:
+                    return dst, json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Invalid job file {name}: {e}")
+                self.finish(dst, False)
+        return None
+
+    def finish(self, path, ok):
+        target = self.dirs["done" if ok else "failed"]
+        os.replace(path, os.path.join(target, os.path.basename(path)))
+
+
+class _Vacant:
+    """Pool slot whose browser could not be (re)started; acquire() relaunches it."""
+    account = None
+
+    def __init__(self, failures=1):
+        self.failures = failures
+
+
+class SessionPool:
+    """
+    Pool of started, logged-in TurboScribeBot sessions.
+    Sessions are recycled after `max_jobs` jobs to keep Chrome memory bounded.
+    A session that cannot be relaunched leaves a vacant slot, which the next
+    acquire() tries again (with backoff), so the pool never shrinks.
+    With `monitor`, jobs give their session back while TurboScribe
+    transcribes (see monitor.py).
+    """
+
+    def __init__(self, size, sessions_dir, max_jobs=50, headless=True, monitor=False, accounts=None):
+        self.size = size
+        self.sessions_dir = sessions_dir
+        self.max_jobs = max_jobs
+        self.headless = headless
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.all = []
+        self.surplus = 0  # sessions to drop on release (see extra_slot)
+        self.spread = itertools.count()
+        self.session_store = default_store(password)
+        self.accounts = accounts or AccountPool.from_env(email, password)
+        self.monitor = JobMonitor(self._dashboard_session, logger) if monitor and MONITOR_ENABLED else None
+        os.makedirs(sessions_dir, exist_ok=True)
+
+    def _start_session(self, prefix, account):
+        session_id = f"{prefix}-{uuid.uuid4().hex[:8]}"
+        bot = TurboScribeBot(session_id, email, password, {}, self.sessions_dir, self.session_store)
+        bot.use_account(account, default_store(account.password))
+        bot.accounts = self.accounts
+        bot.pool = self
+        try:
+            bot.start_browser(self.headless)
+        except SystemExit:
+            # start_browser exits the process on failure in CLI mode
+            bot.close()
+            raise RuntimeError("Failed to start browser session")
+        try:
+            bot.prepare_session()
+        except BaseException:
+            bot.close()
+            raise
+        return bot
+
+    def _new_session(self):
+        # Spread warm sessions over the configured accounts
+        with self.lock:
+            accounts = list(self.accounts.accounts.values())
+            account = accounts[next(self.spread) % len(accounts)]
+        bot = self._start_session("session", account)
+        with self.lock:
+            self.all.append(bot)
+        return bot
+
+    def _try_new_session(self):
+        try:
+            return self._new_session()
+        except Exception as e:
+            logger.warning(f"⚠️ Browser session failed to start, retrying on next use: {e}")
+            return _Vacant()
+
+    def warm_up(self):
+        """Start all sessions in parallel (Chrome start and login dominate)."""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for bot in executor.map(lambda _: self._try_new_session(), range(self.size)):
+                self.idle.put(bot)
+
+    def _dashboard_session(self, account):
+        """Session the monitor reads the jobs table of `account` with, outside the pool."""
+        return self._start_session("monitor", account)
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT, prefer=None):
+        """
+        Take an idle session, one logged into the `prefer` account if there is one.
+        Raises RuntimeError when none is free within `timeout` seconds or a
+        vacant slot cannot be relaunched.
+        """
+        try:
+            bot = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No browser session free after {timeout}s")
+        if prefer and (not bot.account or bot.account.email != prefer):
+            with self.idle.mutex:
+                for i, other in enumerate(self.idle.queue):
+                    if other.account and other.account.email == prefer:
+                        self.idle.queue[i], bot = bot, other
+                        break
+        if isinstance(bot, _Vacant):
+            bot = self._relaunch(bot)
+        return bot
+
+    def _relaunch(self, slot):
+        if slot.failures:
+            time.sleep(min(2 ** (slot.failures - 1), 60))
+        try:
+            return self._new_session()
+        except Exception as e:
+            self.idle.put(_Vacant(slot.failures + 1))
+            raise RuntimeError(f"Could not start browser session: {e}") from e
+
+    def park(self, bot, parked):
+        """
+        Give the session back while the monitor waits for the transcript of a
+        parked job, then return a session (same account preferred) to finish it.
+        """
+        bot.logger.info(f"🅿️ Job {bot.id} parked, session released while TurboScribe transcribes {parked.remote_id}")
+        job_id, progress = bot.id, bot.progress
+        bot.release_logger()
+        self.release(bot)
+
+        with progress.heartbeat("transcribe"):
+            result = self.monitor.wait(parked.account, parked.remote_id)
+        logger.info(f"📡 Job {job_id} ({parked.remote_id}) {result['status'] if result else 'not followed'}, resuming")
+        return self.acquire(prefer=parked.account.email)
+
+    def max_in_flight(self):
+        """
+        Jobs to keep in flight. Parked jobs hold no session but keep their
+        account slot, so beyond the sessions this is capped by both
+        MONITOR_MAX_IN_FLIGHT and the accounts' combined max_concurrent.
+        """
+        if not self.monitor:
+            return self.size
+        return max(self.size, min(MONITOR_MAX_IN_FLIGHT, self.accounts.capacity()))
+
+    @contextmanager
+    def extra_slot(self):
+        """
+        One more session for the duration of the block, for a job that holds
+        a session while its sub-jobs (split parts) run on the same pool.
+        """
+        self.idle.put(_Vacant(0))
+        try:
+            yield
+        finally:
+            try:
+                bot = self.idle.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    self.surplus += 1  # dropped by the next release()
+            else:
+                if not isinstance(bot, _Vacant):
+                    self._discard(bot)
+
+    def release(self, bot, healthy=True):
+        with self.lock:
+            drop, self.surplus = self.surplus > 0, max(self.surplus - 1, 0)
+        if drop:
+            self._discard(bot)
+            return
+        bot.jobs_done += 1
+        if not healthy or bot.jobs_done >= self.max_jobs:
+            self._discard(bot)
+            bot = self._try_new_session()
+        self.idle.put(bot)
+
+    def _discard(self, bot):
+        with self.lock:
+            if bot in self.all:
+                self.all.remove(bot)
+        bot.close()
+
+    def shutdown(self):
+        if self.monitor:
+            self.monitor.stop()
+        with self.lock:
+            bots, self.all = self.all, []
+        for bot in bots:
+            bot.close()
+
+
+def run_on_pool(pool, args):
+    """
+    Run one parsed job on a session borrowed from the pool.
+    The report has the same shape as a CLI run. Returns True on success.
+    """
+    output_dir = os.path.join(args.output, f"{args.id}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        bot = pool.acquire()
+    except RuntimeError as e:
+        logger.error(f"❌ Error in job {args.id}: {e}")
+        return False
+    healthy = True
+    ok = False
+    try:
+        bot.bind_job(args.id, build_options(args), output_dir)
+        healthy = bot.reset_page()
+        if healthy:
+            try:
+                run_with_failover(bot, args, output_dir, pool.accounts, pool.monitor)
+            except JobParked as parked:
+                parked_bot, bot = bot, None  # released by park()
+                try:
+                    bot = pool.park(parked_bot, parked)
+                    bot.bind_job(args.id, build_options(args), output_dir)
+                    if not bot.reset_page():
+                        raise RuntimeError("Session unusable after parking")
+                except Exception:
+                    pool.accounts.release(parked.account, args.id)
+                    raise
+                args.resume = True
+                run_with_failover(bot, args, output_dir, pool.accounts, pool.monitor, account=parked.account)
+            ok = True
+            logger.info(f"✅ Job {args.id} finished successfully!")
+    except Exception as e:
+        logger.exception(f"❌ Error in job {args.id}: {e}")
+        if bot is not None:
+            bot.mark_failed("worker", e)
+            healthy = bot.reset_page()
+    finally:
+        if bot is not None:
+            bot.release_logger()
+            pool.release(bot, healthy)
+    return ok
+
+
+class Worker:
+    def __init__(self, job_queue, pool, poll_interval=1.0):
+        self.job_queue = job_queue
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    def process(self, path, job):
+        """Run one queued job on a pooled session."""
+        try:
+            args = parse_args(job_argv(job))
+        except SystemExit:
+            logger.error(f"❌ Invalid job arguments in {os.path.basename(path)}")
+            self.job_queue.finish(path, False)
+            return
+
+        ok = False
+        try:
+            ok = run_on_pool(self.pool, args)
+        finally:
+            self.job_queue.finish(path, ok)
+
+    def loop(self):
+        while not self.stop_event.is_set():
+            claimed = self.job_queue.claim()
+            if not claimed:
+                self.stop_event.wait(self.poll_interval)
+                continue
+            self.process(*claimed)
+
+    def run(self):
+        self.pool.warm_up()
+        logger.info(f"🚀 Worker ready with {self.pool.size} warm session(s), watching {self.job_queue.root}")
+
+        # Parked jobs hold no session, so more jobs than sessions can be in flight
+        in_flight = self.pool.max_in_flight()
+        threads = [threading.Thread(target=self.loop, daemon=True) for _ in range(in_flight)]
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(timeout=1)
+        finally:
+            self.pool.shutdown()
+
+    def stop(self, *_):
+        logger.info("🛑 Stopping worker after current jobs...")
+        self.stop_event.set()
+
+
+def parse_worker_args():
+    parser = argparse.ArgumentParser(description="TurboScribe worker daemon")
+    parser.add_argument("--queue", required=True, help="Queue directory (incoming/processing/done/failed)")
+    parser.add_argument("--sessions", type=int, default=1, help="Number of warm browser sessions")
+    parser.add_argument("--max-jobs", type=int, default=50, help="Recycle a session after this many jobs")
+    parser.add_argument("--poll", type=float, default=1.0, help="Queue poll interval in seconds")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--outputs", help="Outputs folder to keep within the retention budget (OUTPUTS_MAX_GB / OUTPUTS_MAX_DAYS)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    wargs = parse_worker_args()
+
+    pool = SessionPool(
+        wargs.sessions,
+        os.path.join(wargs.queue, "sessions"),
+        max_jobs=wargs.max_jobs,
+        monitor=True
+    )
+    worker = Worker(DirectoryQueue(wargs.queue), pool, poll_interval=wargs.poll)
+
+    if wargs.metrics_port:
+        REGISTRY.serve(wargs.metrics_port)
+        logger.info(f"📊 Metrics at http://0.0.0.0:{wargs.metrics_port}/metrics")
+
+    retention = None
+    if wargs.outputs and not RETENTION_ENABLED:
+        logger.info("ℹ️ --outputs ignored: set OUTPUTS_MAX_GB and/or OUTPUTS_MAX_DAYS to enable retention")
+    elif wargs.outputs:
+        retention = RetentionManager(wargs.outputs, logger=logger)
+        retention.start()
+
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    try:
+        worker.run()
+    except Exception as e:
+        logger.exception(f"❌ Worker crashed: {e}")
+        sys.exit(1)
@@ -176,6 +176,32 @@ router.get('/:jobId/logs', async (req, res) => {
   }
 });
 
+// GET /api/jobs/:jobId/progress - Get progress events (incremental with ?offset=)
+router.get('/:jobId/progress', async (req, res) => {
+  try {
+    const { jobId } = req.params;
+    const offset = parseInt(req.query.offset) || 0;
+
+    const job = await database.getJob(jobId);
+    if (!job) {
+      return res.status(404).json({ error: 'Job not found' });
+    }
+
+    const progress = await fileReader.getJobProgress(jobId, job.output_path, offset);
+
+    res.json({
+      jobId,
+      ...progress,
+      timestamp: new Date().toISOString()
+    });
+  } catch (error) {
+    res.status(500).json({
+      error: 'Failed to fetch progress',
+      details: error.message
+    });
+  }
+});
+
 // GET /api/jobs/:jobId - Get job report specifically
 router.get('/:jobId', async (req, res) => {
   try {
@@ -15,6 +15,33 @@ class FileReader {
         return { status: 'not_started', message: 'Job directory not found' };
       }
 
+      // Progress stream (newer bots): the last event tells us the state
+      const lastEvent = await this.getLastProgressEvent(jobId, hostOutputPath);
+      if (lastEvent) {
+        if (lastEvent.event === 'job_end') {
+          return {
+            status: lastEvent.status === 'failed' ? 'failed' : 'completed',
+            report: await fs.readJson(reportFile).catch(() => null),
+            hostOutputPath: hostOutputPath,
+            outputs: await this.getJobOutputs(jobId, hostOutputPath)
+          };
+        }
+        // Heartbeats cover long waits; the log's mtime covers older bots without them
+        const logFile = path.join(hostOutputPath, `${jobId}.log`);
+        const logStats = await fs.stat(logFile).catch(() => null);
+        const lastActivity = Math.max(
+          new Date(lastEvent.ts).getTime() || 0,
+          logStats ? logStats.mtime.getTime() : 0
+        );
+        const isRecent = (Date.now() - lastActivity) < 300000; // 5 minutes
+        return {
+          status: isRecent ? 'running' : 'stalled',
+          step: lastEvent.step || null,
+          lastEvent: lastEvent,
+          hostOutputPath: hostOutputPath
+        };
+      }
+
       // Check if report file exists (completed)
       if (await fs.pathExists(reportFile)) {
         try {
@@ -50,6 +77,79 @@ class FileReader {
     }
   }
 
+  // Read progress events appended after byte `offset`; pass back `nextOffset` on the next call
+  async getJobProgress(jobId, hostOutputPath, offset = 0) {
+    if (!hostOutputPath) {
+      return { events: [], error: 'Output path not specified' };
+    }
+
+    const progressFile = path.join(hostOutputPath, `progress_${jobId}.jsonl`);
+
+    try {
+      if (!await fs.pathExists(progressFile)) {
+        return { events: [], nextOffset: 0, error: 'Progress file not found' };
+      }
+
+      const { size } = await fs.stat(progressFile);
+      if (offset >= size) {
+        return { events: [], nextOffset: offset };
+      }
+
+      const buffer = Buffer.alloc(size - offset);
+      const fd = await fs.open(progressFile, 'r');
+      try {
+        await fs.read(fd, buffer, 0, buffer.length, offset);
+      } finally {
+        await fs.close(fd);
+      }
+
+      // Only consume complete lines; a partially written line is read next time
+      const text = buffer.toString('utf8');
+      const complete = text.slice(0, text.lastIndexOf('\n') + 1);
+      const events = complete.split('\n').filter(Boolean).map(line => JSON.parse(line));
+
+      return {
+        events,
+        nextOffset: offset + Buffer.byteLength(complete, 'utf8')
+      };
+    } catch (error) {
+      return { events: [], nextOffset: offset, error: error.message };
+    }
+  }
+
+  async getLastProgressEvent(jobId, hostOutputPath) {
+    const progressFile = path.join(hostOutputPath, `progress_${jobId}.jsonl`);
+    if (!await fs.pathExists(progressFile)) {
+      return null;
+    }
+
+    // Only the tail is needed for the latest event
+    const { size } = await fs.stat(progressFile);
+    const start = Math.max(0, size - 4096);
+    const buffer = Buffer.alloc(size - start);
+    const fd = await fs.open(progressFile, 'r');
+    try {
+      await fs.read(fd, buffer, 0, buffer.length, start);
+    } finally {
+      await fs.close(fd);
+    }
+
+    const lines = buffer.toString('utf8').split('\n');
+    lines.pop(); // empty or partially written last line
+    if (start > 0) {
+      lines.shift(); // first line may be cut
+    }
+
+    for (let i = lines.length - 1; i >= 0; i--) {
+      try {
+        return JSON.parse(lines[i]);
+      } catch (e) {
+        continue;
+      }
+    }
+    return null;
+  }
+
   async getJobLogs(jobId, hostOutputPath, lines = 50) {
     if (!hostOutputPath) {
       return { logs: '', error: 'Output path not specified' };